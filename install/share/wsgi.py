@@ -51,10 +51,8 @@ except Exception as e:
 else:
     logger.info('*** PROCESS START ***')
 
-    # This is the WSGI callable:
+    # This is the WSGI callable. Per-request state is kept in thread-local
+    # storage (ipalib.request.context), so the application may be run by
+    # a multi-threaded WSGI daemon process.
     def application(environ, start_response):
-        if not environ['wsgi.multithread']:
-            return api.Backend.wsgi_dispatch(environ, start_response)
-        else:
-            logger.error("IPA does not work with the threaded MPM, "
-                         "use the pre-fork MPM")
+        return api.Backend.wsgi_dispatch(environ, start_response)
@@ -23,7 +23,6 @@ Base classes for all backed-end plugins.
 
 import logging
 import threading
-import os
 
 from ipalib import plugable
 from ipalib.errors import PublicError, InternalError, CommandError
@@ -120,7 +119,9 @@ class Executioner(Backend):
         """
 
         if ccache is not None:
-            os.environ["KRB5CCNAME"] = ccache
+            # KRB5CCNAME is shared by all threads, the ccache is passed to
+            # the backends explicitly
+            setattr(context, "ccache_name", ccache)
 
         if self.env.in_server:
             self.Backend.ldap2.connect(ccache=ccache,
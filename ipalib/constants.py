@@ -149,6 +149,8 @@ DEFAULT_CONFIG = (
     ('startup_timeout', 300),
     # How long http connection should wait for reply [seconds].
     ('http_timeout', 30),
+    # How long user-status waits for the replies of the masters [seconds].
+    ('user_status_timeout', 10),
 
     # Web Application mount points
     ('mount_ipa', '/ipa/'),
@@ -159,10 +161,29 @@ DEFAULT_CONFIG = (
     # Session stuff:
     ('kinit_lifetime', None),
 
+    # Pool of bound LDAP connections kept by each server process:
+    ('ldap_pool_size', 8),  # 0 disables the pool
+    ('ldap_pool_idle_timeout', 60),  # seconds
+
+    # Worker threads of batch commands executed with --parallel:
+    ('batch_workers', 4),
+
+    # Cache of results of read-only commands kept by each server process:
+    ('result_cache_size', 256),  # 0 disables the cache
+    ('result_cache_ttl', 300),  # seconds
+
+    # Concurrent requests to the CA when retrieving many certificates:
+    ('ca_request_workers', 4),
+
+    # Graph of group membership kept by each server process:
+    ('member_graph_size', 100000),  # membership values, 0 disables it
+
     # Debugging:
     ('verbose', 0),
     ('debug', False),
     ('startup_traceback', False),
+    ('server_timing', False),
+    ('audit_max_value_length', 256),  # 0 means no limit
     ('mode', 'production'),
     ('wait_for_dns', 0),
 
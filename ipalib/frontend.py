@@ -36,7 +36,7 @@ from ipalib.errors import (ZeroArgumentError, MaxArgumentError, OverlapError,
     VersionError, OptionError,
     ValidationError, ConversionError)
 from ipalib import errors, messages
-from ipalib.request import context, context_frame
+from ipalib.request import context, context_frame, timed_phase
 from ipalib.util import classproperty, json_serialize
 
 if six.PY3:
@@ -372,6 +372,15 @@ class HasParam(Plugin):
 _callback_registry = {}
 
 
+def _timed_callback(callback_type, callback):
+    phase = '%s_callback' % callback_type
+
+    def timed_callback(*args, **kwargs):
+        with timed_phase(phase):
+            return callback(*args, **kwargs)
+    return timed_callback
+
+
 class Command(HasParam):
     """
     A public IPA atomic operation.
@@ -427,6 +436,10 @@ class Command(HasParam):
 
     api_version = API_VERSION
 
+    # Server only: results of execute() may be reused by later calls with
+    # the same arguments until the directory changes
+    cache_results = False
+
     @classmethod
     def __topic_getter(cls):
         return cls.__module__.rpartition('.')[2]
@@ -462,20 +475,35 @@ class Command(HasParam):
                 self.add_message(
                     messages.VersionMissing(server_version=self.api_version))
         params = self.args_options_2_params(*args, **options)
-        logger.debug(
-            'raw: %s(%s)', self.name, ', '.join(self._repr_iter(**params))
-        )
+        given = tuple(params)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                'raw: %s(%s)', self.name, ', '.join(self._repr_iter(**params))
+            )
         if self.api.env.in_server:
-            params.update(self.get_default(**params))
-        params = self.normalize(**params)
-        params = self.convert(**params)
-        logger.debug(
-            '%s(%s)', self.name, ', '.join(self._repr_iter(**params))
-        )
+            with timed_phase('default'):
+                params.update(self.get_default(**params))
+        with timed_phase('normalize'):
+            params = self.normalize(**params)
+        with timed_phase('convert'):
+            params = self.convert(**params)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                '%s(%s)', self.name, ', '.join(self._repr_iter(**params))
+            )
+        audit_record = getattr(context, 'audit_record', None)
+        if (
+            audit_record is not None
+            and audit_record.name == self.name
+            and audit_record.params is None
+        ):
+            audit_record.set_params(self, params, given)
         if self.api.env.in_server:
-            self.validate(**params)
+            with timed_phase('validate'):
+                self.validate(**params)
         (args, options) = self.params_2_args_options(**params)
-        ret = self.run(*args, **options)
+        with timed_phase('execute'):
+            ret = self.run(*args, **options)
         if isinstance(ret, dict):
             for message in self.context.__messages:
                 messages.add_message(options['version'], ret, message)
@@ -486,7 +514,8 @@ class Command(HasParam):
         ):
             ret['summary'] = self.get_summary_default(ret)
         if self.use_output_validation and (self.output or ret is not None):
-            self.validate_output(ret, options['version'])
+            with timed_phase('validate_output'):
+                self.validate_output(ret, options['version'])
         return ret
 
     def add_message(self, message):
@@ -511,14 +540,25 @@ class Command(HasParam):
         >>> list(c._repr_iter(login=u'Okay.', passwd=u'Private!'))
         ["u'Okay.'", "passwd=u'********'"]
         """
+        for name, value in self._repr_items(**params):
+            if name is None:
+                yield value
+            else:
+                yield '%s=%s' % (name, value)
+
+    def _repr_items(self, **params):
+        """
+        Iterate through (name, ``repr()``) of *safe* values of args and
+        options, see `_repr_iter`. The name of args is None.
+        """
         for arg in self.args():
             value = params.get(arg.name, None)
-            yield repr(arg.safe_value(value))
+            yield None, repr(arg.safe_value(value))
         for option in self.options():
             if option.name not in params:
                 continue
             value = params[option.name]
-            yield '%s=%r' % (option.name, option.safe_value(value))
+            yield option.name, repr(option.safe_value(value))
 
     def args_options_2_params(self, *args, **options):
         """
@@ -797,7 +837,10 @@ class Command(HasParam):
         performs is executed remotely.
         """
         if self.api.env.in_server:
-            return self.execute(*args, **options)
+            if 'resultcache' not in self.api.Backend:
+                return self.execute(*args, **options)
+            return self.api.Backend.resultcache.execute(
+                self, *args, **options)
         return self.forward(*args, **options)
 
     def execute(self, *args, **kw):
@@ -1116,14 +1159,16 @@ class Command(HasParam):
         # Use one shared callback registry, keyed on class, to avoid problems
         # with missing attributes being looked up in superclasses
         callbacks = _callback_registry.get(callback_type, {}).get(cls, [None])
+        timed = getattr(context, 'timer', None) is not None
         for callback in callbacks:
             if callback is None:
                 try:
-                    yield getattr(cls, '%s_callback' % callback_type)
+                    callback = getattr(cls, '%s_callback' % callback_type)
                 except AttributeError:
-                    pass
-            else:
-                yield callback
+                    continue
+            if timed:
+                callback = _timed_callback(callback_type, callback)
+            yield callback
 
     @classmethod
     def register_callback(cls, callback_type, callback, first=False):
@@ -2,6 +2,7 @@
 # Copyright (C) 2016  FreeIPA Contributors see COPYING for license
 #
 
+import ctypes
 import logging
 import os
 import time
@@ -10,6 +11,7 @@ import gssapi
 
 from ipaplatform.paths import paths
 from ipapython.ipautil import run
+from ipapython import session_storage as krb5
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,117 @@ KRB5_KDC_UNREACH = 2529639068
 # A service is not available that s required to process the request
 KRB5KDC_ERR_SVC_UNAVAILABLE = 2529638941
 
+# Client's entry in database has expired
+KRB5KDC_ERR_NAME_EXP = -1765328383
+
+# Clients credentials have been revoked
+KRB5KDC_ERR_CLIENT_REVOKED = -1765328366
+
+# Password has expired
+KRB5KDC_ERR_KEY_EXP = -1765328361
+
+# Cannot read password
+KRB5_LIBOS_CANTREADPWD = -1765328254
+
+KRB5_PRINCIPAL_PARSE_ENTERPRISE = 0x4
+
+krb5_deltat = krb5.krb5_int32
+
+
+class _krb5_get_init_creds_opt(ctypes.Structure):  # noqa
+    """krb5/krb5.h struct _krb5_get_init_creds_opt"""
+    _fields_ = []
+
+
+class _krb5_reply_data(ctypes.Structure):  # noqa
+    """krb5/krb5.h struct _krb5_data with a writable data buffer"""
+    _fields_ = [
+        ("magic", krb5.krb5_magic),
+        ("length", ctypes.c_uint),
+        ("data", ctypes.c_void_p),
+    ]
+
+
+class _krb5_prompt(ctypes.Structure):  # noqa
+    """krb5/krb5.h struct _krb5_prompt"""
+    _fields_ = [
+        ("prompt", ctypes.c_char_p),
+        ("hidden", ctypes.c_int),
+        ("reply", ctypes.POINTER(_krb5_reply_data)),
+    ]
+
+
+krb5_get_init_creds_opt_p = ctypes.POINTER(_krb5_get_init_creds_opt)
+krb5_prompter_fct = ctypes.CFUNCTYPE(
+    krb5.krb5_error, krb5.krb5_context, ctypes.c_void_p, ctypes.c_char_p,
+    ctypes.c_char_p, ctypes.c_int, ctypes.POINTER(_krb5_prompt))
+
+krb5_parse_name_flags = krb5.LIBKRB5.krb5_parse_name_flags
+krb5_parse_name_flags.argtypes = (krb5.krb5_context, ctypes.c_char_p,
+                                  ctypes.c_int,
+                                  ctypes.POINTER(krb5.krb5_principal), )
+krb5_parse_name_flags.restype = krb5.krb5_error
+krb5_parse_name_flags.errcheck = krb5.krb5_errcheck
+
+krb5_cc_resolve = krb5.LIBKRB5.krb5_cc_resolve
+krb5_cc_resolve.argtypes = (krb5.krb5_context, ctypes.c_char_p,
+                            ctypes.POINTER(krb5.krb5_ccache), )
+krb5_cc_resolve.restype = krb5.krb5_error
+krb5_cc_resolve.errcheck = krb5.krb5_errcheck
+
+krb5_string_to_deltat = krb5.LIBKRB5.krb5_string_to_deltat
+krb5_string_to_deltat.argtypes = (ctypes.c_char_p,
+                                  ctypes.POINTER(krb5_deltat), )
+krb5_string_to_deltat.restype = krb5.krb5_error
+krb5_string_to_deltat.errcheck = krb5.krb5_errcheck
+
+krb5_get_init_creds_opt_alloc = krb5.LIBKRB5.krb5_get_init_creds_opt_alloc
+krb5_get_init_creds_opt_alloc.argtypes = (
+    krb5.krb5_context, ctypes.POINTER(krb5_get_init_creds_opt_p), )
+krb5_get_init_creds_opt_alloc.restype = krb5.krb5_error
+krb5_get_init_creds_opt_alloc.errcheck = krb5.krb5_errcheck
+
+krb5_get_init_creds_opt_free = krb5.LIBKRB5.krb5_get_init_creds_opt_free
+krb5_get_init_creds_opt_free.argtypes = (krb5.krb5_context,
+                                         krb5_get_init_creds_opt_p, )
+krb5_get_init_creds_opt_free.restype = None
+
+krb5_get_init_creds_opt_set_tkt_life = (
+    krb5.LIBKRB5.krb5_get_init_creds_opt_set_tkt_life)
+krb5_get_init_creds_opt_set_tkt_life.argtypes = (krb5_get_init_creds_opt_p,
+                                                 krb5_deltat, )
+krb5_get_init_creds_opt_set_tkt_life.restype = None
+
+krb5_get_init_creds_opt_set_out_ccache = (
+    krb5.LIBKRB5.krb5_get_init_creds_opt_set_out_ccache)
+krb5_get_init_creds_opt_set_out_ccache.argtypes = (
+    krb5.krb5_context, krb5_get_init_creds_opt_p, krb5.krb5_ccache, )
+krb5_get_init_creds_opt_set_out_ccache.restype = krb5.krb5_error
+krb5_get_init_creds_opt_set_out_ccache.errcheck = krb5.krb5_errcheck
+
+krb5_get_init_creds_opt_set_fast_ccache_name = (
+    krb5.LIBKRB5.krb5_get_init_creds_opt_set_fast_ccache_name)
+krb5_get_init_creds_opt_set_fast_ccache_name.argtypes = (
+    krb5.krb5_context, krb5_get_init_creds_opt_p, ctypes.c_char_p, )
+krb5_get_init_creds_opt_set_fast_ccache_name.restype = krb5.krb5_error
+krb5_get_init_creds_opt_set_fast_ccache_name.errcheck = krb5.krb5_errcheck
+
+# no errcheck, the arguments of a failed call contain the password
+krb5_get_init_creds_password = krb5.LIBKRB5.krb5_get_init_creds_password
+krb5_get_init_creds_password.argtypes = (
+    krb5.krb5_context, ctypes.POINTER(krb5.krb5_creds), krb5.krb5_principal,
+    ctypes.c_char_p, krb5_prompter_fct, ctypes.c_void_p, krb5_deltat,
+    ctypes.c_char_p, krb5_get_init_creds_opt_p, )
+krb5_get_init_creds_password.restype = krb5.krb5_error
+
+krb5_get_error_message = krb5.LIBKRB5.krb5_get_error_message
+krb5_get_error_message.argtypes = (krb5.krb5_context, krb5.krb5_error, )
+krb5_get_error_message.restype = ctypes.c_void_p
+
+krb5_free_error_message = krb5.LIBKRB5.krb5_free_error_message
+krb5_free_error_message.argtypes = (krb5.krb5_context, ctypes.c_void_p, )
+krb5_free_error_message.restype = None
+
 
 def kinit_keytab(principal, keytab, ccache_name, config=None, attempts=1):
     """
@@ -99,6 +212,105 @@ def kinit_password(principal, password, ccache_name, config=None,
         raise RuntimeError(result.error_output)
 
 
+def _password_prompter(password):
+    """
+    Return a krb5 prompter which answers the first prompt with *password*
+    and fails on any further prompt, the same way kinit does when it reads
+    the password from stdin.
+    """
+    state = dict(answered=False)
+
+    def prompter(context, data, name, banner, num_prompts, prompts):
+        for i in range(num_prompts):
+            reply = prompts[i].reply.contents
+            if state['answered'] or len(password) > reply.length:
+                return KRB5_LIBOS_CANTREADPWD
+            ctypes.memmove(reply.data, password, len(password))
+            reply.length = len(password)
+            state['answered'] = True
+        return 0
+
+    return krb5_prompter_fct(prompter)
+
+
+def kinit_password_in_process(principal, password, ccache_name,
+                              armor_ccache_name=None, enterprise=False,
+                              lifetime=None):
+    """
+    perform kinit as principal using password in the calling process
+
+    Unlike `kinit_password`, no kinit process is executed, the AS exchange
+    is done by libkrb5 directly. Prompts issued by pre-authentication
+    mechanisms, e.g. for an OTP token value, are handled like with
+    `kinit_password`.
+
+    :raises: KRB5Error with the Kerberos error code and message if the
+        credentials could not be obtained
+    """
+    logger.debug("Initializing principal %s using password", principal)
+    if not isinstance(principal, bytes):
+        principal = principal.encode('utf-8')
+    if not isinstance(password, bytes):
+        password = password.encode('utf-8')
+    if not isinstance(ccache_name, bytes):
+        ccache_name = ccache_name.encode('utf-8')
+
+    context = krb5.krb5_context()
+    client = krb5.krb5_principal()
+    ccache = krb5.krb5_ccache()
+    opt = krb5_get_init_creds_opt_p()
+    creds = krb5.krb5_creds()
+    got_creds = False
+
+    try:
+        krb5.krb5_init_context(ctypes.byref(context))
+
+        flags = 0
+        if enterprise:
+            logger.debug("Using enterprise principal")
+            flags |= KRB5_PRINCIPAL_PARSE_ENTERPRISE
+        krb5_parse_name_flags(context, principal, flags,
+                              ctypes.byref(client))
+        krb5_cc_resolve(context, ccache_name, ctypes.byref(ccache))
+
+        krb5_get_init_creds_opt_alloc(context, ctypes.byref(opt))
+        krb5_get_init_creds_opt_set_out_ccache(context, opt, ccache)
+        if armor_ccache_name is not None:
+            logger.debug("Using armor ccache %s for FAST webauth",
+                         armor_ccache_name)
+            krb5_get_init_creds_opt_set_fast_ccache_name(
+                context, opt, armor_ccache_name.encode('utf-8'))
+        if lifetime:
+            deltat = krb5_deltat()
+            krb5_string_to_deltat(lifetime.encode('utf-8'),
+                                  ctypes.byref(deltat))
+            krb5_get_init_creds_opt_set_tkt_life(opt, deltat)
+
+        result = krb5_get_init_creds_password(
+            context, ctypes.byref(creds), client, None,
+            _password_prompter(password), None, 0, None, opt)
+        if result != 0:
+            message = krb5_get_error_message(context, result)
+            try:
+                error = ctypes.string_at(message).decode('utf-8', 'replace')
+            finally:
+                krb5_free_error_message(context, message)
+            raise krb5.KRB5Error(result, error)
+        got_creds = True
+
+    finally:
+        if got_creds:
+            krb5.krb5_free_cred_contents(context, ctypes.byref(creds))
+        if opt:
+            krb5_get_init_creds_opt_free(context, opt)
+        if ccache:
+            krb5.krb5_cc_close(context, ccache)
+        if client:
+            krb5.krb5_free_principal(context, client)
+        if context:
+            krb5.krb5_free_context(context)
+
+
 def kinit_armor(ccache_name, pkinit_anchors=None):
     """
     perform anonymous pkinit to obtain anonymous ticket to be used as armor
@@ -192,6 +192,11 @@ standard_list_of_entries = (
     Output('truncated', bool, _('True if not all results were returned')),
 )
 
+paged_list_of_entries = standard_list_of_entries + (
+    Output('total', (int, type(None)),
+           _('Number of entries on all pages, if known')),
+)
+
 standard_delete = (
     summary,
     Output('result', dict, _('List of deletions that failed')),
@@ -22,8 +22,10 @@
 Per-request thread-local data.
 """
 
+import collections
 import contextlib
 import threading
+import time
 
 from ipalib.base import ReadOnly, lock
 from ipalib.constants import CALLABLE_ERROR
@@ -77,3 +79,136 @@ def destroy_context():
         if isinstance(value, Connection):
             value.disconnect()
     context.__dict__.clear()
+
+
+class RequestTimer(object):
+    """
+    Accumulated durations of the phases of a request.
+
+    Phases may nest, e.g. the time of LDAP operations is also part of the
+    time of the command execution which issued them.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        # name of the command being executed
+        self.name = None
+        # phase name -> [number of occurrences, total seconds]
+        self.phases = collections.OrderedDict()
+
+    def add(self, name, duration, count=1):
+        try:
+            phase = self.phases[name]
+        except KeyError:
+            self.phases[name] = [count, duration]
+        else:
+            phase[0] += count
+            phase[1] += duration
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, time.time() - start)
+
+    def elapsed(self):
+        return time.time() - self.start
+
+    def format(self):
+        """
+        Return the phases as ``name=<ms>ms/<count>`` fields of a log line.
+        """
+        fields = ['total=%.1fms' % (self.elapsed() * 1000)]
+        for name, (count, duration) in self.phases.items():
+            fields.append('%s=%.1fms/%d' % (name, duration * 1000, count))
+        return ' '.join(fields)
+
+    def server_timing(self):
+        """
+        Return the phases as a value of the ``Server-Timing`` HTTP header.
+        """
+        metrics = []
+        for name, (count, duration) in self.phases.items():
+            metrics.append('%s;dur=%.1f;desc="%d"' % (
+                name, duration * 1000, count))
+        metrics.append('total;dur=%.1f' % (self.elapsed() * 1000))
+        return ', '.join(metrics)
+
+
+@contextlib.contextmanager
+def timed_phase(name):
+    """
+    Account the enclosed code to phase *name* of the current request.
+
+    Does nothing unless the request is timed, i.e. `context.timer` is set.
+    """
+    timer = getattr(context, 'timer', None)
+    if timer is None:
+        yield
+    else:
+        with timer.phase(name):
+            yield
+
+
+class AuditRecord(object):
+    """
+    Lazily formatted audit log record of a command call.
+
+    The command stores the parameters it has already normalized and
+    converted in the record while it is being called, see `Command`. The
+    log message is only built when a handler actually formats the record,
+    e.g. ``logger.info('%s', record)``.
+    """
+
+    def __init__(self, head, name, args=(), options=None,
+                 max_value_length=0):
+        # head of the message, e.g. "[jsonserver_session] admin@REALM"
+        self.head = head
+        self.name = name
+        # arguments and options as passed by the caller
+        self.args = args
+        self.options = options or {}
+        self.max_value_length = max_value_length
+        self.command = None
+        self.params = None
+        self.param_names = ()
+        self.result = None
+
+    def set_params(self, command, params, param_names):
+        """
+        Record *params* of *command*, of which the caller gave *param_names*.
+        """
+        self.command = command
+        self.params = params
+        self.param_names = param_names
+
+    def _get_params(self):
+        if self.params is not None:
+            return dict(
+                (name, self.params[name])
+                for name in self.param_names if name in self.params
+            )
+        # the call has failed before its parameters were converted
+        try:
+            return self.command.args_options_2_params(
+                *self.args, **self.options)
+        except Exception:
+            return self.options
+
+    def _iter_params(self):
+        max_length = self.max_value_length
+        for name, value in self.command._repr_items(**self._get_params()):
+            if max_length and len(value) > max_length:
+                value = '%s...' % value[:max_length]
+            if name is None:
+                yield value
+            else:
+                yield '%s=%s' % (name, value)
+
+    def __str__(self):
+        if self.command is None:
+            return '%s: %s: %s' % (self.head, self.name, self.result)
+        return '%s: %s(%s): %s' % (
+            self.head, self.name, ', '.join(self._iter_params()), self.result)
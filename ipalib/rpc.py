@@ -42,6 +42,7 @@ import json
 import re
 import socket
 import gzip
+import time
 from cryptography import x509 as crypto_x509
 
 import gssapi
@@ -76,11 +77,13 @@ from ipalib import api
 # cannot handle that
 try:
     from xmlrpclib import (Binary, Fault, DateTime, dumps, loads, ServerProxy,
-            Transport, ProtocolError, MININT, MAXINT)
+                           Transport, ProtocolError, MININT, MAXINT,
+                           gzip_encode)
 except ImportError:
     # pylint: disable=import-error
-    from xmlrpc.client import (Binary, Fault, DateTime, dumps, loads, ServerProxy,
-            Transport, ProtocolError, MININT, MAXINT)
+    from xmlrpc.client import (Binary, Fault, DateTime, dumps, loads,
+                               ServerProxy, Transport, ProtocolError, MININT,
+                               MAXINT, gzip_encode)
 
 # pylint: disable=import-error
 if six.PY3:
@@ -421,6 +424,72 @@ def json_encode_binary(val, version, pretty_print=False):
         return json.dumps(result)
 
 
+def _json_iterencode(obj, primer, encode):
+    """Yield JSON fragments of a primed Python object structure
+
+    Dicts are walked recursively. Items of lists and tuples (e.g. the
+    entries of a *_find result) are primed and encoded one at a time, so
+    that only a single item is ever converted in memory.
+    """
+    if isinstance(obj, dict):
+        yield '{'
+        first = True
+        for key, value in six.iteritems(obj):
+            if first:
+                first = False
+            else:
+                yield ', '
+            if not isinstance(key, six.string_types):
+                # json.dumps() converts int, float, bool and None keys
+                key = json.dumps(key)
+            yield encode(key)
+            yield ': '
+            for chunk in _json_iterencode(value, primer, encode):
+                yield chunk
+        yield '}'
+    elif isinstance(obj, (list, tuple)):
+        yield '['
+        for i, value in enumerate(obj):
+            if i:
+                yield ', '
+            yield encode(primer.convert(value))
+        yield ']'
+    else:
+        yield encode(primer.convert(obj))
+
+
+def json_iterencode_binary(val, version, pretty_print=False,
+                           chunk_size=65536):
+    """Serialize a Python object structure to JSON piece by piece
+
+    Produces the same document as json_encode_binary() but yields it in
+    chunks of roughly chunk_size characters, without ever building a
+    primed copy or a text representation of the whole structure.
+
+    :param object val: Python object structure
+    :param str version: client version
+    :param bool pretty_print: indent and sort JSON (not streamed)
+    :param int chunk_size: minimal size of yielded chunks
+    :return: iterator of text chunks
+    """
+    if pretty_print:
+        yield json_encode_binary(val, version, pretty_print=True)
+        return
+
+    encode = json.JSONEncoder().encode
+    parts = []
+    size = 0
+    for chunk in _json_iterencode(val, _JSONPrimer(version), encode):
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= chunk_size:
+            yield ''.join(parts)
+            parts = []
+            size = 0
+    if parts:
+        yield ''.join(parts)
+
+
 def _ipa_obj_hook(dct, _iteritems=six.iteritems, _list=list):
     """JSON object hook
 
@@ -504,10 +573,19 @@ class DummyParser(object):
 
 
 class MultiProtocolTransport(Transport):
-    """Transport that handles both XML-RPC and JSON"""
+    """Transport that handles both XML-RPC and JSON
+
+    Responses are requested gzip compressed. Request bodies larger than
+    encode_threshold bytes are gzip compressed once the server has
+    announced support for compressed requests with an Accept-Encoding
+    response header (RFC 7694).
+    """
+    encode_threshold = 4096
+
     def __init__(self, *args, **kwargs):
         Transport.__init__(self)
         self.protocol = kwargs.get('protocol', None)
+        self._gzip_requests = False
 
     def getparser(self):
         if self.protocol == 'json':
@@ -522,12 +600,23 @@ class MultiProtocolTransport(Transport):
         else:
             connection.putheader("Content-Type", "text/xml")
 
-        # gzip compression would be set up here, but we have it turned off
-        # (encode_threshold is None)
+        if (self._gzip_requests and
+                self.encode_threshold is not None and
+                len(request_body) > self.encode_threshold):
+            connection.putheader("Content-Encoding", "gzip")
+            request_body = gzip_encode(request_body)
 
         connection.putheader("Content-Length", str(len(request_body)))
         connection.endheaders(request_body)
 
+    def parse_response(self, response):
+        accept_encoding = response.getheader('Accept-Encoding', '')
+        codings = [c.split(';')[0].strip().lower()
+                   for c in accept_encoding.split(',')]
+        if 'gzip' in codings:
+            self._gzip_requests = True
+        return Transport.parse_response(self, response)
+
 
 class LanguageAwareTransport(MultiProtocolTransport):
     """Transport sending Accept-Language header"""
@@ -557,13 +646,37 @@ class LanguageAwareTransport(MultiProtocolTransport):
 
 
 class SSLTransport(LanguageAwareTransport):
-    """Handles an HTTPS transaction to an XML-RPC server."""
+    """Handles an HTTPS transaction to an XML-RPC server.
+
+    The connection is kept alive and reused by subsequent requests. A new
+    connection is made when the server has closed the connection, or when
+    it has been idle for more than idle_timeout seconds and the server is
+    likely to close it (KeepAliveTimeout of the IPA web server is 30
+    seconds). tls_handshakes counts the connections made.
+    """
+    idle_timeout = 25
+
+    def __init__(self, *args, **kwargs):
+        LanguageAwareTransport.__init__(self, *args, **kwargs)
+        self.tls_handshakes = 0
+        self._last_used = 0
+
     def make_connection(self, host):
         host, self._extra_headers, _x509 = self.get_host_info(host)
 
         if self._connection and host == self._connection[0]:
-            logger.debug("HTTP connection keep-alive (%s)", host)
-            return self._connection[1]
+            conn = self._connection[1]
+            idle = time.time() - self._last_used
+            if conn.sock is None:
+                # the previous response had "Connection: close"
+                logger.debug("HTTP server has closed connection (%s)", host)
+            elif self.idle_timeout is not None and idle > self.idle_timeout:
+                logger.debug("HTTP connection idle for %d seconds (%s)",
+                             idle, host)
+            else:
+                logger.debug("HTTP connection keep-alive (%s)", host)
+                return conn
+            self.close()
 
         conn = create_https_connection(
             host, 443,
@@ -572,11 +685,19 @@ class SSLTransport(LanguageAwareTransport):
             tls_version_max=api.env.tls_version_max)
 
         conn.connect()
+        self.tls_handshakes += 1
         logger.debug("New HTTP connection (%s)", host)
 
         self._connection = host, conn
+        self._last_used = time.time()
         return self._connection[1]
 
+    def parse_response(self, response):
+        try:
+            return LanguageAwareTransport.parse_response(self, response)
+        finally:
+            self._last_used = time.time()
+
 
 class KerbTransport(SSLTransport):
     """
@@ -588,6 +709,7 @@ class KerbTransport(SSLTransport):
     def __init__(self, *args, **kwargs):
         SSLTransport.__init__(self, *args, **kwargs)
         self._sec_context = None
+        self.gssapi_handshakes = 0
         self.service = kwargs.pop("service", "HTTP")
         self.ccache = kwargs.pop("ccache", None)
 
@@ -648,6 +770,7 @@ class KerbTransport(SSLTransport):
             self._sec_context = gssapi.SecurityContext(creds=creds, name=name,
                                                        flags=self.flags)
             response = self._sec_context.step()
+            self.gssapi_handshakes += 1
         except gssapi.exceptions.GSSError as e:
             self._handle_exception(e, service=service)
 
@@ -827,6 +950,10 @@ class KerbTransport(SSLTransport):
             return
 
         cookie_string = self._slice_session_cookie(session_cookie)
+        if gssapi.RequirementFlag.delegate_to_peer not in self.flags:
+            # authenticate the following requests with the session cookie
+            # rather than with a new GSSAPI negotiation each
+            setattr(context, 'session_cookie', cookie_string)
         logger.debug("storing cookie '%s' for principal %s",
                      cookie_string, principal)
         try:
@@ -419,8 +419,10 @@ to the constructor. The result may share underlying structure.
 '''
 from __future__ import print_function
 
+import collections
 import sys
 import functools
+import threading
 
 import cryptography.x509
 from ldap.dn import str2dn, dn2str
@@ -432,6 +434,49 @@ if six.PY3:
 
 __all__ = 'AVA', 'RDN', 'DN'
 
+# number of parsed DN strings kept by _parse_cache
+DN_PARSE_CACHE_SIZE = 4096
+
+
+class _ParseCache(object):
+    """
+    Size limited LRU cache of parsed DN strings.
+
+    The same DN strings, e.g. of group members or container entries, are
+    parsed over and over again. The cached RDN lists are shared by all DN
+    objects created from the same string and must not be modified.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, value):
+        with self._lock:
+            try:
+                rdns = self._entries.pop(value)
+            except KeyError:
+                return None
+            # re-insert as the most recently used entry
+            self._entries[value] = rdns
+        return rdns
+
+    def set(self, value, rdns):
+        with self._lock:
+            self._entries.pop(value, None)
+            self._entries[value] = rdns
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_parse_cache = _ParseCache(DN_PARSE_CACHE_SIZE)
+
+
 def _adjust_indices(start, end, length):
     'helper to fixup start/end slice values'
 
@@ -1103,26 +1148,29 @@ class DN(object):
     AVA_type = AVA
     RDN_type = RDN
 
+    # case normalized RDNs and hash, computed on first use
+    _keys = None
+    _hash = None
+
     def __init__(self, *args, **kwds):
         self.rdns = self._rdns_from_sequence(args)
 
-    def _copy_rdns(self, rdns=None):
-        if not rdns:
-            rdns = self.rdns
-        return [[list(a) for a in rdn] for rdn in rdns]
+    def __getstate__(self):
+        # the cached hash is only valid in this process
+        return {'rdns': self.rdns}
+
+    def __setstate__(self, state):
+        self.rdns = state['rdns']
 
     def _rdns_from_value(self, value):
         if isinstance(value, six.string_types):
-            try:
-                if isinstance(value, six.text_type):
-                    value = val_encode(value)
-                rdns = str2dn(value)
-            except DECODING_ERROR:
-                raise ValueError("malformed RDN string = \"%s\"" % value)
-            for rdn in rdns:
-                sort_avas(rdn)
+            rdns = _parse_cache.get(value)
+            if rdns is None:
+                rdns = self._parse_rdns(value)
+                _parse_cache.set(value, rdns)
         elif isinstance(value, DN):
-            rdns = value._copy_rdns()
+            # the RDN lists are never modified, share them
+            rdns = value.rdns
         elif isinstance(value, (tuple, list, AVA)):
             ava = get_ava(value)
             rdns = [[ava]]
@@ -1141,6 +1189,17 @@ class DN(object):
                 % type(value))
         return rdns
 
+    def _parse_rdns(self, value):
+        try:
+            if isinstance(value, six.text_type):
+                value = val_encode(value)
+            rdns = str2dn(value)
+        except DECODING_ERROR:
+            raise ValueError("malformed RDN string = \"%s\"" % value)
+        for rdn in rdns:
+            sort_avas(rdn)
+        return rdns
+
     def _rdns_from_sequence(self, seq):
         rdns = []
 
@@ -1195,20 +1254,23 @@ class DN(object):
             raise TypeError("unsupported type for DN indexing, must be int, basestring or slice; not %s" % \
                                 (key.__class__.__name__))
 
+    def _get_keys(self):
+        keys = self._keys
+        if keys is None:
+            keys = self._keys = [rdn_key(rdn) for rdn in self.rdns]
+        return keys
+
     def __hash__(self):
-        # Hash is computed from DN's string representation.
+        # Hash is computed from DN's case normalized RDNs.
         #
         # Because attrs & values are comparison case-insensitive the
         # hash value between two objects which compare as equal but
         # differ in case must yield the same hash value.
 
-        str_dn = ';,'.join([
-            '++'.join([
-                '=='.join((atype, avalue or ''))
-                for atype, avalue, _dummy in rdn
-            ]) for rdn in self.rdns
-        ])
-        return hash(str_dn.lower())
+        value = self._hash
+        if value is None:
+            value = self._hash = hash(tuple(self._get_keys()))
+        return value
 
     def __eq__(self, other):
         # Try coercing to DN, if successful compare to coerced object
@@ -1242,15 +1304,14 @@ class DN(object):
         return self._cmp_sequence(other, 0, len(self)) < 0
 
     def _cmp_sequence(self, pattern, self_start, pat_len):
-        self_idx = self_start
-        pat_idx = 0
-        while pat_idx < pat_len:
-            r = cmp_rdns(self.rdns[self_idx], pattern.rdns[pat_idx])
-            if r != 0:
-                return r
-            self_idx += 1
-            pat_idx += 1
-        return 0
+        self_keys = self._get_keys()[self_start:self_start + pat_len]
+        pat_keys = pattern._get_keys()[:pat_len]
+        if self_keys == pat_keys:
+            return 0
+        elif self_keys < pat_keys:
+            return -1
+        else:
+            return 1
 
     def __add__(self, other):
         return self.__class__(self, other)
@@ -167,6 +167,84 @@ def https_request(
         method=method, headers=headers)
 
 
+class HTTPSSession(object):
+    """
+    Client authenticated HTTPS connection kept open across requests.
+
+    A request is sent again on a new connection if the server has closed
+    the connection since the previous one. The object is not thread-safe.
+    """
+
+    def __init__(self, host, port, cafile, client_certfile, client_keyfile):
+        self.host = host
+        self.port = port
+        self.cafile = cafile
+        self.client_certfile = client_certfile
+        self.client_keyfile = client_keyfile
+        self._conn = None
+
+    def _connect(self):
+        return create_https_connection(
+            self.host, self.port,
+            cafile=self.cafile,
+            client_certfile=self.client_certfile,
+            client_keyfile=self.client_keyfile,
+            tls_version_min=api.env.tls_version_min,
+            tls_version_max=api.env.tls_version_max)
+
+    def request(self, url, method='POST', headers=None, body=None, **kw):
+        """
+        Perform a request, see `https_request`.
+        """
+        if body is None:
+            body = urlencode(kw)
+        headers = dict(headers or {})
+        if (
+            method == 'POST'
+            and 'content-type' not in (str(k).lower() for k in headers)
+        ):
+            headers['content-type'] = 'application/x-www-form-urlencoded'
+
+        uri = u'https://%s%s' % (ipautil.format_netloc(self.host, self.port),
+                                 url)
+        logger.debug('request %s %s', method, uri)
+        logger.debug('request body %r', body)
+
+        try:
+            # a kept connection may have been closed by the server
+            for retry in (self._conn is not None, False):
+                if self._conn is None:
+                    self._conn = self._connect()
+                try:
+                    self._conn.request(method, uri, body=body,
+                                       headers=headers)
+                    res = self._conn.getresponse()
+                    http_body = res.read()
+                except (httplib.HTTPException, EnvironmentError):
+                    self.close()
+                    if retry:
+                        continue
+                    raise
+                break
+        except Exception as e:
+            logger.debug("httplib request failed:", exc_info=True)
+            raise NetworkError(uri=uri, error=str(e))
+
+        if res.will_close:
+            self.close()
+
+        logger.debug('response status %d', res.status)
+        logger.debug('response headers %s', res.msg)
+        logger.debug('response body %r', http_body)
+
+        return res.status, res.msg, http_body
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
 def http_request(host, port, url, timeout=None, **kw):
     """
     :param url: The path (not complete URL!) to post to.
@@ -16,10 +16,13 @@ class Graph(object):
         self.vertices = set()
         self.edges = []
         self._adj = dict()
+        # reverse adjacencies, heads to tails
+        self._radj = dict()
 
     def add_vertex(self, vertex):
         self.vertices.add(vertex)
         self._adj[vertex] = []
+        self._radj[vertex] = []
 
     def add_edge(self, tail, head):
         if tail not in self.vertices:
@@ -30,6 +33,7 @@ class Graph(object):
 
         self.edges.append((tail, head))
         self._adj[tail].append(head)
+        self._radj[head].append(tail)
 
     def remove_edge(self, tail, head):
         try:
@@ -39,6 +43,7 @@ class Graph(object):
                 "graph does not contain edge: ({0}, {1})".format(tail, head)
             )
         self._adj[tail].remove(head)
+        self._radj[head].remove(tail)
 
     def remove_vertex(self, vertex):
         try:
@@ -48,27 +53,35 @@ class Graph(object):
                 "graph does not contain vertex: {0}".format(vertex)
             )
 
-        # delete _adjacencies
-        del self._adj[vertex]
-        for adj in self._adj.values():
-            adj[:] = [v for v in adj if v != vertex]
+        # delete _adjacencies of the neighbours only
+        heads = self._adj.pop(vertex)
+        tails = self._radj.pop(vertex)
+        for head in set(heads):
+            if head != vertex:
+                adj = self._radj[head]
+                adj[:] = [v for v in adj if v != vertex]
+        for tail in set(tails):
+            if tail != vertex:
+                adj = self._adj[tail]
+                adj[:] = [v for v in adj if v != vertex]
 
         # delete edges
-        self.edges = [
-            e for e in self.edges if e[0] != vertex and e[1] != vertex
-        ]
+        if heads or tails:
+            self.edges = [
+                e for e in self.edges if e[0] != vertex and e[1] != vertex
+            ]
 
     def get_tails(self, head):
         """
         Get list of vertices where a vertex is on the right side of an edge
         """
-        return [e[0] for e in self.edges if e[1] == head]
+        return list(self._radj.get(head, []))
 
     def get_heads(self, tail):
         """
         Get list of vertices where a vertex is on the left side of an edge
         """
-        return [e[1] for e in self.edges if e[0] == tail]
+        return list(self._adj.get(tail, []))
 
     def bfs(self, start=None):
         """
@@ -86,3 +99,88 @@ class Graph(object):
                 visited.add(vertex)
                 queue.extend(set(self._adj.get(vertex, [])) - visited)
         return visited
+
+    def strongly_connected_components(self, exclude=()):
+        """
+        Find strongly connected components of the graph with Tarjan's
+        algorithm.
+
+        Vertices in `exclude` are left out as if they were removed from the
+        graph, without changing the graph.
+
+        Return a list of sets of vertices. Every component is listed after
+        all components reachable from it.
+        """
+        exclude = set(exclude)
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+
+        for root in self.vertices:
+            if root in index or root in exclude:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._adj[root]))]
+
+            while work:
+                vertex, heads = work[-1]
+                for head in heads:
+                    if head in exclude:
+                        continue
+                    if head not in index:
+                        index[head] = lowlink[head] = len(index)
+                        stack.append(head)
+                        on_stack.add(head)
+                        work.append((head, iter(self._adj[head])))
+                        break
+                    elif head in on_stack:
+                        lowlink[vertex] = min(lowlink[vertex], index[head])
+                else:
+                    # all heads of the vertex are done
+                    work.pop()
+                    if work:
+                        tail = work[-1][0]
+                        lowlink[tail] = min(lowlink[tail], lowlink[vertex])
+                    if lowlink[vertex] == index[vertex]:
+                        component = set()
+                        while True:
+                            v = stack.pop()
+                            on_stack.discard(v)
+                            component.add(v)
+                            if v == vertex:
+                                break
+                        components.append(component)
+
+        return components
+
+    def get_reachable(self, exclude=()):
+        """
+        Find the vertices reachable from every vertex of the graph, with
+        one pass over the strongly connected components.
+
+        Vertices in `exclude` are left out as if they were removed from the
+        graph, without changing the graph.
+
+        Return a dict mapping every vertex which is not excluded to the set
+        of vertices reachable from it, including the vertex itself.
+        """
+        exclude = set(exclude)
+        reachable = {}
+        for component in self.strongly_connected_components(exclude):
+            reach = set(component)
+            successors = set()
+            for vertex in component:
+                for head in self._adj[vertex]:
+                    if head not in exclude and head not in component:
+                        successors.add(head)
+            # components reachable from this one are already done
+            for head in successors:
+                reach |= reachable[head]
+            reach = frozenset(reach)
+            for vertex in component:
+                reachable[vertex] = reach
+        return reachable
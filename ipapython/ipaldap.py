@@ -40,7 +40,11 @@ from cryptography import x509 as crypto_x509
 import ldap
 import ldap.sasl
 import ldap.filter
-from ldap.controls import SimplePagedResultsControl
+from ldap.controls import (
+    RequestControl, ResponseControl, SimplePagedResultsControl)
+from ldap.controls.libldap import MatchedValuesControl
+from pyasn1.codec.ber import decoder, encoder
+from pyasn1.type import namedtype, tag, univ
 import six
 
 # pylint: disable=ipa-forbidden-import
@@ -85,6 +89,119 @@ if six.PY2 and hasattr(ldap, 'LDAPBytesWarning'):
     )
 
 
+class _SortKey(univ.Sequence):
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType('attributeType', univ.OctetString()),
+    )
+
+
+class _SortKeyList(univ.SequenceOf):
+    componentType = _SortKey()
+
+
+class SortRequestControl(RequestControl):
+    """
+    Server side sorting request control (RFC 2891).
+    """
+    controlType = '1.2.840.113556.1.4.473'
+
+    def __init__(self, sort_attrs, criticality=True):
+        super(SortRequestControl, self).__init__(
+            self.controlType, criticality)
+        self.sort_attrs = sort_attrs
+
+    def encodeControlValue(self):
+        keys = _SortKeyList()
+        for i, attr in enumerate(self.sort_attrs):
+            key = _SortKey()
+            key.setComponentByName('attributeType', attr)
+            keys.setComponentByPosition(i, key)
+        return encoder.encode(keys)
+
+
+class _VLVByOffset(univ.Sequence):
+    tagSet = univ.Sequence.tagSet.tagImplicitly(
+        tag.Tag(tag.tagClassContext, tag.tagFormatConstructed, 0))
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType('offset', univ.Integer()),
+        namedtype.NamedType('contentCount', univ.Integer()),
+    )
+
+
+class _VLVTarget(univ.Choice):
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType('byOffset', _VLVByOffset()),
+        namedtype.NamedType(
+            'greaterThanOrEqual',
+            univ.OctetString().subtype(implicitTag=tag.Tag(
+                tag.tagClassContext, tag.tagFormatSimple, 1))),
+    )
+
+
+class _VLVRequest(univ.Sequence):
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType('beforeCount', univ.Integer()),
+        namedtype.NamedType('afterCount', univ.Integer()),
+        namedtype.NamedType('target', _VLVTarget()),
+        namedtype.OptionalNamedType('contextID', univ.OctetString()),
+    )
+
+
+class _VLVResponse(univ.Sequence):
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType('targetPosition', univ.Integer()),
+        namedtype.NamedType('contentCount', univ.Integer()),
+        namedtype.NamedType('virtualListViewResult', univ.Enumerated()),
+        namedtype.OptionalNamedType('contextID', univ.OctetString()),
+    )
+
+
+class VLVRequestControl(RequestControl):
+    """
+    Virtual list view request control (draft-ietf-ldapext-ldapv3-vlv).
+
+    Requests `count` entries of the sorted search result starting at the
+    0-based `offset`. Must be used together with `SortRequestControl`.
+    """
+    controlType = '2.16.840.1.113730.3.4.9'
+
+    def __init__(self, offset, count, criticality=True):
+        super(VLVRequestControl, self).__init__(
+            self.controlType, criticality)
+        self.offset = offset
+        self.count = count
+
+    def encodeControlValue(self):
+        by_offset = _VLVByOffset()
+        # the offset is 1-based, content count 0 means the server's estimate
+        by_offset.setComponentByName('offset', self.offset + 1)
+        by_offset.setComponentByName('contentCount', 0)
+        target = _VLVTarget()
+        target.setComponentByName('byOffset', by_offset)
+        request = _VLVRequest()
+        request.setComponentByName('beforeCount', 0)
+        request.setComponentByName('afterCount', max(self.count - 1, 0))
+        request.setComponentByName('target', target)
+        return encoder.encode(request)
+
+
+class VLVResponseControl(ResponseControl):
+    """
+    Virtual list view response control.
+
+    `content_count` is the number of entries in the whole sorted search
+    result, `result` is the LDAP result code of the virtual list view.
+    """
+    controlType = '2.16.840.1.113730.3.4.10'
+
+    def decodeControlValue(self, encodedControlValue):
+        value, _rest = decoder.decode(
+            encodedControlValue, asn1Spec=_VLVResponse())
+        self.target_position = int(value.getComponentByName('targetPosition'))
+        self.content_count = int(value.getComponentByName('contentCount'))
+        self.result = int(value.getComponentByName('virtualListViewResult'))
+
+
 class _ServerSchema(object):
     '''
     Properties of a schema retrieved from an LDAP server.
@@ -294,6 +411,9 @@ class LDAPEntry(collections.MutableMapping):
         raw_adds = set(raw) - set(raw_sync)
         raw_dels = set(raw_sync) - set(raw)
 
+        if nice_adds or nice_dels:
+            raw = self._unshare_raw(name)
+
         for value in nice_dels:
             value = self._conn.encode(value)
             if value in raw_adds:
@@ -326,11 +446,38 @@ class LDAPEntry(collections.MutableMapping):
                 continue
             nice.append(value)
 
-        self._sync[name] = (deepcopy(nice), deepcopy(raw))
+        # raw values are immutable bytes, no need to deep copy them
+        self._sync[name] = (deepcopy(nice), list(raw))
 
         if len(nice) > 1:
             self._not_list.discard(name)
 
+    def _unshare_raw(self, name):
+        """
+        Make sure the raw value list of `name` can be modified in place.
+
+        Entries loaded by `_load_raw` share their value lists with the
+        original values, they are copied only when they are about to be
+        modified.
+        """
+        value = self._raw[name]
+        if value is self._orig_raw.get(name):
+            value = self._raw[name] = list(value)
+        return value
+
+    def _load_raw(self, attrs):
+        """
+        Initialize the entry with raw attribute values received from the
+        server.
+        """
+        for name, value in attrs.items():
+            name = self._add_attr_name(self._attr_name(name))
+            self._raw[name] = value
+            self._nice[name] = None
+        # the value lists are not referenced anywhere else, there is no
+        # need to copy them before they are modified
+        self._orig_raw = dict(self._raw)
+
     def _attr_name(self, name):
         if not isinstance(name, six.string_types):
             raise TypeError(
@@ -440,7 +587,7 @@ class LDAPEntry(collections.MutableMapping):
 
         return value
 
-    def _get_raw(self, name):
+    def _get_raw(self, name, unshare=True):
         name = self._get_attr_name(name)
 
         value = self._raw[name]
@@ -451,7 +598,10 @@ class LDAPEntry(collections.MutableMapping):
         if self._nice[name] is not None:
             self._sync_attr(name)
 
-        return value
+        if unshare:
+            # the caller may modify the list
+            return self._unshare_raw(name)
+        return self._raw[name]
 
     def __getitem__(self, name):
         return self._get_nice(name)
@@ -498,7 +648,10 @@ class LDAPEntry(collections.MutableMapping):
         if other is None:
             other = self
         assert isinstance(other, LDAPEntry)
-        self._orig_raw = deepcopy(dict(other.raw))
+        self._orig_raw = {
+            name: list(other._get_raw(name, unshare=False))
+            for name in other
+        }
 
     def generate_modlist(self):
         modlist = []
@@ -506,7 +659,10 @@ class LDAPEntry(collections.MutableMapping):
         names = set(self)
         names.update(self._orig_raw)
         for name in names:
-            new = self.raw.get(name, [])
+            if name in self:
+                new = self._get_raw(name, unshare=False)
+            else:
+                new = []
             old = self._orig_raw.get(name, [])
             if old and not new:
                 modlist.append((ldap.MOD_DELETE, name, None))
@@ -703,6 +859,19 @@ class LDAPClient(object):
     time_limit = -1.0   # unlimited
     size_limit = 0      # unlimited
 
+    # functions converting the LDAP representation of a value to the
+    # Python type of its attribute; other types are called with the value
+    _DECODERS = {
+        bytes: lambda val: val,
+        unicode: lambda val: val.decode('utf-8'),
+        datetime.datetime: lambda val: datetime.datetime.strptime(
+            val.decode('utf-8'), LDAP_GENERALIZED_TIME_FORMAT),
+        DNSName: lambda val: DNSName.from_text(val.decode('utf-8')),
+        DN: lambda val: DN(val.decode('utf-8')),
+        Principal: lambda val: Principal(val.decode('utf-8')),
+        crypto_x509.Certificate: x509.load_der_x509_certificate,
+    }
+
     def __init__(self, ldap_uri, start_tls=False, force_schema_updates=False,
                  no_schema=False, decode_attrs=True, cacert=None,
                  sasl_nocanon=False):
@@ -741,6 +910,7 @@ class LDAPClient(object):
 
         self._has_schema = False
         self._schema = None
+        self._decoders = {}
 
         self._conn = self._connect()
 
@@ -804,6 +974,8 @@ class LDAPClient(object):
         # bypass ldap2's locking
         object.__setattr__(self, '_has_schema', False)
         object.__setattr__(self, '_schema', None)
+        # the decoders were chosen according to the old schema
+        object.__setattr__(self, '_decoders', {})
 
     def get_attribute_type(self, name_or_oid):
         if not self._decode_attrs:
@@ -893,36 +1065,49 @@ class LDAPClient(object):
         else:
             raise TypeError("attempt to pass unsupported type to ldap, value=%s type=%s" %(val, type(val)))
 
+    def _get_decoder(self, attr):
+        """
+        Get the function decoding values of attribute `attr`.
+
+        The function is looked up in the schema only once per attribute
+        and schema, see `_flush_schema`.
+        """
+        key = attr.lower()
+        try:
+            return self._decoders[key]
+        except KeyError:
+            pass
+
+        target_type = self.get_attribute_type(attr)
+        decoder = self._DECODERS.get(target_type, target_type)
+        self._decoders[key] = decoder
+        return decoder
+
+    def _decode_value(self, decoder, val, attr):
+        try:
+            return decoder(val)
+        except Exception:
+            target_type = self.get_attribute_type(attr)
+            msg = 'unable to convert the attribute %r value %r to type %s' % (
+                attr, val, target_type)
+            logger.error('%s', msg)
+            raise ValueError(msg)
+
     def decode(self, val, attr):
         """
         Decode attribute value from LDAP representation (str/bytes).
         """
         if isinstance(val, bytes):
-            target_type = self.get_attribute_type(attr)
-            try:
-                if target_type is bytes:
-                    return val
-                elif target_type is unicode:
-                    return val.decode('utf-8')
-                elif target_type is datetime.datetime:
-                    return datetime.datetime.strptime(
-                        val.decode('utf-8'), LDAP_GENERALIZED_TIME_FORMAT)
-                elif target_type is DNSName:
-                    return DNSName.from_text(val.decode('utf-8'))
-                elif target_type in (DN, Principal):
-                    return target_type(val.decode('utf-8'))
-                elif target_type is crypto_x509.Certificate:
-                    return x509.load_der_x509_certificate(val)
-                else:
-                    return target_type(val)
-            except Exception:
-                msg = 'unable to convert the attribute %r value %r to type %s' % (attr, val, target_type)
-                logger.error('%s', msg)
-                raise ValueError(msg)
-        elif isinstance(val, list):
-            return [self.decode(m, attr) for m in val]
-        elif isinstance(val, tuple):
-            return tuple(self.decode(m, attr) for m in val)
+            return self._decode_value(self._get_decoder(attr), val, attr)
+        elif isinstance(val, (list, tuple)):
+            if all(isinstance(m, bytes) for m in val):
+                decoder = self._get_decoder(attr)
+                result = [self._decode_value(decoder, m, attr) for m in val]
+            else:
+                result = [self.decode(m, attr) for m in val]
+            if isinstance(val, tuple):
+                return tuple(result)
+            return result
         elif isinstance(val, dict):
             dct = {
                 k.decode('utf-8'): self.decode(v, k) for k, v in val.items()
@@ -959,10 +1144,7 @@ class LDAPClient(object):
                 continue
 
             ipa_entry = LDAPEntry(self, DN(original_dn))
-
-            for attr, original_values in original_attrs.items():
-                ipa_entry.raw[attr] = original_values
-            ipa_entry.reset_modlist()
+            ipa_entry._load_raw(original_attrs)
 
             ipa_result.append(ipa_entry)
 
@@ -1332,9 +1514,30 @@ class LDAPClient(object):
         :param kwargs: additional keyword arguments. See find_entries method
         for their description.
         """
-        entries, truncated = self.find_entries(
-            base_dn=base_dn, scope=scope, filter=filter, attrs_list=attrs_list,
-            **kwargs)
+        return list(self.iter_entries(
+            base_dn, scope=scope, filter=filter, attrs_list=attrs_list,
+            **kwargs))
+
+    def iter_entries(self, base_dn, scope=ldap.SCOPE_SUBTREE, filter=None,
+                     attrs_list=None, **kwargs):
+        """Generate matching entries.
+
+        Same as `get_entries`, but with paged_search the entries are
+        generated page by page as they are received from the server, so
+        that only one page of entries is held in memory at a time.
+
+        :raises: errors.LimitsExceeded after all received entries have been
+                 generated if the result is truncated by the server
+        :raises: errors.NotFound if result set is empty
+                                 or base_dn doesn't exist
+        """
+        truncated = False
+        for entries, truncated in self.find_entry_pages(
+                base_dn=base_dn, scope=scope, filter=filter,
+                attrs_list=attrs_list, **kwargs):
+            for entry in entries:
+                yield entry
+
         try:
             self.handle_truncated_result(truncated)
         except errors.LimitsExceeded as e:
@@ -1344,11 +1547,10 @@ class LDAPClient(object):
             )
             raise
 
-        return entries
-
     def find_entries(self, filter=None, attrs_list=None, base_dn=None,
                      scope=ldap.SCOPE_SUBTREE, time_limit=None,
-                     size_limit=None, paged_search=False):
+                     size_limit=None, paged_search=False, sort_attrs=None,
+                     matched_values=None):
         """
         Return a list of entries and indication of whether the results were
         truncated ([(dn, entry_attrs)], truncated) matching specified search
@@ -1363,17 +1565,139 @@ class LDAPClient(object):
         size_limit -- size (number of entries returned) limit
             (default unlimited)
         paged_search -- search using paged results control
+        sort_attrs -- list of attributes to sort the entries by on the server
+            (default unsorted)
+        matched_values -- values return filter, e.g. '((member=...))'. If
+            the server supports it, only the attribute values matching the
+            filter are returned (default all values)
 
         :raises: errors.NotFound if result set is empty
                                  or base_dn doesn't exist
         """
+        res = []
+        truncated = False
+        for entries, truncated in self.find_entry_pages(
+                filter, attrs_list, base_dn, scope, time_limit=time_limit,
+                size_limit=size_limit, paged_search=paged_search,
+                sort_attrs=sort_attrs, matched_values=matched_values):
+            res.extend(entries)
+
+        return (res, truncated)
+
+    def find_entry_pages(self, filter=None, attrs_list=None, base_dn=None,
+                         scope=ldap.SCOPE_SUBTREE, time_limit=None,
+                         size_limit=None, paged_search=False,
+                         sort_attrs=None, matched_values=None):
+        """
+        Generate the entries matching specified search parameters in pages.
+
+        Yields (entries, truncated) tuples. With paged_search, every tuple
+        holds the entries of one page of paged results, otherwise all
+        entries are yielded at once. truncated is False in all tuples but
+        the last one, where it has the same meaning as in `find_entries`.
+
+        Closing the generator before it is exhausted cancels a paged search.
+
+        The arguments are the same as of `find_entries`.
+
+        :raises: errors.NotFound if result set is empty
+                                 or base_dn doesn't exist
+        """
+        search_args = self._get_search_args(
+            filter, attrs_list, base_dn, scope, time_limit, size_limit)
+        size_limit = search_args[5]
+
+        page_size = (size_limit if size_limit > 0 else 2000) - 1
+        if page_size == 0 or not paged_search:
+            page_size = None
+
+        found = False
+        cookie = ''
+        try:
+            while True:
+                entries, cookie, truncated = self._find_entries_page(
+                    search_args, page_size, cookie, sort_attrs,
+                    matched_values)
+                found = found or bool(entries) or bool(truncated)
+                if truncated or not cookie:
+                    break
+                if entries:
+                    yield (entries, False)
+        except GeneratorExit:
+            if cookie:
+                self._cancel_paged_search(search_args, cookie)
+            raise
+
+        if not found:
+            raise errors.EmptyResult(reason='no matching entry found')
+
+        yield (entries, truncated)
+
+    def find_entries_multi(self, searches):
+        """
+        Perform several searches at once and return their results.
+
+        All searches are sent to the server before any result is read, so
+        that the server processes them while the results of the preceding
+        searches are received, instead of one round trip after another.
+
+        :param searches: list of dicts of keyword arguments of
+            `find_entries`, except paged_search, sort_attrs and
+            matched_values
+        :returns: list of (entries, truncated) tuples, one for each search in
+            the same order, see `find_entries`. Unlike `find_entries`, a
+            search with no matching entries returns ([], False).
+
+        :raises: errors.NotFound if the base_dn of any search doesn't exist
+        """
+        search_args = [
+            self._get_search_args(**search) for search in searches]
+
+        results = []
+        error = None
+        with self.error_handler():
+            msgids = [
+                self.conn.search_ext(
+                    base_dn, scope, filter, attrs_list,
+                    timeout=time_limit, sizelimit=size_limit)
+                for base_dn, scope, filter, attrs_list, time_limit, size_limit
+                in search_args
+            ]
+
+            # read all results, even if a search has failed
+            for msgid in msgids:
+                entries = []
+                truncated = False
+                try:
+                    self._get_search_results(msgid, entries)
+                except ldap.ADMINLIMIT_EXCEEDED:
+                    truncated = TRUNCATED_ADMIN_LIMIT
+                except ldap.SIZELIMIT_EXCEEDED:
+                    truncated = TRUNCATED_SIZE_LIMIT
+                except ldap.TIMELIMIT_EXCEEDED:
+                    truncated = TRUNCATED_TIME_LIMIT
+                except ldap.LDAPError as e:
+                    if error is None:
+                        error = e
+                results.append((entries, truncated))
+
+            if error is not None:
+                raise error
+
+        return results
+
+    def _get_search_args(self, filter=None, attrs_list=None, base_dn=None,
+                         scope=ldap.SCOPE_SUBTREE, time_limit=None,
+                         size_limit=None):
+        """
+        Return arguments of `find_entries` as the tuple (base_dn, scope,
+        filter, attrs_list, time_limit, size_limit) to pass to python-ldap.
+        """
         if base_dn is None:
             base_dn = DN()
         assert isinstance(base_dn, DN)
         if not filter:
             filter = '(objectClass=*)'
-        res = []
-        truncated = False
 
         if time_limit is None:
             time_limit = self.time_limit
@@ -1391,82 +1715,174 @@ class LDAPClient(object):
         if attrs_list:
             attrs_list = [a.lower() for a in set(attrs_list)]
 
-        sctrls = None
-        cookie = ''
-        page_size = (size_limit if size_limit > 0 else 2000) - 1
-        if page_size == 0:
-            paged_search = False
+        if six.PY2:
+            filter = self.encode(filter)
+            attrs_list = self.encode(attrs_list)
+
+        return (str(base_dn), scope, filter, attrs_list, time_limit,
+                size_limit)
+
+    def _get_search_results(self, msgid, entries, resp_ctrl_classes=None):
+        """
+        Read the results of the search with the given message ID.
+
+        Append the entries found to the list entries as they are received,
+        so that they are kept if the search fails later on. Return the
+        result controls, decoded by resp_ctrl_classes if given.
+        """
+        while True:
+            result = self.conn.result3(
+                msgid, 0, resp_ctrl_classes=resp_ctrl_classes)
+            objtype, res_list, _res_id, res_ctrls = result
+            if objtype == ldap.RES_SEARCH_RESULT:
+                break
+            res_list = self._convert_result(res_list)
+            if res_list:
+                entries.append(res_list[0])
+
+        return res_ctrls
+
+    def _find_entries_page(self, search_args, page_size, cookie,
+                           sort_attrs=None, matched_values=None):
+        """
+        Search for the page of entries identified by cookie, or for all
+        entries if page_size is None.
+
+        Return (entries, cookie, truncated), where cookie identifies the
+        next page, or is empty if this was the last page.
+        """
+        base_dn, scope, filter, attrs_list, time_limit, size_limit = (
+            search_args)
+        entries = []
+        truncated = False
+        next_cookie = ''
+        sctrls = []
+        if sort_attrs:
+            sctrls.append(SortRequestControl(sort_attrs))
+        if matched_values:
+            if six.PY2:
+                matched_values = self.encode(matched_values)
+            sctrls.append(MatchedValuesControl(False, matched_values))
+        if page_size is not None:
+            sctrls.append(SimplePagedResultsControl(0, page_size, cookie))
 
         # pass arguments to python-ldap
         with self.error_handler():
-            if six.PY2:
-                filter = self.encode(filter)
-                attrs_list = self.encode(attrs_list)
+            try:
+                id = self.conn.search_ext(
+                    base_dn, scope, filter, attrs_list,
+                    serverctrls=sctrls or None, timeout=time_limit,
+                    sizelimit=size_limit
+                )
+                res_ctrls = self._get_search_results(id, entries)
 
-            while True:
-                if paged_search:
-                    sctrls = [SimplePagedResultsControl(0, page_size, cookie)]
+                if page_size is not None:
+                    # Get cookie for the next page
+                    for ctrl in res_ctrls:
+                        if isinstance(ctrl, SimplePagedResultsControl):
+                            next_cookie = ctrl.cookie
+                            break
+            except ldap.ADMINLIMIT_EXCEEDED:
+                truncated = TRUNCATED_ADMIN_LIMIT
+            except ldap.SIZELIMIT_EXCEEDED:
+                truncated = TRUNCATED_SIZE_LIMIT
+            except ldap.TIMELIMIT_EXCEEDED:
+                truncated = TRUNCATED_TIME_LIMIT
+            except ldap.LDAPError as e:
+                # If paged search is in progress, try to cancel it
+                if page_size is not None and cookie:
+                    self._cancel_paged_search(search_args, cookie)
 
                 try:
-                    id = self.conn.search_ext(
-                        str(base_dn), scope, filter, attrs_list,
-                        serverctrls=sctrls, timeout=time_limit,
-                        sizelimit=size_limit
-                    )
-                    while True:
-                        result = self.conn.result3(id, 0)
-                        objtype, res_list, _res_id, res_ctrls = result
-                        if objtype == ldap.RES_SEARCH_RESULT:
-                            break
-                        res_list = self._convert_result(res_list)
-                        if res_list:
-                            res.append(res_list[0])
-
-                    if paged_search:
-                        # Get cookie for the next page
-                        for ctrl in res_ctrls:
-                            if isinstance(ctrl, SimplePagedResultsControl):
-                                cookie = ctrl.cookie
-                                break
-                        else:
-                            cookie = ''
-                except ldap.ADMINLIMIT_EXCEEDED:
-                    truncated = TRUNCATED_ADMIN_LIMIT
-                    break
-                except ldap.SIZELIMIT_EXCEEDED:
-                    truncated = TRUNCATED_SIZE_LIMIT
-                    break
-                except ldap.TIMELIMIT_EXCEEDED:
-                    truncated = TRUNCATED_TIME_LIMIT
-                    break
-                except ldap.LDAPError as e:
-                    # If paged search is in progress, try to cancel it
-                    if paged_search and cookie:
-                        sctrls = [SimplePagedResultsControl(0, 0, cookie)]
-                        try:
-                            self.conn.search_ext_s(
-                                str(base_dn), scope, filter, attrs_list,
-                                serverctrls=sctrls, timeout=time_limit,
-                                sizelimit=size_limit)
-                        except ldap.LDAPError as e:
-                            logger.warning(
-                                "Error cancelling paged search: %s", e)
-                        cookie = ''
-
-                    try:
-                        raise e
-                    except (ldap.ADMINLIMIT_EXCEEDED, ldap.TIMELIMIT_EXCEEDED,
-                            ldap.SIZELIMIT_EXCEEDED):
-                        truncated = True
-                        break
+                    raise e
+                except (ldap.ADMINLIMIT_EXCEEDED, ldap.TIMELIMIT_EXCEEDED,
+                        ldap.SIZELIMIT_EXCEEDED):
+                    truncated = True
 
-                if not paged_search or not cookie:
-                    break
+        return (entries, next_cookie, truncated)
 
-        if not res and not truncated:
-            raise errors.EmptyResult(reason='no matching entry found')
+    def find_entries_window(self, filter=None, attrs_list=None, base_dn=None,
+                            scope=ldap.SCOPE_SUBTREE, sort_attrs=None,
+                            offset=0, count=1, time_limit=None,
+                            size_limit=None):
+        """
+        Return a window of the entries matching specified search parameters,
+        as sorted by the server.
 
-        return (res, truncated)
+        Uses the virtual list view control, so only the requested entries
+        are sent by the server, which is efficient for large results if the
+        server has a matching VLV index.
+
+        Keyword arguments:
+        sort_attrs -- list of attributes to sort the entries by
+        offset -- 0-based offset of the first entry in the sorted result
+        count -- maximum number of entries to return
+
+        The other arguments are the same as of `find_entries`.
+
+        :returns: (entries, truncated, total) where total is the number of
+            all matching entries as estimated by the server, or None if the
+            search was truncated. Unlike `find_entries`, an empty window
+            returns ([], False, total).
+
+        :raises: errors.NotFound if base_dn doesn't exist
+        """
+        if not sort_attrs:
+            raise ValueError("sort_attrs is required")
+
+        search_args = self._get_search_args(
+            filter, attrs_list, base_dn, scope, time_limit, size_limit)
+        base_dn, scope, filter, attrs_list, time_limit, size_limit = (
+            search_args)
+        sctrls = [
+            SortRequestControl(sort_attrs),
+            VLVRequestControl(offset, count),
+        ]
+
+        entries = []
+        truncated = False
+        total = None
+        with self.error_handler():
+            try:
+                msgid = self.conn.search_ext(
+                    base_dn, scope, filter, attrs_list,
+                    serverctrls=sctrls, timeout=time_limit,
+                    sizelimit=size_limit
+                )
+                res_ctrls = self._get_search_results(
+                    msgid, entries,
+                    resp_ctrl_classes={
+                        VLVResponseControl.controlType: VLVResponseControl,
+                    })
+            except ldap.ADMINLIMIT_EXCEEDED:
+                truncated = TRUNCATED_ADMIN_LIMIT
+            except ldap.SIZELIMIT_EXCEEDED:
+                truncated = TRUNCATED_SIZE_LIMIT
+            except ldap.TIMELIMIT_EXCEEDED:
+                truncated = TRUNCATED_TIME_LIMIT
+            else:
+                for ctrl in res_ctrls:
+                    if isinstance(ctrl, VLVResponseControl):
+                        if ctrl.result != 0:
+                            raise errors.DatabaseError(
+                                desc='Virtual list view failed',
+                                info='result code %d' % ctrl.result)
+                        total = ctrl.content_count
+                        break
+
+        return (entries, truncated, total)
+
+    def _cancel_paged_search(self, search_args, cookie):
+        base_dn, scope, filter, attrs_list, time_limit, size_limit = (
+            search_args)
+        sctrls = [SimplePagedResultsControl(0, 0, cookie)]
+        try:
+            self.conn.search_ext_s(
+                base_dn, scope, filter, attrs_list,
+                serverctrls=sctrls, timeout=time_limit,
+                sizelimit=size_limit)
+        except ldap.LDAPError as e:
+            logger.warning("Error cancelling paged search: %s", e)
 
     def find_entry_by_attr(self, attr, value, object_class, attrs_list=None,
                            base_dn=None):
@@ -22,6 +22,7 @@
 # Make sure we only run this module at the server where samba4-python
 # package is installed to avoid issues with unavailable modules
 
+import contextlib
 import logging
 import re
 import time
@@ -31,10 +32,12 @@ from ipalib import errors
 from ipapython import ipautil
 from ipapython.dn import DN
 from ipaserver.install import installutils
+from ipaserver.plugins.ldap2 import krb5ccname
 from ipaserver.dcerpc_common import (TRUST_BIDIRECTIONAL,
                                      TRUST_JOIN_EXTERNAL,
                                      trust_type_string)
 
+from ipalib.request import context
 from ipalib.util import normalize_name
 
 import os
@@ -81,6 +84,20 @@ and Samba4 python bindings.
 logger = logging.getLogger(__name__)
 
 
+@contextlib.contextmanager
+def _request_ccache():
+    """
+    Point KRB5CCNAME to the ccache of the current request, if any, while
+    Samba credentials look up the default ccache.
+    """
+    ccache = getattr(context, 'ccache_name', None)
+    if ccache is None:
+        yield
+    else:
+        with krb5ccname(ccache):
+            yield
+
+
 def is_sid_valid(sid):
     try:
         security.dom_sid(sid)
@@ -717,35 +734,37 @@ class DomainValidator(object):
              _principal) = self.kinit_as_administrator(info['dns_domain'])
 
         if ccache_name:
-            with ipautil.private_ccache(path=ccache_name):
-                entries = None
-
-                try:
-                    ldap_uri = ipaldap.get_ldap_uri(host)
-                    conn = ipaldap.LDAPClient(
-                        ldap_uri,
-                        no_schema=True,
-                        decode_attrs=False,
-                        sasl_nocanon=True)
-                    # sasl_nocanon used to avoid hard requirement for PTR
-                    # records pointing back to the same host name
+            entries = None
 
+            try:
+                ldap_uri = ipaldap.get_ldap_uri(host)
+                conn = ipaldap.LDAPClient(
+                    ldap_uri,
+                    no_schema=True,
+                    decode_attrs=False,
+                    sasl_nocanon=True)
+                # sasl_nocanon used to avoid hard requirement for PTR
+                # records pointing back to the same host name
+
+                with krb5ccname(ccache_name):
                     conn.gssapi_bind()
 
-                    if basedn is None:
-                        # Use domain root base DN
-                        basedn = ipautil.realm_to_suffix(info['dns_domain'])
+                if basedn is None:
+                    # Use domain root base DN
+                    basedn = ipautil.realm_to_suffix(info['dns_domain'])
 
-                    entries = conn.get_entries(basedn, scope, filter, attrs)
-                except Exception as e:
-                    msg = "Search on AD DC {host}:{port} failed with: {err}"\
-                          .format(host=host, port=str(port), err=str(e))
-                    if quiet:
-                        logger.debug('%s', msg)
-                    else:
-                        logger.warning('%s', msg)
+                entries = conn.get_entries(basedn, scope, filter, attrs)
+            except Exception as e:
+                msg = "Search on AD DC {host}:{port} failed with: {err}"\
+                      .format(host=host, port=str(port), err=str(e))
+                if quiet:
+                    logger.debug('%s', msg)
+                else:
+                    logger.warning('%s', msg)
+            finally:
+                installutils.remove_file(ccache_name)
 
-                return entries
+            return entries
 
     def __retrieve_trusted_domain_gc_list(self, domain):
         """
@@ -765,7 +784,8 @@ class DomainValidator(object):
             self._parm.set('netbios name', self.flatname)
             self._creds = credentials.Credentials()
             self._creds.set_kerberos_state(credentials.MUST_USE_KERBEROS)
-            self._creds.guess(self._parm)
+            with _request_ccache():
+                self._creds.guess(self._parm)
             self._creds.set_workstation(self.flatname)
 
         netrc = net.Net(creds=self._creds, lp=self._parm)
@@ -1449,7 +1469,8 @@ def fetch_domains(api, mydomain, trustdomain, creds=None, server=None):
         # Rely on existing Kerberos credentials in the environment
         td.creds = credentials.Credentials()
         td.creds.set_kerberos_state(credentials.MUST_USE_KERBEROS)
-        td.creds.guess(td.parm)
+        with _request_ccache():
+            td.creds.guess(td.parm)
         td.creds.set_workstation(domain_validator.flatname)
         domains = communicate(td)
     else:
@@ -1468,10 +1489,13 @@ def fetch_domains(api, mydomain, trustdomain, creds=None, server=None):
         td.creds = credentials.Credentials()
         td.creds.set_kerberos_state(credentials.MUST_USE_KERBEROS)
         if ccache_name:
-            with ipautil.private_ccache(path=ccache_name):
-                td.creds.guess(td.parm)
+            try:
+                with krb5ccname(ccache_name):
+                    td.creds.guess(td.parm)
                 td.creds.set_workstation(domain_validator.flatname)
                 domains = communicate(td)
+            finally:
+                installutils.remove_file(ccache_name)
 
     if domains is None:
         return None
@@ -1573,7 +1597,8 @@ class TrustDomainJoins(object):
         ld = TrustDomainInstance(self.local_flatname)
         ld.creds = credentials.Credentials()
         ld.creds.set_kerberos_state(credentials.MUST_USE_KERBEROS)
-        ld.creds.guess(ld.parm)
+        with _request_ccache():
+            ld.creds.guess(ld.parm)
         ld.creds.set_workstation(ld.hostname)
         ld.retrieve(installutils.get_fqdn())
         self.local_domain = ld
@@ -528,8 +528,11 @@ class LDAPUpdate(object):
 
         return all_updates
 
-    def create_index_task(self, attribute):
-        """Create a task to update an index for an attribute"""
+    def create_index_task(self, attribute, vlv=False):
+        """Create a task to update an index for an attribute
+
+        If vlv is True, attribute is the name of a VLV index instead.
+        """
 
         # Sleep a bit to ensure previous operations are complete
         time.sleep(5)
@@ -546,8 +549,11 @@ class LDAPUpdate(object):
             objectClass=['top', 'extensibleObject'],
             cn=[cn],
             nsInstance=['userRoot'],
-            nsIndexAttribute=[attribute],
         )
+        if vlv:
+            e['nsIndexVLVAttribute'] = [attribute]
+        else:
+            e['nsIndexAttribute'] = [attribute]
 
         logger.debug("Creating task to index attribute: %s", attribute)
         logger.debug("Task id: %s", dn)
@@ -861,6 +867,15 @@ class LDAPUpdate(object):
                                 ('cn', 'config'))) and (added or updated):
             taskid = self.create_index_task(entry.single_value['cn'])
             self.monitor_index_task(taskid)
+        elif (entry.dn.endswith(DN(('cn', 'userRoot'),
+                                   ('cn', 'ldbm database'), ('cn', 'plugins'),
+                                   ('cn', 'config'))) and
+                'vlvindex' in [o.lower()
+                               for o in entry.get('objectclass', [])] and
+                (added or updated)):
+            taskid = self.create_index_task(entry.single_value['cn'],
+                                            vlv=True)
+            self.monitor_index_task(taskid)
         return
 
     def _delete_record(self, updates):
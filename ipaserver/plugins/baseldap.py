@@ -639,6 +639,34 @@ class LDAPObject(Object):
         oc = [x.lower() for x in classes]
         return objectclass.lower() in oc
 
+    def _get_member_object(self, memberdn, ldap_obj_names, container_dns):
+        """
+        Return the first of the LDAP objects whose container contains
+        memberdn, or None.
+        """
+        for ldap_obj_name in ldap_obj_names:
+            try:
+                container_dn = container_dns[ldap_obj_name]
+            except KeyError:
+                ldap_obj = self.api.Object[ldap_obj_name]
+                container_dn = DN(ldap_obj.container_dn, api.env.basedn)
+                container_dns[ldap_obj_name] = container_dn
+
+            if memberdn.endswith(container_dn):
+                return self.api.Object[ldap_obj_name]
+        return None
+
+    def _get_member_pkey_attr(self, ldap_obj):
+        """
+        Return the name of the primary key if it can be taken from the first
+        RDN of a member DN as is, otherwise None.
+        """
+        if (ldap_obj.rdn_attribute or not ldap_obj.primary_key or
+                type(ldap_obj).get_primary_key_from_dn !=
+                LDAPObject.get_primary_key_from_dn):
+            return None
+        return ldap_obj.primary_key.name
+
     def convert_attribute_members(self, entry_attrs, *keys, **options):
         if options.get('raw', False):
             return
@@ -653,85 +681,228 @@ class LDAPObject(Object):
                 continue
             del entry_attrs[attr]
 
+            ldap_obj_names = self.attribute_members[attr]
+            # LDAP object of the members, keyed by the raw parent DN; the
+            # members of a group mostly share a few parent DNs
+            parent_objs = {}
+            pkey_attrs = {}
+
             for member in value:
-                memberdn = DN(member.decode('utf-8'))
-                for ldap_obj_name in self.attribute_members[attr]:
-                    ldap_obj = self.api.Object[ldap_obj_name]
+                rdn, _sep, parent = member.partition(b',')
+                if any(c in rdn for c in (b'\\', b'+', b'"')):
+                    # escaped or multi-valued RDN, parse the whole DN
+                    memberdn = DN(member.decode('utf-8'))
+                    ldap_obj = self._get_member_object(
+                        memberdn, ldap_obj_names, container_dns)
+                    if ldap_obj is None:
+                        continue
+                    new_value = ldap_obj.get_primary_key_from_dn(memberdn)
+                else:
+                    parent_key = parent.lower()
                     try:
-                        container_dn = container_dns[ldap_obj_name]
+                        ldap_obj = parent_objs[parent_key]
                     except KeyError:
-                        container_dn = DN(ldap_obj.container_dn, api.env.basedn)
-                        container_dns[ldap_obj_name] = container_dn
+                        # a member is in a container if its parent is
+                        ldap_obj = self._get_member_object(
+                            DN(parent.decode('utf-8')), ldap_obj_names,
+                            container_dns)
+                        parent_objs[parent_key] = ldap_obj
+                    if ldap_obj is None:
+                        continue
 
-                    if memberdn.endswith(container_dn):
-                        new_value = ldap_obj.get_primary_key_from_dn(memberdn)
-                        new_attr_name = '%s_%s' % (attr, ldap_obj.name)
-                        try:
-                            new_attr = new_attrs[new_attr_name]
-                        except KeyError:
-                            new_attr = entry_attrs.setdefault(new_attr_name, [])
-                            new_attrs[new_attr_name] = new_attr
-                        new_attr.append(new_value)
-                        break
+                    try:
+                        pkey_attr = pkey_attrs[ldap_obj.name]
+                    except KeyError:
+                        pkey_attr = self._get_member_pkey_attr(ldap_obj)
+                        pkey_attrs[ldap_obj.name] = pkey_attr
+
+                    name, _sep, rdn_value = rdn.decode('utf-8').partition(u'=')
+                    if (name == pkey_attr and rdn_value and
+                            rdn_value == rdn_value.strip() and
+                            not rdn_value.startswith(u'#')):
+                        new_value = rdn_value
+                    else:
+                        new_value = ldap_obj.get_primary_key_from_dn(
+                            DN(member.decode('utf-8')))
+
+                new_attr_name = '%s_%s' % (attr, ldap_obj.name)
+                try:
+                    new_attr = new_attrs[new_attr_name]
+                except KeyError:
+                    new_attr = entry_attrs.setdefault(new_attr_name, [])
+                    new_attrs[new_attr_name] = new_attr
+                new_attr.append(new_value)
 
     def get_indirect_members(self, entry_attrs, attrs_list):
+        self.get_indirect_members_multi([entry_attrs], attrs_list)
+
+    def get_indirect_members_multi(self, entries, attrs_list):
+        """
+        Get indirect members and memberships of several entries at once
+        """
         if 'memberindirect' in attrs_list:
-            self.get_memberindirect(entry_attrs)
+            self.get_memberindirect_multi(entries)
         if 'memberofindirect' in attrs_list:
-            self.get_memberofindirect(entry_attrs)
+            self.get_memberofindirect_multi(entries)
 
     def get_memberindirect(self, group_entry):
         """
         Get indirect members
         """
+        self.get_memberindirect_multi([group_entry])
+
+    def get_memberindirect_multi(self, group_entries):
+        """
+        Get indirect members of several groups
+
+        The membership graph is used if available, otherwise the groups
+        nested in any of the groups are searched for at once.
+        """
+        if not group_entries:
+            return
+
+        indirect = self._get_graph_members(group_entries)
+        if indirect is None:
+            indirect = self._search_memberindirect(group_entries)
 
-        mo_filter = self.backend.make_filter({'memberof': group_entry.dn})
+        for group_entry in group_entries:
+            group_indirect = indirect[group_entry.dn].difference(
+                group_entry.raw.get('member', []))
+            if group_indirect:
+                group_entry.raw['memberindirect'] = list(group_indirect)
+
+    def _get_membergraph(self):
+        if 'membergraph' in self.api.Backend:
+            return self.api.Backend.membergraph
+        return None
+
+    def _get_graph_members(self, group_entries):
+        """
+        Return raw indirect members of the groups from the membership graph
+        as a dict keyed by DN, or None if the graph is not available.
+        """
+        membergraph = self._get_membergraph()
+        if membergraph is None:
+            return None
+        members = membergraph.get_members_multi(
+            [group_entry.dn for group_entry in group_entries], indirect=True)
+        if members is None:
+            return None
+        return {
+            dn: set(str(member).encode('utf-8') for member in dn_members)
+            for dn, dn_members in members.items()
+        }
+
+    def _search_memberindirect(self, group_entries):
+        """
+        Search for raw indirect members of the groups, return them as a dict
+        keyed by DN.
+        """
+        indirect = {}
+        for group_entry in group_entries:
+            indirect.setdefault(group_entry.dn, set())
+
+        mo_filter = self.backend.make_filter({'memberof': list(indirect)})
         filter = self.backend.combine_filters(
             ('(member=*)', mo_filter), self.backend.MATCH_ALL)
         try:
-            result = self.backend.get_entries(
-                self.api.env.basedn,
-                filter=filter,
-                attrs_list=['member'],
-                size_limit=-1, # paged search will get everything anyway
-                paged_search=True)
+            for entry in self.backend.iter_entries(
+                    self.api.env.basedn,
+                    filter=filter,
+                    attrs_list=['member', 'memberof'],
+                    size_limit=-1, # paged search will get everything anyway
+                    paged_search=True):
+                members = entry.raw.get('member', [])
+                for memberof in entry.raw.get('memberof', []):
+                    try:
+                        group_indirect = indirect[DN(memberof.decode('utf-8'))]
+                    except KeyError:
+                        continue
+                    group_indirect.update(members)
         except errors.NotFound:
-            result = []
-
-        indirect = set()
-        for entry in result:
-            indirect.update(entry.raw.get('member', []))
-        indirect.difference_update(group_entry.raw.get('member', []))
+            pass
 
-        if indirect:
-            group_entry.raw['memberindirect'] = list(indirect)
+        return indirect
 
     def get_memberofindirect(self, entry):
+        self.get_memberofindirect_multi([entry])
+
+    def get_memberofindirect_multi(self, entries):
+        """
+        Get indirect memberships of several entries
+
+        The membership graph is used if available, otherwise the groups of
+        which any of the entries is a direct member are searched for at once.
+        """
+        if not entries:
+            return
+
+        direct = self._get_graph_memberof(entries)
+        if direct is None:
+            direct = self._search_direct_memberof(entries)
 
-        dn = entry.dn
+        for entry in entries:
+            memberof = set(entry.raw.get('memberof', []))
+            entry_direct = memberof.intersection(direct[entry.dn])
+            indirect = memberof.difference(entry_direct)
+            entry.raw['memberof'] = list(entry_direct)
+            if indirect:
+                entry.raw['memberofindirect'] = list(indirect)
+
+    def _get_graph_memberof(self, entries):
+        """
+        Return raw DNs of the direct parents of the entries from the
+        membership graph as a dict keyed by DN, or None if the graph is not
+        available.
+        """
+        membergraph = self._get_membergraph()
+        if membergraph is None:
+            return None
+        parents = membergraph.get_memberof_multi(
+            [entry.dn for entry in entries])
+        if parents is None:
+            return None
+        return {
+            dn: set(str(parent).encode('utf-8') for parent in dn_parents)
+            for dn, dn_parents in parents.items()
+        }
+
+    def _search_direct_memberof(self, entries):
+        """
+        Search for raw DNs of the direct parents of the entries, return them
+        as a dict keyed by DN.
+        """
+        member_attrs = ('member', 'memberuser', 'memberhost')
+        direct = {}
+        for entry in entries:
+            direct.setdefault(entry.dn, set())
+
+        dns = list(direct)
         filter = self.backend.make_filter(
-            {'member': dn, 'memberuser': dn, 'memberhost': dn})
+            {attr: dns for attr in member_attrs})
+        # only the values referring to the entries are needed
+        matched_values = '(%s)' % ''.join(
+            self.backend.make_filter_from_attr(attr, dn)
+            for attr in member_attrs for dn in dns)
         try:
-            result = self.backend.get_entries(
-                self.api.env.basedn,
-                filter=filter,
-                attrs_list=[''],
-                size_limit=-1,  # paged search will get everything anyway
-                paged_search=True)
+            for group_entry in self.backend.iter_entries(
+                    self.api.env.basedn,
+                    filter=filter,
+                    attrs_list=list(member_attrs),
+                    size_limit=-1,  # paged search will get everything anyway
+                    paged_search=True,
+                    matched_values=matched_values):
+                group_dn = str(group_entry.dn).encode('utf-8')
+                for attr in member_attrs:
+                    for member in group_entry.raw.get(attr, []):
+                        try:
+                            direct[DN(member.decode('utf-8'))].add(group_dn)
+                        except KeyError:
+                            pass
         except errors.NotFound:
-            result = []
-
-        direct = set()
-        indirect = set(entry.raw.get('memberof', []))
-        for group_entry in result:
-            dn = str(group_entry.dn).encode('utf-8')
-            if dn in indirect:
-                indirect.remove(dn)
-                direct.add(dn)
+            pass
 
-        entry.raw['memberof'] = list(direct)
-        if indirect:
-            entry.raw['memberofindirect'] = list(indirect)
+        return direct
 
     def get_password_attributes(self, ldap, dn, entry_attrs):
         """
@@ -1651,6 +1822,23 @@ class LDAPModMember(LDAPQuery):
                         failed[attr][ldap_obj_name].append((name, unicode(e)))
         return (dns, failed)
 
+    def _get_bulk_member_dns(self, objs):
+        """
+        Return list of the member DNs of all objects in `objs`, as found by
+        `get_member_dns` for one attribute, and dict mapping them to the
+        names of their objects.
+        """
+        m_dns = []
+        obj_names = {}
+        for ldap_obj_name, obj_dns in objs.items():
+            for m_dn in obj_dns:
+                assert isinstance(m_dn, DN)
+                if not m_dn:
+                    continue
+                m_dns.append(m_dn)
+                obj_names[m_dn] = ldap_obj_name
+        return (m_dns, obj_names)
+
 
 class LDAPAddMember(LDAPModMember):
     """
@@ -1688,21 +1876,17 @@ class LDAPAddMember(LDAPModMember):
 
         completed = 0
         for (attr, objs) in member_dns.items():
-            for ldap_obj_name in objs:
-                for m_dn in member_dns[attr][ldap_obj_name]:
-                    assert isinstance(m_dn, DN)
-                    if not m_dn:
-                        continue
-                    try:
-                        ldap.add_entry_to_group(m_dn, dn, attr, allow_same=self.allow_same)
-                    except errors.PublicError as e:
-                        ldap_obj = self.api.Object[ldap_obj_name]
-                        failed[attr][ldap_obj_name].append((
-                            ldap_obj.get_primary_key_from_dn(m_dn),
-                            unicode(e),)
-                        )
-                    else:
-                        completed += 1
+            m_dns, obj_names = self._get_bulk_member_dns(objs)
+            for m_dn, e in ldap.add_entries_to_group(
+                    m_dns, dn, attr, allow_same=self.allow_same):
+                ldap_obj_name = obj_names[m_dn]
+                ldap_obj = self.api.Object[ldap_obj_name]
+                failed[attr][ldap_obj_name].append((
+                    ldap_obj.get_primary_key_from_dn(m_dn),
+                    unicode(e),)
+                )
+                completed -= 1
+            completed += len(m_dns)
 
         if options.get('all', False):
             attrs_list = ['*'] + self.obj.default_attributes
@@ -1786,21 +1970,16 @@ class LDAPRemoveMember(LDAPModMember):
 
         completed = 0
         for (attr, objs) in member_dns.items():
-            for ldap_obj_name, m_dns in objs.items():
-                for m_dn in m_dns:
-                    assert isinstance(m_dn, DN)
-                    if not m_dn:
-                        continue
-                    try:
-                        ldap.remove_entry_from_group(m_dn, dn, attr)
-                    except errors.PublicError as e:
-                        ldap_obj = self.api.Object[ldap_obj_name]
-                        failed[attr][ldap_obj_name].append((
-                            ldap_obj.get_primary_key_from_dn(m_dn),
-                            unicode(e),)
-                        )
-                    else:
-                        completed += 1
+            m_dns, obj_names = self._get_bulk_member_dns(objs)
+            for m_dn, e in ldap.remove_entries_from_group(m_dns, dn, attr):
+                ldap_obj_name = obj_names[m_dn]
+                ldap_obj = self.api.Object[ldap_obj_name]
+                failed[attr][ldap_obj_name].append((
+                    ldap_obj.get_primary_key_from_dn(m_dn),
+                    unicode(e),)
+                )
+                completed -= 1
+            completed += len(m_dns)
 
         if options.get('all', False):
             attrs_list = ['*'] + self.obj.default_attributes
@@ -1871,6 +2050,9 @@ class LDAPSearch(BaseLDAPCommand, crud.Search):
     # Set the following attribute to False to turn sorting off
     sort_result_entries = True
 
+    # total is the number of entries on all pages when pagesize is given
+    has_output = output.paged_list_of_entries
+
     takes_options = (
         Int('timelimit?',
             label=_('Time Limit'),
@@ -1886,6 +2068,29 @@ class LDAPSearch(BaseLDAPCommand, crud.Search):
             minvalue=0,
             autofill=False,
         ),
+        Int('pagesize?',
+            label=_('Page Size'),
+            doc=_('Number of entries returned in one page of a sorted '
+                  'search'),
+            flags=['no_display'],
+            minvalue=1,
+            autofill=False,
+        ),
+        Int('pageoffset?',
+            label=_('Page Offset'),
+            doc=_('Index of the first entry of the page to return '
+                  '(0 is the first entry)'),
+            flags=['no_display'],
+            minvalue=0,
+            autofill=False,
+        ),
+        Str('sortattr?',
+            label=_('Sort Attribute'),
+            doc=_('Attribute used by the server to sort the entries '
+                  '(default is the primary key)'),
+            flags=['no_display'],
+            autofill=False,
+        ),
     )
 
     def get_args(self):
@@ -2005,9 +2210,48 @@ class LDAPSearch(BaseLDAPCommand, crud.Search):
 
     has_output_params = global_output_params
 
+    def get_sort_attrs(self, **options):
+        """
+        Returns the list of attributes the server sorts the entries by or
+        None if the entries are not sorted by the server.
+        """
+        if (options.get('pagesize') is None and
+                options.get('pageoffset') is not None):
+            raise errors.ValidationError(
+                name='pageoffset',
+                error=_('can only be used together with pagesize'))
+
+        sortattr = options.get('sortattr')
+        if sortattr is not None:
+            allowed = list(self.obj.default_attributes)
+            if self.obj.primary_key:
+                allowed.append(self.obj.primary_key.name)
+            if sortattr.lower() not in [a.lower() for a in allowed]:
+                raise errors.ValidationError(
+                    name='sortattr',
+                    error=_('%(attr)s is not an attribute of %(object)s') % {
+                        'attr': sortattr,
+                        'object': self.obj.object_name_plural,
+                    })
+            return [sortattr]
+
+        if options.get('pagesize') is None:
+            return None
+
+        if not self.obj.primary_key:
+            raise errors.ValidationError(
+                name='pagesize',
+                error=_('sortattr is required to page %s') %
+                self.obj.object_name_plural)
+        return [self.obj.primary_key.name]
+
     def execute(self, *args, **options):
         ldap = self.obj.backend
 
+        sort_attrs = self.get_sort_attrs(**options)
+        pagesize = options.get('pagesize')
+        pageoffset = options.get('pageoffset') or 0
+
         index = tuple(self.args).index('criteria')
         keys = args[:index]
         try:
@@ -2052,12 +2296,26 @@ class LDAPSearch(BaseLDAPCommand, crud.Search):
                 self, ldap, filter, attrs_list, base_dn, scope, *args, **options)
             assert isinstance(base_dn, DN)
 
+        total = None
         try:
-            (entries, truncated) = self._exc_wrapper(args, options, ldap.find_entries)(
-                filter, attrs_list, base_dn, scope,
-                time_limit=options.get('timelimit', None),
-                size_limit=options.get('sizelimit', None)
-            )
+            if pagesize is not None:
+                (entries, truncated, total) = self._exc_wrapper(
+                    args, options, ldap.find_entries_window)(
+                    filter, attrs_list, base_dn, scope,
+                    sort_attrs=sort_attrs,
+                    offset=pageoffset,
+                    count=pagesize,
+                    time_limit=options.get('timelimit', None),
+                    size_limit=options.get('sizelimit', None)
+                )
+            else:
+                (entries, truncated) = self._exc_wrapper(
+                    args, options, ldap.find_entries)(
+                    filter, attrs_list, base_dn, scope,
+                    time_limit=options.get('timelimit', None),
+                    size_limit=options.get('sizelimit', None),
+                    sort_attrs=sort_attrs
+                )
         except errors.EmptyResult:
             (entries, truncated) = ([], False)
         except errors.NotFound:
@@ -2069,7 +2327,7 @@ class LDAPSearch(BaseLDAPCommand, crud.Search):
                 self, ldap, entries, truncated, *args, **options
             )
 
-        if self.sort_result_entries:
+        if self.sort_result_entries and sort_attrs is None:
             if self.obj.primary_key:
                 def sort_key(x):
                     return self.obj.primary_key.sort_key(
@@ -2077,8 +2335,8 @@ class LDAPSearch(BaseLDAPCommand, crud.Search):
                 entries.sort(key=sort_key)
 
         if not options.get('raw', False):
+            self.obj.get_indirect_members_multi(entries, attrs_list)
             for entry in entries:
-                self.obj.get_indirect_members(entry, attrs_list)
                 self.obj.convert_attribute_members(entry, *args, **options)
 
         for (i, e) in enumerate(entries):
@@ -2089,6 +2347,7 @@ class LDAPSearch(BaseLDAPCommand, crud.Search):
             result=entries,
             count=len(entries),
             truncated=bool(truncated),
+            total=total,
         )
 
         try:
@@ -46,16 +46,19 @@ And then a nested response for each IPA command method sent in the request
 """
 
 import logging
+import threading
 
 import six
+from six.moves import queue
 
 from ipalib import api, errors
 from ipalib import Command
+from ipalib.crud import Retrieve, Search
 from ipalib.frontend import Local
-from ipalib.parameters import Str, Dict
+from ipalib.parameters import Str, Dict, Flag
 from ipalib.output import Output
 from ipalib.text import _
-from ipalib.request import context
+from ipalib.request import context, destroy_context, AuditRecord
 from ipalib.plugable import Registry
 from ipapython.version import API_VERSION
 
@@ -87,74 +90,182 @@ class batch(Command):
         ),
     )
 
+    takes_options = (
+        Flag('parallel',
+            doc=_('Execute read-only methods concurrently'),
+        ),
+    )
+
     has_output = (
         Output('count', int, doc=''),
         Output('results', (list, tuple), doc='')
     )
 
+    # Per-request attributes of the caller's context inherited by workers
+    _worker_context = ('principal', 'ccache_name', 'languages', 'client_ip')
+
+    # Retrieve and Search commands which nevertheless modify entries
+    _not_read_only = ('trust_fetch_domains',)
+
     def execute(self, methods=None, **options):
-        results = []
-        for arg in (methods or []):
-            params = dict()
-            name = None
+        methods = methods or []
+        version = options['version']
+        ccache = getattr(context, 'ccache_name', None)
+        if (options.get('parallel') and ccache is not None and
+                self.api.env.batch_workers > 1):
+            results = self._execute_parallel(methods, version, ccache)
+        else:
+            results = [self._execute_method(arg, version) for arg in methods]
+        return dict(count=len(results), results=results)
+
+    def _is_read_only(self, arg):
+        try:
+            name = arg['method']
+            command = self.api.Command[name]
+        except (KeyError, TypeError):
+            return False
+        return (isinstance(command, (Retrieve, Search)) and
+                name not in self._not_read_only)
+
+    def _execute_parallel(self, methods, version, ccache):
+        """
+        Execute nested methods, running read-only ones on worker threads.
+
+        Consecutive read-only methods run concurrently. Any other method
+        waits for all preceding methods to finish and runs alone in the
+        calling thread, so results and side effects keep the request order.
+        """
+        results = [None] * len(methods)
+        state = dict(
+            (name, getattr(context, name))
+            for name in self._worker_context if hasattr(context, name)
+        )
+
+        tasks = []
+        for i, arg in enumerate(methods):
+            if self._is_read_only(arg):
+                tasks.append((i, arg))
+                continue
+            self._run_workers(tasks, results, version, ccache, state)
+            tasks = []
+            results[i] = self._execute_method(arg, version)
+        self._run_workers(tasks, results, version, ccache, state)
+
+        return results
+
+    def _run_workers(self, tasks, results, version, ccache, state):
+        if len(tasks) < 2:
+            for i, arg in tasks:
+                results[i] = self._execute_method(arg, version)
+            return
+
+        task_queue = queue.Queue()
+        for task in tasks:
+            task_queue.put(task)
+
+        workers = []
+        for _i in range(min(self.api.env.batch_workers, len(tasks))):
+            worker = threading.Thread(
+                target=self._worker,
+                args=(task_queue, results, version, ccache, state),
+            )
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+        for worker in workers:
+            worker.join()
+
+        # methods left over by workers which failed to connect
+        for i, arg in tasks:
+            if results[i] is None:
+                results[i] = self._execute_method(arg, version)
+
+    def _worker(self, task_queue, results, version, ccache, state):
+        context.__dict__.update(state)
+        try:
             try:
-                if 'method' not in arg:
-                    raise errors.RequirementError(name='method')
-                if 'params' not in arg:
-                    raise errors.RequirementError(name='params')
-                name = arg['method']
-                if (name not in self.api.Command or
-                        isinstance(self.api.Command[name], Local)):
-                    raise errors.CommandError(name=name)
-
-                # If params are not formated as a tuple(list, dict)
-                # the following lines will raise an exception
-                # that triggers an internal server error
-                # Raise a ConversionError instead to report the issue
-                # to the client
+                self.api.Backend.ldap2.connect(ccache=ccache,
+                                               size_limit=None,
+                                               time_limit=None)
+            except Exception as e:
+                logger.debug('batch: worker failed to connect: %s', e)
+                return
+            while True:
                 try:
-                    a, kw = arg['params']
-                    newkw = dict((str(k), v) for k, v in kw.items())
-                    params = api.Command[name].args_options_2_params(
-                        *a, **newkw)
-                except (AttributeError, ValueError, TypeError):
-                    raise errors.ConversionError(
-                        name='params',
-                        error=_(u'must contain a tuple (list, dict)'))
-                newkw.setdefault('version', options['version'])
+                    i, arg = task_queue.get_nowait()
+                except queue.Empty:
+                    break
+                results[i] = self._execute_method(arg, version)
+        finally:
+            destroy_context()
+
+    def _execute_method(self, arg, version):
+        """
+        Execute a single nested method, return its result or error dict.
+        """
+        name = None
+        record = None
+        try:
+            if 'method' not in arg:
+                raise errors.RequirementError(name='method')
+            if 'params' not in arg:
+                raise errors.RequirementError(name='params')
+            name = arg['method']
+            if (name not in self.api.Command or
+                    isinstance(self.api.Command[name], Local)):
+                raise errors.CommandError(name=name)
+
+            record = AuditRecord(
+                '%s: batch' % getattr(context, 'principal', 'UNKNOWN'),
+                name,
+                max_value_length=self.api.env.audit_max_value_length)
+            record.command = api.Command[name]
 
+            # If params are not formated as a tuple(list, dict)
+            # the following lines will raise an exception
+            # that triggers an internal server error
+            # Raise a ConversionError instead to report the issue
+            # to the client
+            try:
+                a, kw = arg['params']
+                newkw = dict((str(k), v) for k, v in kw.items())
+                api.Command[name].args_options_2_params(*a, **newkw)
+            except (AttributeError, ValueError, TypeError):
+                raise errors.ConversionError(
+                    name='params',
+                    error=_(u'must contain a tuple (list, dict)'))
+            newkw.setdefault('version', version)
+            record.args = a
+            record.options = newkw
+
+            # the command records its converted params in the record
+            outer_record = getattr(context, 'audit_record', None)
+            context.audit_record = record
+            try:
                 result = api.Command[name](*a, **newkw)
+            finally:
+                context.audit_record = outer_record
+            record.result = 'SUCCESS'
+            logger.info('%s', record, extra=dict(audit=record))
+            result['error'] = None
+        except Exception as e:
+            if record is None:
                 logger.info(
-                    '%s: batch: %s(%s): SUCCESS',
-                    getattr(context, 'principal', 'UNKNOWN'),
-                    name,
-                    ', '.join(api.Command[name]._repr_iter(**params))
-                )
-                result['error']=None
-            except Exception as e:
-                if isinstance(e, errors.RequirementError) or \
-                    isinstance(e, errors.CommandError):
-                    logger.info(
-                        '%s: batch: %s',
-                        context.principal,  # pylint: disable=no-member
-                        e.__class__.__name__
-                    )
-                else:
-                    logger.info(
-                        '%s: batch: %s(%s): %s',
-                        context.principal, name,  # pylint: disable=no-member
-                        ', '.join(api.Command[name]._repr_iter(**params)),
-                        e.__class__.__name__
-                    )
-                if isinstance(e, errors.PublicError):
-                    reported_error = e
-                else:
-                    reported_error = errors.InternalError()
-                result = dict(
-                    error=reported_error.strerror,
-                    error_code=reported_error.errno,
-                    error_name=unicode(type(reported_error).__name__),
-                    error_kw=reported_error.kw,
+                    '%s: batch: %s',
+                    context.principal,  # pylint: disable=no-member
+                    e.__class__.__name__
                 )
-            results.append(result)
-        return dict(count=len(results) , results=results)
+            else:
+                record.result = e.__class__.__name__
+                logger.info('%s', record, extra=dict(audit=record))
+            if isinstance(e, errors.PublicError):
+                reported_error = e
+            else:
+                reported_error = errors.InternalError()
+            result = dict(
+                error=reported_error.strerror,
+                error_code=reported_error.errno,
+                error_name=unicode(type(reported_error).__name__),
+                error_kw=reported_error.kw,
+            )
+        return result
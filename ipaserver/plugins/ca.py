@@ -192,6 +192,7 @@ class ca_find(LDAPSearch):
     msg_summary = ngettext(
         '%(count)d CA matched', '%(count)d CAs matched', 0
     )
+    cache_results = True
 
     def execute(self, *keys, **options):
         ca_enabled_check(self.api)
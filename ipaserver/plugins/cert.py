@@ -1645,12 +1645,19 @@ class cert_find(Search, CertMethod):
 
         if not pkey_only:
             ca_objs = {}
-            if ca_enabled:
-                ra = self.api.Backend.ra
+            certs = {}
+            if all:
+                keys = [key for key, obj in six.iteritems(result)
+                        if 'cacn' in obj]
+                if keys:
+                    # retrieve the certificates from the CA all at once
+                    ra = self.api.Backend.ra
+                    certs = dict(zip(keys, ra.get_certificates(
+                        [str(serial_number) for _issuer, serial_number
+                         in keys])))
 
             for key, obj in six.iteritems(result):
                 if all and 'cacn' in obj:
-                    _issuer, serial_number = key
                     cacn = obj['cacn']
 
                     try:
@@ -1659,7 +1666,7 @@ class cert_find(Search, CertMethod):
                         ca_obj = ca_objs[cacn] = (
                             self.api.Command.ca_show(cacn, all=True)['result'])
 
-                    obj.update(ra.get_certificate(str(serial_number)))
+                    obj.update(certs[key])
                     if not raw:
                         obj['certificate'] = (
                             obj['certificate'].replace('\r\n', ''))
@@ -1702,6 +1709,7 @@ class ca_is_enabled(Command):
     """
     NO_CLI = True
     has_output = output.standard_value
+    cache_results = True
 
     def execute(self, *args, **options):
         base_dn = DN(('cn', 'masters'), ('cn', 'ipa'), ('cn', 'etc'),
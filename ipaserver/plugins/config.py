@@ -561,6 +561,8 @@ class config_mod(LDAPUpdate):
 class config_show(LDAPRetrieve):
     __doc__ = _('Show the current configuration.')
 
+    cache_results = True
+
     def post_callback(self, ldap, dn, entry_attrs, *keys, **options):
         self.obj.show_servroles_attributes(
             entry_attrs, "CA server", "IPA master", "NTP server", **options)
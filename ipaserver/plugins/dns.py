@@ -4065,6 +4065,7 @@ class dns_is_enabled(Command):
     """
     NO_CLI = True
     has_output = output.standard_value
+    cache_results = True
 
     base_dn = DN(('cn', 'masters'), ('cn', 'ipa'), ('cn', 'etc'), api.env.basedn)
     filter = '(&(objectClass=ipaConfigObject)(cn=DNS))'
@@ -1203,6 +1203,7 @@ if api.env.ra_plugin != 'dogtag':
     raise SkipPluginModule(reason='dogtag not selected as RA plugin')
 import os
 import random
+import threading
 from ipaserver.plugins import rabase
 from ipalib.constants import TYPE_ERROR
 from ipalib import _
@@ -1253,9 +1254,14 @@ class RestClient(Backend):
         super(RestClient, self).__init__(api)
 
         self._ca_host = None
-        # session cookie
+        # session cookie, the REST session belongs to the thread which
+        # logged in
+        self._local = threading.local()
         self.override_port = None
-        self.cookie = None
+
+    @property
+    def cookie(self):
+        return getattr(self._local, 'cookie', None)
 
     @property
     def ca_host(self):
@@ -1298,7 +1304,7 @@ class RestClient(Backend):
         cookies = ipapython.cookie.Cookie.parse(resp_headers.get('set-cookie', ''))
         if status != 200 or len(cookies) == 0:
             raise errors.RemoteRetrieveError(reason=_('Failed to authenticate to CA REST API'))
-        object.__setattr__(self, 'cookie', str(cookies[0]))
+        self._local.cookie = str(cookies[0])
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
@@ -1311,7 +1317,7 @@ class RestClient(Backend):
             client_keyfile=self.client_keyfile,
             method='GET'
         )
-        object.__setattr__(self, 'cookie', None)
+        self._local.cookie = None
 
     def _ssldo(self, method, path, headers=None, body=None, use_session=True):
         """
@@ -1572,7 +1578,13 @@ class ra(rabase.rabase, RestClient):
                          xml='true')
         )
 
+        return self._parse_certificate(http_status, http_body)
 
+    def _parse_certificate(self, http_status, http_body):
+        """
+        Parse the reply of CMS to a displayBySerial request, see
+        `get_certificate`.
+        """
         # Parse and handle errors
         if http_status != 200:
             self.raise_certificate_operation_error('get_certificate',
@@ -1601,6 +1613,78 @@ class ra(rabase.rabase, RestClient):
 
         return cmd_result
 
+    def get_certificates(self, serial_numbers):
+        """
+        Retrieve existing certificates.
+
+        Up to ``ca_request_workers`` requests are sent to CMS at once, each
+        worker reusing its connection.
+
+        :param serial_numbers: list of certificate serial numbers, see
+                               `get_certificate`
+        :return: list of results of `get_certificate`, in the order of
+                 `serial_numbers`
+
+        If the retrieval of any certificate fails, the error of the first
+        one in `serial_numbers` is raised.
+        """
+        logger.debug('%s.get_certificates()', type(self).__name__)
+
+        serial_numbers = [str(int(serial_number, 0))
+                          for serial_number in serial_numbers]
+        results = [None] * len(serial_numbers)
+        failures = {}
+        # index of the next serial number to retrieve
+        state = dict(next=0)
+        lock = threading.Lock()
+        # select the CA host in the calling thread, it needs LDAP
+        ca_host = self.ca_host
+
+        def worker():
+            session = dogtag.HTTPSSession(
+                ca_host, self.env.ca_agent_port,
+                cafile=self.ca_cert,
+                client_certfile=self.client_certfile,
+                client_keyfile=self.client_keyfile)
+            try:
+                while True:
+                    with lock:
+                        i = state['next']
+                        if i >= len(serial_numbers) or failures:
+                            return
+                        state['next'] += 1
+                    try:
+                        http_status, _http_headers, http_body = (
+                            session.request(
+                                '/ca/agent/ca/displayBySerial',
+                                serialNumber=serial_numbers[i],
+                                xml='true'))
+                        results[i] = self._parse_certificate(
+                            http_status, http_body)
+                    except Exception as e:
+                        with lock:
+                            failures[i] = e
+            finally:
+                session.close()
+
+        n_workers = min(self.api.env.ca_request_workers, len(serial_numbers))
+        threads = []
+        for _i in range(n_workers - 1):
+            thread = threading.Thread(target=worker)
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        if n_workers > 0:
+            worker()
+        for thread in threads:
+            thread.join()
+
+        # serial numbers before a failed one have all been retrieved, so
+        # the first failure is the one a sequential retrieval would hit
+        if failures:
+            raise failures[min(failures)]
+
+        return results
 
     def request_certificate(
             self, csr, profile_id, ca_id, request_type='pkcs10'):
@@ -17,11 +17,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import collections
 import logging
+import threading
 
 from ipalib import api, errors, output, util
 from ipalib import Command, Str, Flag, Int
 from ipalib import _
+from ipalib.messages import add_message, SearchResultTruncated
+from ipalib.request import context
 from ipapython.dn import DN
 from ipalib.plugable import Registry
 if api.env.in_server and api.env.context in ['lite', 'server']:
@@ -146,6 +150,30 @@ EXAMPLES:
       Matched rules: allow_all
 
 
+TESTING MANY REQUESTS AT ONCE
+
+hbactest-bulk tests every combination of the specified users, target hosts
+and services in one call. All users, hosts or services are tested when the
+respective option is not specified. The rules are selected the same way as
+with hbactest. Users from trusted domains are not supported.
+
+At most as many combinations are tested as the search records limit of the
+IPA configuration allows, unless another limit is given with --resultlimit;
+0 means no limit. The result is marked as truncated when there are more.
+
+EXAMPLES:
+
+    1. Test which users can access a host with sshd using all enabled rules:
+    $ ipa hbactest-bulk --host=bar --service=sshd
+
+    2. Test two users on two hosts, without detail:
+    $ ipa hbactest-bulk --user=a1a --user=b2b --host=foo --host=bar \\
+          --service=sshd --nodetail
+
+    3. Test all users on a host, without limiting the number of results:
+    $ ipa hbactest-bulk --host=bar --service=sshd --resultlimit=0
+
+
 HBACTEST AND TRUSTED DOMAINS
 
 When an external trusted domain is configured in IPA, HBAC rules are also applied
@@ -251,6 +279,256 @@ def _convert_to_ipa_rule(rule):
     return ipa_rule
 
 
+class HbacRuleIndex(object):
+    """
+    Index of pyhbac rules by the names and groups of their users, target
+    hosts and services.
+
+    A rule can only match a request if each of these elements has category
+    all, the requested name or one of the requested groups. Looking the
+    elements of a request up in the index gives the rules which may match
+    it, the other rules do not need to be evaluated.
+    """
+    elements = ('users', 'targethosts', 'services')
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._all = {}
+        self._names = {}
+        self._groups = {}
+        for element in self.elements:
+            self._all[element] = set()
+            self._names[element] = {}
+            self._groups[element] = {}
+            for i, rule in enumerate(self.rules):
+                rule_element = getattr(rule, element)
+                if pyhbac.HBAC_CATEGORY_ALL in rule_element.category:
+                    self._all[element].add(i)
+                    continue
+                # names are compared case insensitively to not miss any rule
+                for name in rule_element.names:
+                    self._names[element].setdefault(
+                        name.lower(), set()).add(i)
+                for group in rule_element.groups:
+                    self._groups[element].setdefault(
+                        group.lower(), set()).add(i)
+
+    def lookup(self, element, name, groups=()):
+        """
+        Return set of positions of the rules whose `element` may match the
+        name and the groups.
+        """
+        found = set(self._all[element])
+        if name:
+            found.update(self._names[element].get(name.lower(), ()))
+        for group in groups:
+            found.update(self._groups[element].get(group.lower(), ()))
+        return found
+
+    def match(self, user=None, targethost=None, service=None):
+        """
+        Return sorted list of positions of the rules which may match a
+        request.
+
+        user, targethost and service are tuples of the name and the groups
+        of the requested entity, or None to match any.
+        """
+        found = None
+        for element, value in zip(self.elements, (user, targethost, service)):
+            if value is None:
+                continue
+            matching = self.lookup(element, *value)
+            if found is None:
+                found = matching
+            else:
+                found &= matching
+        if found is None:
+            return list(range(len(self.rules)))
+        return sorted(found)
+
+    def get_candidates(self, user=None, targethost=None, service=None):
+        """
+        Return list of the rules which may match a request, in their
+        original order.
+        """
+        return [self.rules[i]
+                for i in self.match(user, targethost, service)]
+
+
+class HbacRuleCache(object):
+    """
+    Per-process cache of HBAC rules converted to pyhbac rules.
+
+    The rules found by hbacrule_find are cached per principal and size
+    limit, together with the highest entryUSN and the number of the HBAC
+    rules. Every change of a rule, including changes of its members by the
+    referential integrity plugin, increases the highest entryUSN and every
+    deletion decreases the number of rules, so the cached rules are only
+    used as long as both are the same.
+
+    The cached rules are shared and must not be modified.
+    """
+
+    def __init__(self, size=16):
+        self.size = size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, usn):
+        """
+        Return list of (enabled, rule) tuples cached for `key` or None.
+        """
+        with self._lock:
+            try:
+                cached_usn, rules = self._entries.pop(key)
+            except KeyError:
+                return None
+            if cached_usn != usn:
+                return None
+            self._entries[key] = (cached_usn, rules)
+            return rules
+
+    def set(self, key, usn, rules):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (usn, rules)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_rule_cache = HbacRuleCache()
+
+
+def _get_rules_usn(api):
+    """
+    Return tuple of the highest entryUSN and the number of HBAC rules, or
+    None if entryUSN is not available.
+    """
+    ldap = api.Backend.ldap2
+    try:
+        entries = ldap.get_entries(
+            DN(api.env.container_hbac, api.env.basedn), ldap.SCOPE_ONELEVEL,
+            '(objectclass=ipahbacrule)', ['entryusn'], size_limit=-1,
+            paged_search=True)
+    except errors.NotFound:
+        return (0, 0)
+
+    usn = 0
+    for entry in entries:
+        entry_usn = entry.get('entryusn')
+        if not entry_usn:
+            return None
+        usn = max(usn, int(entry_usn[0]))
+    return (usn, len(entries))
+
+
+def _convert_rules(hbacset):
+    """
+    Return list of (enabled, rule) tuples of rules converted to enabled
+    pyhbac rules.
+    """
+    converted = []
+    for rule in hbacset:
+        ipa_rule = _convert_to_ipa_rule(rule)
+        ipa_rule.enabled = True
+        converted.append((rule['ipaenabledflag'][0], ipa_rule))
+    return converted
+
+
+def _find_rules(api, sizelimit):
+    """
+    Return list of (enabled, rule) tuples of the rules found by
+    hbacrule_find, from the cache if no rule has changed.
+    """
+    key = (getattr(context, 'principal', None), sizelimit)
+    try:
+        usn = _get_rules_usn(api)
+    except errors.PublicError as e:
+        logger.debug("Failed to read entryUSN of HBAC rules: %s", e)
+        usn = None
+
+    if usn is not None:
+        converted = _rule_cache.get(key, usn)
+        if converted is not None:
+            logger.debug("Using cached HBAC rules")
+            return converted
+
+    hbacset = api.Command.hbacrule_find(
+        sizelimit=sizelimit, no_members=False)['result']
+    converted = _convert_rules(hbacset)
+    if usn is not None:
+        _rule_cache.set(key, usn, converted)
+    return converted
+
+
+def _get_rules(api, options):
+    """
+    Return list of pyhbac rules to test and list of the names of rules in
+    --rules which do not exist.
+    """
+    rules = []
+
+    # Use all enabled IPA rules by default
+    all_enabled = True
+    all_disabled = False
+
+    # We need a local copy of test rules in order find incorrect ones
+    testrules = {}
+    if 'rules' in options:
+        testrules = list(options['rules'])
+        # When explicit rules are provided, disable assumptions
+        all_enabled = False
+        all_disabled = False
+
+    sizelimit = None
+    if 'sizelimit' in options:
+        sizelimit = int(options['sizelimit'])
+
+    # Check if --disabled is specified, include all disabled IPA rules
+    if options['disabled']:
+        all_disabled = True
+        all_enabled = False
+
+    # Finally, if enabled is specified implicitly, override above decisions
+    if options['enabled']:
+        all_enabled = True
+
+    if len(testrules) == 0:
+        converted = _find_rules(api, sizelimit)
+    else:
+        hbacset = []
+        for rule in testrules:
+            try:
+                hbacset.append(api.Command.hbacrule_show(rule)['result'])
+            except Exception:
+                pass
+        converted = _convert_rules(hbacset)
+
+    # We have some rules, import them
+    # --enabled will import all enabled rules (default)
+    # --disabled will import all disabled rules
+    # --rules will implicitly add the rules from a rule list
+    # All converted rules are enabled for the simulation already
+    for enabled, ipa_rule in converted:
+        if ipa_rule.name in testrules:
+            rules.append(ipa_rule)
+            testrules.remove(ipa_rule.name)
+        elif all_enabled and enabled:
+            # Option --enabled forces to include all enabled IPA rules into
+            # test
+            rules.append(ipa_rule)
+        elif all_disabled and not enabled:
+            # Option --disabled forces to include all disabled IPA rules into
+            # test
+            rules.append(ipa_rule)
+
+    return rules, testrules
+
+
 @register()
 class hbactest(Command):
     __doc__ = _('Simulate use of Host-based access controls')
@@ -322,61 +600,7 @@ class hbactest(Command):
         # 1. HBAC rules (whether enabled or disabled)
         # 2. Required options are (user, target host, service)
         # 3. Options: rules to test (--rules, --enabled, --disabled), request for detail output
-        rules = []
-
-        # Use all enabled IPA rules by default
-        all_enabled = True
-        all_disabled = False
-
-        # We need a local copy of test rules in order find incorrect ones
-        testrules = {}
-        if 'rules' in options:
-            testrules = list(options['rules'])
-            # When explicit rules are provided, disable assumptions
-            all_enabled = False
-            all_disabled = False
-
-        sizelimit = None
-        if 'sizelimit' in options:
-            sizelimit = int(options['sizelimit'])
-
-        # Check if --disabled is specified, include all disabled IPA rules
-        if options['disabled']:
-            all_disabled = True
-            all_enabled = False
-
-        # Finally, if enabled is specified implicitly, override above decisions
-        if options['enabled']:
-            all_enabled = True
-
-        hbacset = []
-        if len(testrules) == 0:
-            hbacset = self.api.Command.hbacrule_find(
-                sizelimit=sizelimit, no_members=False)['result']
-        else:
-            for rule in testrules:
-                try:
-                    hbacset.append(self.api.Command.hbacrule_show(rule)['result'])
-                except Exception:
-                    pass
-
-        # We have some rules, import them
-        # --enabled will import all enabled rules (default)
-        # --disabled will import all disabled rules
-        # --rules will implicitly add the rules from a rule list
-        for rule in hbacset:
-            ipa_rule = _convert_to_ipa_rule(rule)
-            if ipa_rule.name in testrules:
-                ipa_rule.enabled = True
-                rules.append(ipa_rule)
-                testrules.remove(ipa_rule.name)
-            elif all_enabled and ipa_rule.enabled:
-                # Option --enabled forces to include all enabled IPA rules into test
-                rules.append(ipa_rule)
-            elif all_disabled and not ipa_rule.enabled:
-                # Option --disabled forces to include all disabled IPA rules into test
-                ipa_rule.enabled = True
-                rules.append(ipa_rule)
+        rules, testrules = _get_rules(self.api, options)
 
         # Check if there are unresolved rules left
         if len(testrules) > 0:
@@ -469,10 +693,22 @@ class hbactest(Command):
         error_rules = []
         warning_rules = []
 
+        # Only the rules which may match the request need to be evaluated
+        requested = {}
+        for name, element in (('user', request.user),
+                              ('targethost', request.targethost),
+                              ('service', request.service)):
+            if options[name] != u'all':
+                requested[name] = (element.name, element.groups)
+        candidates = set(HbacRuleIndex(rules).match(**requested))
+
         result = {'warning':None, 'matched':None, 'notmatched':None, 'error':None}
         if not options['nodetail']:
             # Validate runs rules one-by-one and reports failed ones
-            for ipa_rule in rules:
+            for i, ipa_rule in enumerate(rules):
+                if i not in candidates:
+                    notmatched_rules.append(ipa_rule.name)
+                    continue
                 try:
                     res = request.evaluate([ipa_rule])
                     if res == pyhbac.HBAC_EVAL_ALLOW:
@@ -490,9 +726,11 @@ class hbactest(Command):
                     logger.error('Native IPA HBAC module error: %s', info)
 
             access_granted = len(matched_rules) > 0
-        else:
-            res = request.evaluate(rules)
+        elif candidates:
+            res = request.evaluate([rules[i] for i in sorted(candidates)])
             access_granted = (res == pyhbac.HBAC_EVAL_ALLOW)
+        else:
+            access_granted = False
 
         result['summary'] = _('Access granted: %s') % (access_granted)
 
@@ -508,3 +746,233 @@ class hbactest(Command):
 
         result['value'] = access_granted
         return result
+
+
+# number of names looked up with one search in bulk mode
+BULK_LOOKUP_SIZE = 500
+
+
+def _get_groups(ldap, container_dn, name_attr, names, group_container_dn):
+    """
+    Return list of (name, groups) tuples of entries in container_dn and the
+    names of groups in group_container_dn the entries are direct or
+    indirect members of.
+
+    The entries are looked up with one search per BULK_LOOKUP_SIZE names,
+    or all entries with one paged search when names is None. Names which
+    are not found have no groups.
+    """
+    if names is None:
+        filters = ['(%s=*)' % name_attr]
+    else:
+        filters = [
+            ldap.make_filter_from_attr(
+                name_attr, names[i:i + BULK_LOOKUP_SIZE], ldap.MATCH_ANY)
+            for i in range(0, len(names), BULK_LOOKUP_SIZE)
+        ]
+
+    found = []
+    for filter in filters:
+        try:
+            entries = ldap.get_entries(
+                container_dn, ldap.SCOPE_ONELEVEL, filter,
+                [name_attr, 'memberof'], size_limit=-1, paged_search=True)
+        except errors.NotFound:
+            continue
+        for entry in entries:
+            # memberOf has the indirect groups too
+            groups = sorted(set(
+                dn[0].value for dn in entry.get('memberof', [])
+                if dn[1:] == group_container_dn))
+            found.append((entry[name_attr][0], groups))
+
+    if names is None:
+        return sorted(found)
+    groups = {name.lower(): groups for name, groups in found}
+    return [(name, groups.get(name.lower(), [])) for name in names]
+
+
+@register()
+class hbactest_bulk(Command):
+    __doc__ = _('Simulate use of Host-based access controls for many '
+                'requests at once')
+
+    has_output = (
+        output.summary,
+        output.ListOfEntries('result'),
+        output.Output('count', int, _('Number of requests tested')),
+        output.Output('error', (list, tuple, type(None)),
+                      _('Non-existent or invalid rules')),
+        output.Output('truncated', bool,
+                      _('True if not all results were returned')),
+    )
+
+    has_output_params = (
+        Str('user', label=_('User name')),
+        Str('targethost', label=_('Target host')),
+        Str('service', label=_('Service')),
+        Flag('value', label=_('Access granted')),
+        Str('matched*', label=_('Matched rules')),
+    )
+
+    takes_options = (
+        Str(
+            'user*',
+            cli_name='user',
+            label=_('User names. If not specified, all users are tested'),
+        ),
+        Str(
+            'targethost*',
+            cli_name='host',
+            label=_('Target hosts. If not specified, all hosts are tested'),
+        ),
+        Str(
+            'service*',
+            cli_name='service',
+            label=_('Services. If not specified, all services are tested'),
+        ),
+        Str(
+            'rules*',
+            cli_name='rules',
+            label=_('Rules to test. If not specified, --enabled is assumed'),
+        ),
+        Flag(
+            'nodetail?',
+            cli_name='nodetail',
+            label=_('Hide details which rules are matched'),
+        ),
+        Flag(
+            'enabled?',
+            cli_name='enabled',
+            label=_('Include all enabled IPA rules into test [default]'),
+        ),
+        Flag(
+            'disabled?',
+            cli_name='disabled',
+            label=_('Include all disabled IPA rules into test'),
+        ),
+        Int(
+            'sizelimit?',
+            label=_('Size Limit'),
+            doc=_('Maximum number of rules to process when no --rules is '
+                  'specified'),
+            flags=['no_display'],
+            minvalue=0,
+            autofill=False,
+        ),
+        Int(
+            'resultlimit?',
+            label=_('Result Limit'),
+            doc=_('Maximum number of combinations to test (0 is unlimited, '
+                  'the search records limit by default)'),
+            minvalue=0,
+            autofill=False,
+        ),
+    )
+
+    def _get_requested(self, ldap, options):
+        env = self.api.env
+        hosts = options.get('targethost')
+        if hosts is not None:
+            hosts = [self.api.Command.hbactest.canonicalize(host)
+                     for host in hosts]
+        return (
+            _get_groups(ldap, DN(env.container_user, env.basedn), 'uid',
+                        options.get('user'),
+                        DN(env.container_group, env.basedn)),
+            _get_groups(ldap, DN(env.container_host, env.basedn), 'fqdn',
+                        hosts,
+                        DN(env.container_hostgroup, env.basedn)),
+            _get_groups(ldap, DN(env.container_hbacservice, env.basedn),
+                        'cn', options.get('service'),
+                        DN(env.container_hbacservicegroup, env.basedn)),
+        )
+
+    def _iter_results(self, index, users, hosts, services, detail):
+        """
+        Generate a result for every combination of user, target host and
+        service, ordered by target host, service and user.
+        """
+        users = [(name, groups, index.lookup('users', name, groups))
+                 for name, groups in users]
+        services = [(name, groups, index.lookup('services', name, groups))
+                    for name, groups in services]
+        for host, hostgroups in hosts:
+            host_rules = index.lookup('targethosts', host, hostgroups)
+            for service, servicegroups, service_rules in services:
+                rules = host_rules & service_rules
+                for user, usergroups, user_rules in users:
+                    result = dict(
+                        user=user, targethost=host, service=service,
+                        value=False)
+                    candidates = [index.rules[i]
+                                  for i in sorted(rules & user_rules)]
+                    if candidates:
+                        request = pyhbac.HbacRequest()
+                        request.user.name = user
+                        request.user.groups = usergroups
+                        request.targethost.name = host
+                        request.targethost.groups = hostgroups
+                        request.service.name = service
+                        request.service.groups = servicegroups
+                        if detail:
+                            matched = self._evaluate_each(request, candidates)
+                            result['value'] = bool(matched)
+                            if matched:
+                                result['matched'] = matched
+                        else:
+                            res = request.evaluate(candidates)
+                            result['value'] = (res == pyhbac.HBAC_EVAL_ALLOW)
+                    yield result
+
+    def _evaluate_each(self, request, rules):
+        matched = []
+        for ipa_rule in rules:
+            try:
+                if request.evaluate([ipa_rule]) == pyhbac.HBAC_EVAL_ALLOW:
+                    matched.append(ipa_rule.name)
+            except pyhbac.HbacError as e:
+                code, rule_name = e.args
+                logger.info('Native IPA HBAC rule "%s" parsing error: %s',
+                            rule_name, pyhbac.hbac_result_string(code))
+        return matched
+
+    def execute(self, *args, **options):
+        rules, testrules = _get_rules(self.api, options)
+        if testrules:
+            return dict(
+                summary=unicode(_(u'Unresolved rules in --rules')),
+                result=[], count=0, error=testrules, truncated=False)
+
+        ldap = self.api.Backend.ldap2
+        users, hosts, services = self._get_requested(ldap, options)
+
+        # the number of combinations is only bounded by the size of the
+        # directory, cap it like the results of a search unless requested
+        # otherwise
+        limit = options.get('resultlimit')
+        if limit is None:
+            limit = ldap.size_limit
+        result = []
+        granted = 0
+        truncated = False
+        for entry in self._iter_results(HbacRuleIndex(rules), users, hosts,
+                                        services, not options['nodetail']):
+            if 0 < limit <= len(result):
+                truncated = True
+                break
+            granted += entry['value']
+            result.append(entry)
+
+        ret = dict(
+            summary=unicode(_('Access granted: %(granted)d of %(count)d') %
+                            dict(granted=granted, count=len(result))),
+            result=result,
+            count=len(result),
+            error=None,
+            truncated=truncated,
+        )
+        if truncated:
+            add_message(options['version'], ret, SearchResultTruncated(
+                reason=errors.SizeLimitExceeded()))
+        return ret
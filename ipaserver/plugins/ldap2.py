@@ -27,10 +27,14 @@ Backend plugin for LDAP.
 # binding encodes them into the appropriate representation. This applies to
 # everything except the CrudBackend methods, where dn is part of the entry dict.
 
+import contextlib
 import logging
 import os
+import threading
+import time
 
 import ldap as _ldap
+import six
 
 from ipalib import krb_utils
 from ipaplatform.paths import paths
@@ -42,7 +46,7 @@ from ldap.controls.simple import GetEffectiveRightsControl
 
 from ipalib import Registry, errors, _
 from ipalib.crud import CrudBackend
-from ipalib.request import context
+from ipalib.request import context, timed_phase
 
 logger = logging.getLogger(__name__)
 
@@ -50,22 +54,218 @@ register = Registry()
 
 _missing = object()
 
+# number of members added to or removed from a group with one operation
+MEMBER_CHUNK_SIZE = 1000
+
+if six.PY3:
+    unicode = str
+
+
+class _PooledConnection(object):
+    __slots__ = ('key', 'conn', 'principal', 'released')
+
+    def __init__(self, key, conn, principal):
+        self.key = key
+        self.conn = conn
+        self.principal = principal
+        self.released = None
+
+
+class LDAPConnectionPool(object):
+    """
+    Bounded pool of bound LDAP connections.
+
+    Connections are keyed by the ccache name and the principal they were
+    bound with, so a connection is only ever handed out again to a request
+    running with the very same credentials. Idle connections are dropped
+    after ``idle_timeout`` seconds and the least recently used connection
+    is dropped when more than ``size`` connections are idle.
+
+    Connections are checked out and back in by `ldap2.create_connection`
+    and `ldap2.destroy_connection`; connections which were not registered
+    with `add` are never pooled.
+    """
+
+    def __init__(self, size, idle_timeout):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self._idle = []
+        self._busy = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def stats(self):
+        """
+        Return pool counters as a dict.
+        """
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses,
+                        idle=len(self._idle), busy=len(self._busy))
+
+    def _expire(self, now):
+        # caller holds the lock
+        expired = [e for e in self._idle
+                   if now - e.released > self.idle_timeout]
+        if expired:
+            self._idle = [e for e in self._idle if e not in expired]
+        return expired
+
+    def checkout(self, key):
+        """
+        Return ``(conn, principal)`` of an idle connection bound for *key*,
+        or ``None`` if there is no such connection.
+        """
+        with self._lock:
+            expired = self._expire(time.time())
+            for i in range(len(self._idle) - 1, -1, -1):
+                entry = self._idle[i]
+                if entry.key == key:
+                    del self._idle[i]
+                    self._busy[id(entry.conn)] = entry
+                    self.hits += 1
+                    break
+            else:
+                entry = None
+                self.misses += 1
+        self._unbind(expired)
+
+        if entry is None:
+            return None
+        return entry.conn, entry.principal
+
+    def add(self, key, conn, principal):
+        """
+        Register a freshly bound connection so it can be pooled on release.
+        """
+        with self._lock:
+            self._busy[id(conn)] = _PooledConnection(key, conn, principal)
+
+    def discard(self, conn):
+        """
+        Make sure *conn* is not returned to the pool, e.g. after the
+        connection to the server was lost.
+        """
+        with self._lock:
+            self._busy.pop(id(conn), None)
+
+    def checkin(self, conn):
+        """
+        Return *conn* to the pool.
+
+        Returns ``False`` if the connection is not poolable and has to be
+        closed by the caller.
+        """
+        with self._lock:
+            entry = self._busy.pop(id(conn), None)
+            if entry is None or not self.enabled:
+                return False
+            now = time.time()
+            entry.released = now
+            self._idle.append(entry)
+            evicted = self._expire(now)
+            while len(self._idle) > self.size:
+                evicted.append(self._idle.pop(0))
+        self._unbind(evicted)
+        return True
+
+    def flush(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        self._unbind(idle)
+
+    def _unbind(self, entries):
+        for entry in entries:
+            try:
+                entry.conn.unbind_s()
+            except _ldap.LDAPError as e:
+                logger.debug("Error closing pooled LDAP connection: %s", e)
+
+
+# KRB5CCNAME is process-wide; GSSAPI binds of concurrent requests must not
+# see each other's ccache
+_krb5ccname_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def krb5ccname(ccache):
+    """
+    Point KRB5CCNAME to `ccache`, or unset it if None, for the GSSAPI binds
+    done in the block. Binds of other threads wait until the block is left,
+    when the previous value is restored.
+    """
+    with _krb5ccname_lock:
+        previous = os.environ.get('KRB5CCNAME')
+        if ccache is None:
+            os.environ.pop('KRB5CCNAME', None)
+        else:
+            os.environ['KRB5CCNAME'] = ccache
+        try:
+            yield
+        finally:
+            if previous is None:
+                os.environ.pop('KRB5CCNAME', None)
+            else:
+                os.environ['KRB5CCNAME'] = previous
+
+
+class _ThreadLocalState(threading.local):
+    """
+    Per-thread state of a shared ldap2 instance.
+    """
+
+    def __init__(self):
+        super(_ThreadLocalState, self).__init__()
+        self.time_limit = float(LDAPClient.time_limit)
+        self.size_limit = int(LDAPClient.size_limit)
+        self.schema = None
+        self.has_schema = False
+        self.decoders = {}
+
+
+def _thread_local_attr(name):
+    def getter(self):
+        return getattr(self._local, name)
+
+    def setter(self, value):
+        setattr(self._local, name, value)
+
+    return property(getter, setter)
+
 
 @register()
 class ldap2(CrudBackend, LDAPClient):
     """
     LDAP Backend Take 2.
+
+    The connection as well as the state that depends on it (time and size
+    limits, schema, attribute decoders) is thread-local, so one instance can
+    serve concurrent requests.
     """
 
+    _time_limit = _thread_local_attr('time_limit')
+    _size_limit = _thread_local_attr('size_limit')
+    _schema = _thread_local_attr('schema')
+    _has_schema = _thread_local_attr('has_schema')
+    _decoders = _thread_local_attr('decoders')
+
     def __init__(self, api):
         force_schema_updates = api.env.context in ('installer', 'updates')
 
+        self._local = _ThreadLocalState()
         CrudBackend.__init__(self, api)
         LDAPClient.__init__(self, None,
                             force_schema_updates=force_schema_updates)
 
-        self._time_limit = float(LDAPClient.time_limit)
-        self._size_limit = int(LDAPClient.size_limit)
+        self._pool = LDAPConnectionPool(api.env.ldap_pool_size,
+                                        api.env.ldap_pool_idle_timeout)
 
     @property
     def ldap_uri(self):
@@ -117,6 +317,43 @@ class ldap2(CrudBackend, LDAPClient):
     def __str__(self):
         return self.ldap_uri
 
+    @contextlib.contextmanager
+    def error_handler(self, arg_desc=None):
+        """Context manager that handles LDAPErrors
+
+        Extends LDAPClient.error_handler; a connection which has failed
+        on the network level is never returned to the connection pool.
+        The operation is accounted to the ``ldap`` phase of the request.
+        """
+        try:
+            with timed_phase('ldap'):
+                with super(ldap2, self).error_handler(arg_desc):
+                    yield
+        except errors.NetworkError:
+            if self.isconnected():
+                self._pool.discard(self.conn)
+            raise
+
+    def _checkout_pooled_connection(self, ccache):
+        """
+        Return a pooled connection bound with the credentials in *ccache*,
+        or ``None``.
+        """
+        creds = krb_utils.get_credentials_if_valid(ccache_name=ccache)
+        if creds is None:
+            return None
+        principal = unicode(creds.name)
+
+        pooled = self._pool.checkout((ccache, principal))
+        if pooled is None:
+            logger.debug("LDAP connection pool miss for %s", principal)
+            return None
+
+        conn, principal = pooled
+        logger.debug("LDAP connection pool hit for %s", principal)
+        setattr(context, 'principal', principal)
+        return conn
+
     def create_connection(
             self, ccache=None, bind_dn=None, bind_pw='', cacert=None,
             autobind=AUTOBIND_AUTO, serverctrls=None, clientctrls=None,
@@ -139,6 +376,9 @@ class ldap2(CrudBackend, LDAPClient):
                 - _missing - keeps previously configured settings
                              (unlimited set by default in constructor)
 
+        Connections bound with a Kerberos ccache are taken from and returned
+        to the connection pool, see `LDAPConnectionPool`.
+
         Extends backend.Connectible.create_connection.
         """
         if bind_dn is None:
@@ -153,6 +393,18 @@ class ldap2(CrudBackend, LDAPClient):
         if size_limit is not _missing:
             object.__setattr__(self, 'size_limit', size_limit)
 
+        ldapi = self.ldap_uri.startswith('ldapi://')
+        poolable = (
+            self._pool.enabled and ccache is not None and not bind_pw and
+            serverctrls is None and clientctrls is None and
+            not (autobind != AUTOBIND_DISABLED and os.getegid() == 0 and
+                 ldapi)
+        )
+        if poolable:
+            conn = self._checkout_pooled_connection(ccache)
+            if conn is not None:
+                return conn
+
         client = LDAPClient(self.ldap_uri,
                             force_schema_updates=self._force_schema_updates,
                             cacert=cacert)
@@ -169,8 +421,6 @@ class ldap2(CrudBackend, LDAPClient):
                 if maxssf < minssf:
                     conn.set_option(_ldap.OPT_X_SASL_SSF_MAX, minssf)
 
-        ldapi = self.ldap_uri.startswith('ldapi://')
-
         if bind_pw:
             client.simple_bind(bind_dn, bind_pw,
                                server_controls=serverctrls,
@@ -188,23 +438,24 @@ class ldap2(CrudBackend, LDAPClient):
             if ldapi:
                 with client.error_handler():
                     conn.set_option(_ldap.OPT_HOST_NAME, self.api.env.host)
-            if ccache is None:
-                os.environ.pop('KRB5CCNAME', None)
-            else:
-                os.environ['KRB5CCNAME'] = ccache
-
-            principal = krb_utils.get_principal(ccache_name=ccache)
+            with krb5ccname(ccache):
+                principal = krb_utils.get_principal(ccache_name=ccache)
 
-            client.gssapi_bind(server_controls=serverctrls,
-                               client_controls=clientctrls)
+                client.gssapi_bind(server_controls=serverctrls,
+                                   client_controls=clientctrls)
             setattr(context, 'principal', principal)
+            if poolable:
+                self._pool.add((ccache, principal), conn, principal)
 
         return conn
 
     def destroy_connection(self):
-        """Disconnect from LDAP server."""
+        """Disconnect from LDAP server.
+
+        Pooled connections are returned to the connection pool instead.
+        """
         try:
-            if self.conn is not None:
+            if self.conn is not None and not self._pool.checkin(self.conn):
                 self.unbind()
         except errors.PublicError:
             # ignore when trying to unbind multiple times
@@ -241,6 +492,25 @@ class ldap2(CrudBackend, LDAPClient):
         context.config_entry = config_entry
         return config_entry
 
+    def get_lastusn(self):
+        """
+        Return the USN of the last change in the directory, or None if not
+        available.
+
+        The USN is read from ``lastusn`` of the root DSE and increases with
+        every entry added, modified or deleted.
+        """
+        entry = self.get_entry(DN(), ['lastusn'])
+        usns = [
+            int(value)
+            for name, values in six.iteritems(entry.raw)
+            if name.lower().startswith('lastusn')
+            for value in values
+        ]
+        if not usns:
+            return None
+        return max(usns)
+
     def has_upg(self):
         """Returns True/False whether User-Private Groups are enabled.
 
@@ -438,6 +708,179 @@ class ldap2(CrudBackend, LDAPClient):
         except errors.MidairCollision:
             raise errors.NotGroupMember()
 
+    def _find_existing_entries(self, dns):
+        """
+        Return dict of the DNs of the entries in `dns` which exist, mapped to
+        their DN as stored in the directory.
+
+        Entries with single valued RDNs are looked up with one search per
+        parent entry and chunk of entries, other entries with one search each.
+        """
+        found = {}
+        by_parent = {}
+        for dn in dns:
+            if dn in found:
+                continue
+            rdn = dn[0] if len(dn) > 1 else None
+            if rdn is None or len(rdn) != 1:
+                try:
+                    found[dn] = self.get_entry(dn, ['']).dn
+                except errors.NotFound:
+                    pass
+                continue
+            by_parent.setdefault(dn[1:], []).append(dn)
+
+        for parent_dn, children in by_parent.items():
+            for i in range(0, len(children), MEMBER_CHUNK_SIZE):
+                chunk = children[i:i + MEMBER_CHUNK_SIZE]
+                filter = self.combine_filters(
+                    [self.make_filter_from_attr(dn[0].attr, dn[0].value)
+                     for dn in chunk],
+                    self.MATCH_ANY)
+                try:
+                    entries, truncated = self.find_entries(
+                        filter, [''], parent_dn, self.SCOPE_ONELEVEL,
+                        size_limit=-1)
+                except errors.NotFound:
+                    entries, truncated = [], False
+                for entry in entries:
+                    found[entry.dn] = entry.dn
+
+                # the matching rule of the RDN attribute may tell apart
+                # values the DN does not, look up the rest one by one
+                if truncated or len(entries) != len(chunk):
+                    for dn in chunk:
+                        if dn in found:
+                            continue
+                        try:
+                            found[dn] = self.get_entry(dn, ['']).dn
+                        except errors.NotFound:
+                            pass
+        return found
+
+    def _get_group_members(self, group_dn, member_attr):
+        """
+        Return set of the values of `member_attr` of the group, or None if
+        they can't be read.
+        """
+        try:
+            entry = self.get_entry(group_dn, [member_attr])
+        except errors.PublicError:
+            return None
+        members = set()
+        for value in entry.get(member_attr, []):
+            # values of attributes without DN syntax are not decoded
+            try:
+                members.add(DN(value))
+            except ValueError:
+                pass
+        return members
+
+    def add_entries_to_group(self, dns, group_dn, member_attr='member',
+                             allow_same=False):
+        """
+        Add entries designated by dns to group group_dn in the member
+        attribute member_attr.
+
+        This is the same as calling `add_entry_to_group` for every DN, but
+        the entries are checked and added in chunks of MEMBER_CHUNK_SIZE
+        entries with one search and one modify operation each.
+
+        Return list of (dn, error) tuples of the entries which could not be
+        added, in the order of `dns`.
+        """
+        assert isinstance(group_dn, DN)
+
+        logger.debug(
+            "add_entries_to_group: %d entries group_dn=%s member_attr=%s",
+            len(dns), group_dn, member_attr)
+
+        failed = {}
+        existing = self._find_existing_entries(dns)
+        members = self._get_group_members(group_dn, member_attr)
+        if members is None:
+            members = set()
+
+        to_add = []
+        for i, dn in enumerate(dns):
+            assert isinstance(dn, DN)
+            if dn not in existing:
+                failed[i] = errors.NotFound(reason='no such entry')
+                continue
+            dn = existing[dn]
+            if dn == group_dn and not allow_same:
+                failed[i] = errors.SameGroupError()
+            elif dn in members:
+                failed[i] = errors.AlreadyGroupMember()
+            else:
+                members.add(dn)
+                to_add.append((i, dn))
+
+        for j in range(0, len(to_add), MEMBER_CHUNK_SIZE):
+            chunk = to_add[j:j + MEMBER_CHUNK_SIZE]
+            try:
+                with self.error_handler():
+                    self.conn.modify_s(str(group_dn), [(
+                        _ldap.MOD_ADD, member_attr,
+                        self.encode([dn for _i, dn in chunk]))])
+            except errors.PublicError:
+                # add the entries one by one to find out which failed
+                for i, dn in chunk:
+                    try:
+                        self.add_entry_to_group(
+                            dn, group_dn, member_attr, allow_same=allow_same)
+                    except errors.PublicError as e:
+                        failed[i] = e
+
+        return [(dns[i], failed[i]) for i in sorted(failed)]
+
+    def remove_entries_from_group(self, dns, group_dn, member_attr='member'):
+        """
+        Remove entries designated by dns from group group_dn.
+
+        This is the same as calling `remove_entry_from_group` for every DN,
+        but the entries are removed in chunks of MEMBER_CHUNK_SIZE entries
+        with one modify operation each.
+
+        Return list of (dn, error) tuples of the entries which could not be
+        removed, in the order of `dns`.
+        """
+        assert isinstance(group_dn, DN)
+
+        logger.debug(
+            "remove_entries_from_group: %d entries group_dn=%s "
+            "member_attr=%s", len(dns), group_dn, member_attr)
+
+        failed = {}
+        members = self._get_group_members(group_dn, member_attr)
+
+        to_remove = []
+        for i, dn in enumerate(dns):
+            assert isinstance(dn, DN)
+            if members is not None:
+                if dn not in members:
+                    failed[i] = errors.NotGroupMember()
+                    continue
+                members.discard(dn)
+            to_remove.append((i, dn))
+
+        for j in range(0, len(to_remove), MEMBER_CHUNK_SIZE):
+            chunk = to_remove[j:j + MEMBER_CHUNK_SIZE]
+            try:
+                with self.error_handler():
+                    self.conn.modify_s(str(group_dn), [(
+                        _ldap.MOD_DELETE, member_attr,
+                        self.encode([dn for _i, dn in chunk]))])
+            except errors.PublicError:
+                # remove the entries one by one to find out which failed
+                for i, dn in chunk:
+                    try:
+                        self.remove_entry_from_group(dn, group_dn, member_attr)
+                    except errors.PublicError as e:
+                        failed[i] = e
+
+        return [(dns[i], failed[i]) for i in sorted(failed)]
+
     def set_entry_active(self, dn, active):
         """Mark entry active/inactive."""
 
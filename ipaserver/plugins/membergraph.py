@@ -0,0 +1,522 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+
+"""
+Process-wide graph of group membership
+"""
+
+import logging
+import threading
+import time
+
+import ldap as _ldap
+
+from ipalib import Backend, errors
+from ipalib.plugable import Registry
+from ipapython.dn import DN
+from ipapython.ipaldap import LDAPClient
+from .ldap2 import krb5ccname
+
+logger = logging.getLogger(__name__)
+
+register = Registry()
+
+# attributes which make an entry a member of another one, the same as
+# memberOfGroupAttr of the memberOf plugin
+MEMBER_ATTRS = ('member', 'memberuser', 'memberhost')
+
+# object classes of entries which may have members, to notice entries whose
+# last member has been removed
+GROUP_OBJECT_CLASSES = ('groupofnames', 'nestedgroup', 'ipaassociation')
+
+# subtrees excluded from the scope of the memberOf plugin
+EXCLUDED_SUBTREES = (
+    DN(('cn', 'compat')),
+    DN(('cn', 'provisioning')),
+    DN(('cn', 'topology'), ('cn', 'ipa'), ('cn', 'etc')),
+)
+
+# seconds after which the graph is loaded again from scratch
+RELOAD_INTERVAL = 3600
+
+# bind rule types of permissions which let every user read
+PUBLIC_BIND_RULE_TYPES = ('all', 'anonymous')
+
+
+def _key(dn):
+    return str(dn).lower()
+
+
+class MemberGraph(object):
+    """
+    Graph of the member, memberUser and memberHost values of entries.
+
+    Entries are identified by their normalized DN. The graph holds at most
+    `size` membership values; `update` returns False once it would hold
+    more.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.usn = None
+        self.count = 0
+        # normalized DNs of the permissions a user has to be a member of to
+        # read all membership values
+        self.restricted = frozenset()
+        # normalized DN -> DN string
+        self._names = {}
+        # normalized DN -> {attribute: set of normalized DNs}
+        self._members = {}
+        # normalized DN -> set of normalized DNs of direct parents
+        self._memberof = {}
+
+    def _intern(self, dn):
+        key = _key(dn)
+        self._names.setdefault(key, str(dn))
+        return key
+
+    def __contains__(self, dn):
+        return _key(dn) in self._members
+
+    def _remove(self, key):
+        for values in self._members.pop(key, {}).values():
+            self.count -= len(values)
+            for value in values:
+                parents = self._memberof.get(value)
+                if parents is not None:
+                    parents.discard(key)
+                    if not parents:
+                        del self._memberof[value]
+
+    def update(self, dn, values):
+        """
+        Set the members of the entry `dn`.
+
+        :param values: dict of member attribute name and list of DNs
+        :returns: False if the graph would grow over its size
+        """
+        key = self._intern(dn)
+        self._remove(key)
+
+        members = {}
+        for attr, dns in values.items():
+            if dns:
+                members[attr] = set(self._intern(value) for value in dns)
+        if not members:
+            return True
+
+        self._members[key] = members
+        for values in members.values():
+            self.count += len(values)
+            for value in values:
+                self._memberof.setdefault(value, set()).add(key)
+        return self.count <= self.size
+
+    def check_memberof(self, dn, memberof):
+        """
+        Remove the stale memberships of the entry `dn`.
+
+        Every direct parent must be in memberOf of the entry. Parents which
+        are not have been deleted or renamed.
+
+        :returns: False if the entry has no memberOf values but parents
+            in the graph, which can't be told from memberOf not being
+            readable
+        """
+        key = _key(dn)
+        parents = self._memberof.get(key)
+        if not parents:
+            return True
+        if not memberof:
+            return False
+        valid = set(_key(value) for value in memberof)
+        for parent in parents - valid:
+            for values in self._members.get(parent, {}).values():
+                if key in values:
+                    values.discard(key)
+                    self.count -= 1
+            parents.discard(parent)
+        if not parents:
+            del self._memberof[key]
+        return True
+
+    def apply(self, changes, usn):
+        """
+        Apply changes of entries and set the USN of the graph.
+
+        :param changes: list of DN, dict of member attribute name and list
+            of DNs or None if the entry can't have members, and list of
+            memberOf DNs of the changed entries
+        :returns: False if the graph has to be loaded again
+        """
+        for dn, values, _memberof in changes:
+            if values is None and dn in self:
+                values = {}
+            if values is not None and not self.update(dn, values):
+                return False
+
+        # check memberships once all changed entries are updated
+        for dn, _values, memberof in changes:
+            if not self.check_memberof(dn, memberof):
+                return False
+
+        self.usn = usn
+        return True
+
+    def _names_of(self, keys):
+        return [DN(self._names[key]) for key in keys]
+
+    def _descendants(self, key):
+        found = set()
+        stack = [key]
+        while stack:
+            for values in self._members.get(stack.pop(), {}).values():
+                for value in values:
+                    if value not in found and value != key:
+                        found.add(value)
+                        stack.append(value)
+        return found
+
+    def _ancestors(self, key):
+        found = set()
+        stack = [key]
+        while stack:
+            for value in self._memberof.get(stack.pop(), ()):
+                if value not in found and value != key:
+                    found.add(value)
+                    stack.append(value)
+        return found
+
+    def get_members(self, dn, indirect=False):
+        """
+        Return DNs of the direct or the indirect members of the entry `dn`.
+
+        Indirect members are the members of the entries nested in the entry
+        which are not its direct members.
+        """
+        key = _key(dn)
+        direct = self._members.get(key, {}).get('member', set())
+        if not indirect:
+            return self._names_of(direct)
+
+        members = set()
+        for nested in self._descendants(key):
+            members.update(self._members.get(nested, {}).get('member', ()))
+        return self._names_of(members - direct)
+
+    def get_memberof(self, dn, indirect=False):
+        """
+        Return DNs of the entries of which the entry `dn` is a direct or an
+        indirect member.
+        """
+        key = _key(dn)
+        direct = self._memberof.get(key, set())
+        if not indirect:
+            return self._names_of(direct)
+        return self._names_of(self._ancestors(key) - direct)
+
+
+@register()
+class membergraph(Backend):
+    """
+    Graph of the membership of all entries with members.
+
+    The graph is shared by all users of the server process. It is loaded
+    with the credentials of the process, i.e. the HTTP service, with one
+    paged search when it is first needed and then kept up to date by
+    searching for the entries whose entryUSN is greater than the
+    ``lastusn`` of the root DSE at the last update. Changes of entries
+    deleted or renamed since then are noticed from the memberOf values of
+    their former members. The graph is loaded again from scratch every hour.
+
+    The membership attributes are readable by all users with the default
+    permissions. If a permission granting read access to them has been
+    restricted, only the members of the permission are answered from the
+    graph; for other users the queries return None.
+
+    ``lastusn`` is read once per query of several entries, which are all
+    answered from the same state of the graph. Loads and updates are
+    serialized and run without holding the lock which guards swapping in
+    a loaded graph, applying the changes found and answering queries.
+
+    All queries return None when the graph is not available, i.e. when it
+    would have more than ``member_graph_size`` membership values or it could
+    not be loaded. The caller has to search LDAP instead then.
+    """
+
+    def __init__(self, api):
+        super(membergraph, self).__init__(api)
+        self._size = api.env.member_graph_size
+        # the plugin is locked once finalized, keep the graph, the time it
+        # was loaded and the connection used to load it in a mutable
+        # container
+        self._state = dict(graph=None, loaded=None, conn=None)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def clear(self):
+        with self._refresh_lock:
+            self._disconnect()
+            with self._lock:
+                self._state.update(graph=None, loaded=None)
+
+    def _connect(self):
+        """
+        Return the connection bound with the credentials of the server
+        process.
+        """
+        conn = self._state['conn']
+        if conn is not None:
+            return conn
+        conn = LDAPClient(self.api.env.ldap_uri)
+        try:
+            if conn.ldap_uri.startswith('ldapi://'):
+                with conn.error_handler():
+                    conn.conn.set_option(_ldap.OPT_HOST_NAME,
+                                         self.api.env.host)
+            # without a ccache, GSSAPI uses the credentials of the process
+            with krb5ccname(None):
+                conn.gssapi_bind()
+        except Exception:
+            conn.close()
+            raise
+        self._state['conn'] = conn
+        return conn
+
+    def _disconnect(self):
+        conn = self._state['conn']
+        if conn is not None:
+            self._state['conn'] = None
+            conn.close()
+
+    def _get_dns(self, entry):
+        return {
+            attr: [DN(value.decode('utf-8'))
+                   for value in entry.raw.get(attr, [])]
+            for attr in MEMBER_ATTRS
+        }
+
+    def _in_scope(self, dn):
+        return not any(
+            dn.endswith(DN(subtree, self.api.env.basedn))
+            for subtree in EXCLUDED_SUBTREES)
+
+    def _get_restricted(self, conn):
+        """
+        Return normalized DNs of the permissions which grant read access to
+        membership attributes to some users only.
+        """
+        filter = '(&(objectclass=ipapermission)(ipapermright=read)(|%s))' % (
+            ''.join('(ipapermdefaultattr=%s)' % attr for attr in MEMBER_ATTRS))
+        try:
+            entries = conn.get_entries(
+                DN(self.api.env.container_permission, self.api.env.basedn),
+                conn.SCOPE_ONELEVEL, filter,
+                ['ipapermbindruletype', 'ipapermdefaultattr',
+                 'ipapermexcludedattr'],
+                size_limit=-1, paged_search=True)
+        except errors.NotFound:
+            return frozenset()
+
+        restricted = set()
+        for entry in entries:
+            bind_types = [value.lower()
+                          for value in entry.get('ipapermbindruletype', [])]
+            excluded = [value.lower()
+                        for value in entry.get('ipapermexcludedattr', [])]
+            if (not any(t in PUBLIC_BIND_RULE_TYPES for t in bind_types) or
+                    any(attr in excluded for attr in MEMBER_ATTRS)):
+                restricted.add(_key(entry.dn))
+        return frozenset(restricted)
+
+    def _load(self, conn, usn):
+        graph = MemberGraph(self._size)
+        filter = '(|%s)' % ''.join('(%s=*)' % attr for attr in MEMBER_ATTRS)
+        try:
+            for entry in conn.iter_entries(
+                    self.api.env.basedn,
+                    filter=filter,
+                    attrs_list=list(MEMBER_ATTRS),
+                    size_limit=-1,  # paged search will get everything anyway
+                    paged_search=True):
+                if not self._in_scope(entry.dn):
+                    continue
+                if not graph.update(entry.dn, self._get_dns(entry)):
+                    logger.debug("Member graph exceeds %d values",
+                                 self._size)
+                    return None
+        except errors.NotFound:
+            pass
+
+        graph.restricted = self._get_restricted(conn)
+        graph.usn = usn
+        return graph
+
+    def _search_changes(self, conn, usn):
+        """
+        Search for the entries changed after `usn`.
+
+        :returns: list of DN, member values or None if the entry has no
+            members, and memberOf values of the changed entries
+        """
+        # every change of membership changes memberOf of the members, so the
+        # members of deleted and renamed entries are found too
+        filter = '(entryusn>=%d)' % (usn + 1)
+        attrs_list = list(MEMBER_ATTRS) + ['memberof', 'objectclass']
+        changes = []
+        try:
+            for entry in conn.iter_entries(
+                    self.api.env.basedn,
+                    filter=filter,
+                    attrs_list=attrs_list,
+                    size_limit=-1,
+                    paged_search=True):
+                if not self._in_scope(entry.dn):
+                    continue
+                objectclasses = [
+                    oc.lower() for oc in entry.get('objectclass', [])]
+                if (any(attr in entry.raw for attr in MEMBER_ATTRS) or
+                        any(oc in objectclasses
+                            for oc in GROUP_OBJECT_CLASSES)):
+                    values = self._get_dns(entry)
+                else:
+                    values = None
+                memberof = [DN(value.decode('utf-8'))
+                            for value in entry.raw.get('memberof', [])]
+                changes.append((entry.dn, values, memberof))
+        except errors.NotFound:
+            pass
+        return changes
+
+    def _get_current(self):
+        """
+        Return the graph and whether it has to be loaded again.
+        """
+        with self._lock:
+            graph = self._state['graph']
+            loaded = self._state['loaded']
+        expired = loaded is None or time.time() - loaded > RELOAD_INTERVAL
+        return graph, expired
+
+    def _refresh(self, ldap):
+        """
+        Return the up to date graph, or None if it is not available.
+        """
+        if self._size <= 0:
+            return None
+        try:
+            usn = ldap.get_lastusn()
+        except errors.PublicError as e:
+            logger.debug("Failed to read lastusn: %s", e)
+            return None
+        if usn is None:
+            return None
+
+        # a graph too large is not loaded again until the interval elapses
+        graph, expired = self._get_current()
+        if not expired and (graph is None or graph.usn >= usn):
+            return graph
+
+        with self._refresh_lock:
+            # another request may have refreshed the graph meanwhile
+            graph, expired = self._get_current()
+            if not expired and (graph is None or graph.usn >= usn):
+                return graph
+
+            state = self._state
+            now = time.time()
+            try:
+                conn = self._connect()
+                if not expired:
+                    changes = self._search_changes(conn, graph.usn)
+                    restricted = graph.restricted
+                    container = DN(self.api.env.container_permission,
+                                   self.api.env.basedn)
+                    if any(dn.endswith(container) for dn, _v, _m in changes):
+                        restricted = self._get_restricted(conn)
+                    with self._lock:
+                        if graph.apply(changes, usn):
+                            graph.restricted = restricted
+                            return graph
+                        state['graph'] = None
+
+                graph = self._load(conn, usn)
+            except errors.PublicError as e:
+                logger.debug("Failed to update member graph: %s", e)
+                self._disconnect()
+                graph = None
+            with self._lock:
+                state.update(graph=graph, loaded=now)
+        return graph
+
+    def _has_access(self, ldap, graph):
+        """
+        Tell whether the user of the request may read all membership values
+        in the graph.
+        """
+        restricted = graph.restricted
+        if not restricted:
+            return True
+        try:
+            with ldap.error_handler():
+                dn = DN(ldap.conn.whoami_s()[4:])
+            entry = ldap.get_entry(dn, ['memberof'])
+        except (errors.PublicError, ValueError):
+            return False
+        memberof = set(_key(value) for value in entry.get('memberof', []))
+        return restricted <= memberof
+
+    def _get_graph(self):
+        ldap = self.api.Backend.ldap2
+        if not ldap.isconnected():
+            return None
+        graph = self._refresh(ldap)
+        if graph is None or not self._has_access(ldap, graph):
+            return None
+        return graph
+
+    def get_members_multi(self, dns, indirect=False):
+        """
+        Return DNs of the direct or indirect members of the entries `dns`
+        as the ``member`` or ``memberindirect`` attribute has them.
+
+        :returns: dict keyed by the DNs in `dns`, or None
+        """
+        graph = self._get_graph()
+        if graph is None:
+            return None
+        with self._lock:
+            return {dn: graph.get_members(dn, indirect) for dn in dns}
+
+    def get_memberof_multi(self, dns, indirect=False):
+        """
+        Return DNs of the entries of which the entries `dns` are direct or
+        indirect members.
+
+        :returns: dict keyed by the DNs in `dns`, or None
+        """
+        graph = self._get_graph()
+        if graph is None:
+            return None
+        with self._lock:
+            return {dn: graph.get_memberof(dn, indirect) for dn in dns}
+
+    def get_members(self, dn, indirect=False):
+        """
+        Return DNs of the direct or indirect members of the entry `dn`.
+        """
+        members = self.get_members_multi([dn], indirect)
+        if members is None:
+            return None
+        return members[dn]
+
+    def get_memberof(self, dn, indirect=False):
+        """
+        Return DNs of the entries of which the entry `dn` is a direct or an
+        indirect member.
+        """
+        memberof = self.get_memberof_multi([dn], indirect)
+        if memberof is None:
+            return None
+        return memberof[dn]
@@ -64,13 +64,27 @@ register = Registry()
 # for yourself, but the parameter is still required
 MAGIC_VALUE = u'CHANGING_PASSWORD_FOR_ANOTHER_USER'
 
+
+def get_current_principal():
+    """
+    Return the principal of the current request.
+
+    On the server this is taken from the request context rather than from
+    KRB5CCNAME, which is shared by all threads of the process.
+    """
+    principal = getattr(context, 'principal', None)
+    if principal is None:
+        principal = krb_utils.get_principal()
+    return principal
+
+
 def get_current_password(principal):
     """
     If the user is changing their own password then return None so the
     current password is prompted for, otherwise return a fixed value to
     be ignored later.
     """
-    current_principal = krb_utils.get_principal()
+    current_principal = get_current_principal()
     if current_principal == unicode(normalize_user_principal(principal)):
         return None
     else:
@@ -88,7 +102,7 @@ class passwd(Command):
             label=_('User name'),
             primary_key=True,
             autofill=True,
-            default_from=lambda: kerberos.Principal(krb_utils.get_principal()),
+            default_from=lambda: kerberos.Principal(get_current_principal()),
             normalizer=lambda value: normalize_user_principal(value),
         ),
         Password('password',
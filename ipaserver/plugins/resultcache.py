@@ -0,0 +1,203 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+
+"""
+Process-wide cache of results of read-only commands
+"""
+
+import collections
+import copy
+import logging
+import threading
+import time
+
+import six
+
+from ipalib import Backend
+from ipalib.plugable import Registry
+from ipalib.request import context
+
+logger = logging.getLogger(__name__)
+
+register = Registry()
+
+
+def _freeze(value):
+    """
+    Convert lists and dicts in a command argument to hashable values.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(
+            sorted((k, _freeze(v)) for k, v in six.iteritems(value)))
+    return value
+
+
+class ResultCache(object):
+    """
+    Size and time limited LRU cache of command results.
+
+    Every result is stored together with the USN of the directory at the
+    time the command was executed. A result is only returned as long as
+    the USN has not changed, i.e. no entry has been added, modified or
+    deleted since.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.size > 0 and self.ttl > 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                invalidations=self.invalidations,
+                entries=len(self._entries),
+                hit_rate=float(self.hits) / lookups if lookups else 0.0,
+            )
+
+    def get(self, key, usn):
+        """
+        Return a copy of the result cached for `key` or None.
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                cached_usn, expires, result = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            if cached_usn != usn or expires < now:
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            # re-insert as the most recently used entry
+            self._entries[key] = (cached_usn, expires, result)
+            self.hits += 1
+        return copy.deepcopy(result)
+
+    def set(self, key, usn, result):
+        entry = (usn, time.time() + self.ttl, copy.deepcopy(result))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+@register()
+class resultcache(Backend):
+    """
+    Cache of results of commands with ``cache_results`` set.
+
+    Results are keyed by command, arguments, options, effective principal
+    and language, and are invalidated by any change in the directory as
+    reported by ``lastusn`` of the root DSE.
+
+    ``lastusn`` is read once per request, so that cheap commands do not pay
+    for an extra search. Any other command may change the directory and
+    makes the next cached command of the request read it again. So does a
+    cached command called from another command, as the calling command may
+    have changed the directory itself after ``lastusn`` was read.
+    """
+
+    def __init__(self, api):
+        super(resultcache, self).__init__(api)
+        self._cache = ResultCache(api.env.result_cache_size,
+                                  api.env.result_cache_ttl)
+
+    def stats(self):
+        return self._cache.stats()
+
+    def clear(self):
+        self._cache.clear()
+
+    def _get_usn(self):
+        usn = getattr(context, 'result_cache_usn', None)
+        if usn is not None:
+            return usn
+        ldap = self.api.Backend.ldap2
+        if not ldap.isconnected():
+            return None
+        usn = ldap.get_lastusn()
+        setattr(context, 'result_cache_usn', usn)
+        return usn
+
+    def reset_usn(self):
+        """
+        Make the next cached command of the request read ``lastusn`` again.
+        """
+        try:
+            delattr(context, 'result_cache_usn')
+        except AttributeError:
+            pass
+
+    def _make_key(self, command, args, options):
+        key = (
+            command.name,
+            _freeze(args),
+            _freeze(options),
+            getattr(context, 'principal', None),
+            tuple(getattr(context, 'languages', ())),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def execute(self, command, *args, **options):
+        """
+        Execute `command`, or return its cached result.
+        """
+        depth = getattr(context, 'result_cache_depth', 0)
+        setattr(context, 'result_cache_depth', depth + 1)
+        try:
+            if not command.cache_results:
+                # the command may change the directory
+                self.reset_usn()
+                try:
+                    return command.execute(*args, **options)
+                finally:
+                    self.reset_usn()
+            if depth > 0:
+                # the calling command may have changed the directory
+                self.reset_usn()
+            return self._execute_cached(command, *args, **options)
+        finally:
+            setattr(context, 'result_cache_depth', depth)
+
+    def _execute_cached(self, command, *args, **options):
+        if not self._cache.enabled:
+            return command.execute(*args, **options)
+
+        key = self._make_key(command, args, options)
+        usn = self._get_usn() if key is not None else None
+        if usn is None:
+            return command.execute(*args, **options)
+
+        result = self._cache.get(key, usn)
+        if result is not None:
+            logger.debug('%s: using cached result', command.name)
+            return result
+
+        result = command.execute(*args, **options)
+        self._cache.set(key, usn, result)
+        return result
@@ -360,10 +360,8 @@ class topic_(MetaObject):
         if self.__topics is not None and self.__topics_by_key is not None:
             return
 
-        object.__setattr__(self, '_topic___topics', [])
-        topics = self.__topics
-        object.__setattr__(self, '_topic___topics_by_key', {})
-        topics_by_key = self.__topics_by_key
+        topics = []
+        topics_by_key = {}
 
         for command in self.api.Command():
             topic_value = command.topic
@@ -381,10 +379,8 @@ class topic_(MetaObject):
                     'full_name': topic_full_name,
                 }
                 topics.append(topic)
-                # pylint: disable=unsupported-assignment-operation
                 topics_by_key[topic_name] = topic
                 topics_by_key[topic_full_name] = topic
-                # pylint: enable=unsupported-assignment-operation
 
                 for package in self.api.packages:
                     module_name = '.'.join((package.__name__, topic_name))
@@ -410,6 +406,11 @@ class topic_(MetaObject):
                     else:
                         topic.pop('topic_topic', None)
 
+        # publish only fully built tables so that concurrent requests never
+        # see a partially filled topic list
+        object.__setattr__(self, '_topic___topics_by_key', topics_by_key)
+        object.__setattr__(self, '_topic___topics', topics)
+
     def _get_obj(self, topic, **kwargs):
         return topic
 
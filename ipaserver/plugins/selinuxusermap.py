@@ -434,7 +434,8 @@ class selinuxusermap_find(LDAPSearch):
 all=True)['result']
                 dn = hbac['dn']
             except errors.NotFound:
-                return dict(count=0, result=[], truncated=False)
+                return dict(count=0, result=[], truncated=False,
+                            total=None)
             options['seealso'] = dn
 
         return super(selinuxusermap_find, self).execute(*args, **options)
@@ -85,6 +85,7 @@ class server_role_show(Retrieve):
 
     obj_name = 'server_role'
     attr_name = 'show'
+    cache_results = True
 
     def get_args(self):
         for arg in super(server_role_show, self).get_args():
@@ -112,6 +113,7 @@ class server_role_find(Search):
 
     msg_summary = ngettext('%(count)s server role matched',
                            '%(count)s server roles matched', 0)
+    cache_results = True
     takes_options = Search.takes_options + (
         Int(
             'timelimit?',
@@ -45,7 +45,8 @@ import six
 from ipalib import errors, _
 from ipalib.backend import Backend
 from ipalib.plugable import Registry
-from ipaserver.servroles import (attribute_instances, ENABLED, role_instances)
+from ipaserver.servroles import (
+    attribute_instances, BaseServerRole, ENABLED, role_instances)
 from ipaserver.servroles import SingleValuedServerAttribute
 
 
@@ -116,9 +117,33 @@ class serverroles(Backend):
             except errors.NotFound:
                 found_roles = []
 
+        found_roles = list(found_roles)
+        if not found_roles:
+            return []
+
+        # search for the entries of all roles at once and the masters
+        # lacking a role only once
+        ldap2 = self.api.Backend.ldap2
+        searches = [
+            role.get_status_search(ldap2, self.api, server=server_server)
+            for role in found_roles]
+        if server_server is None:
+            searches.append(BaseServerRole.get_masters_search(self.api))
+
+        search_results = ldap2.find_entries_multi(searches)
+        for entries, truncated in search_results:
+            ldap2.handle_truncated_result(truncated)
+
+        all_masters = None
+        if server_server is None:
+            all_masters = search_results.pop()[0]
+
         result = []
-        for found_role in found_roles:
-            role_status = found_role.status(self.api, server=server_server)
+        for found_role, (entries, _truncated) in zip(found_roles,
+                                                     search_results):
+            role_status = found_role.get_status_from_entries(
+                ldap2, self.api, entries, server=server_server,
+                all_masters=all_masters)
 
             result.extend(role_status)
 
@@ -19,15 +19,17 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import threading
 import time
 from time import gmtime, strftime
 import posixpath
 
+import ldap as _ldap
 import six
 
 from ipalib import api
 from ipalib import errors
-from ipalib import Bool, Flag, Str
+from ipalib import Bool, Flag, Int, Str
 from .baseuser import (
     baseuser,
     baseuser_add,
@@ -50,6 +52,7 @@ from .baseuser import (
     baseuser_add_certmapdata,
     baseuser_remove_certmapdata)
 from .idviews import remove_ipaobject_overrides
+from .ldap2 import krb5ccname
 from ipalib.plugable import Registry
 from .baseldap import (
     LDAPObject,
@@ -1058,6 +1061,10 @@ class userstatus(LDAPObject):
             label=_('Time now'),
             flags={'virtual_attribute', 'no_create', 'no_update', 'no_search'},
         ),
+        Int('latency?',
+            label=_('Response time (ms)'),
+            flags={'virtual_attribute', 'no_create', 'no_update', 'no_search'},
+        ),
     )
 
 
@@ -1071,8 +1078,9 @@ class user_status(LDAPQuery):
     policy. A locked account is a temporary condition and may be unlocked by
     an administrator.
 
-    This connects to each IPA master and displays the lockout status on
-    each one.
+    This connects to all IPA masters at once and displays the lockout status
+    on each one, along with the time the master took to reply. Masters which
+    do not reply within the user_status_timeout are reported as timed out.
 
     To determine whether an account is locked on a given server you need
     to compare the number of failed logins and the time of the last failure.
@@ -1096,6 +1104,90 @@ class user_status(LDAPQuery):
                 arg = arg.clone(cli_name='login')
             yield arg
 
+    def _query_master(self, host, dn, attr_list, timeout, ccache, status):
+        """
+        Read the entry `dn` from the master `host` into `status`, binding
+        with the credentials in `ccache`.
+        """
+        start = time.time()
+        other_ldap = None
+        try:
+            try:
+                other_ldap = LDAPClient(ldap_uri='ldap://%s' % host)
+                other_ldap.conn.set_option(_ldap.OPT_NETWORK_TIMEOUT, timeout)
+                other_ldap.conn.set_option(_ldap.OPT_TIMEOUT, timeout)
+                # connect before taking the lock of KRB5CCNAME, so that a
+                # master which does not reply does not hold up other binds
+                try:
+                    other_ldap.get_entry(DN(), ['supportedsaslmechanisms'])
+                except (errors.NetworkError, errors.DatabaseTimeout):
+                    raise
+                except errors.PublicError:
+                    # anonymous access is denied, the master is up anyway
+                    pass
+                with krb5ccname(ccache):
+                    other_ldap.gssapi_bind()
+            except Exception as e:
+                status['connect_error'] = e
+                return
+            try:
+                status['entry'] = other_ldap.get_entry(dn, attr_list)
+            except Exception as e:
+                status['error'] = e
+        finally:
+            if other_ldap is not None:
+                other_ldap.close()
+            status['latency'] = int((time.time() - start) * 1000)
+
+    def _query_masters(self, hosts, dn, attr_list):
+        """
+        Read the entry `dn` from all `hosts` concurrently.
+
+        Each master is read in its own thread, the local one through the
+        connection of the request. Masters which do not reply within
+        ``user_status_timeout`` seconds are skipped.
+
+        :returns: dict of host name and dict with either the ``entry``, or
+            the ``connect_error`` or ``error`` raised, and the ``latency``
+            in milliseconds
+        """
+        timeout = self.api.env.user_status_timeout
+        deadline = time.time() + timeout
+        statuses = dict((host, {}) for host in hosts)
+        # the request context is not available in the worker threads
+        ccache = getattr(context, 'ccache_name', None)
+        workers = []
+
+        for host in hosts:
+            if host == api.env.host:
+                continue
+            thread = threading.Thread(
+                target=self._query_master,
+                args=(host, dn, attr_list, timeout, ccache, statuses[host]),
+                name='user_status-%s' % host)
+            thread.daemon = True
+            thread.start()
+            workers.append(thread)
+
+        if api.env.host in statuses:
+            status = statuses[api.env.host]
+            start = time.time()
+            try:
+                status['entry'] = self.obj.backend.get_entry(dn, attr_list)
+            except errors.NotFound:
+                raise
+            except Exception as e:
+                status['error'] = e
+            status['latency'] = int((time.time() - start) * 1000)
+
+        for thread in workers:
+            thread.join(max(0, deadline - time.time()))
+
+        # statuses of threads still running are not complete
+        return dict(
+            (host, dict(status) if 'latency' in status else {})
+            for host, status in statuses.items())
+
     def execute(self, *keys, **options):
         ldap = self.obj.backend
         dn = self.api.Object.user.get_either_dn(*keys, **options)
@@ -1113,64 +1205,75 @@ class user_status(LDAPQuery):
             # If this happens we have some pretty serious problems
             logger.error('No IPA masters found!')
 
+        hosts = [master['cn'][0] for master in masters]
+        try:
+            statuses = self._query_masters(hosts, dn, attr_list)
+        except errors.NotFound:
+            raise self.api.Object.user.handle_not_found(*keys)
+
         entries = []
         count = 0
-        for master in masters:
-            host = master['cn'][0]
-            if host == api.env.host:
-                other_ldap = self.obj.backend
-            else:
-                try:
-                    other_ldap = LDAPClient(ldap_uri='ldap://%s' % host)
-                    other_ldap.gssapi_bind()
-                except Exception as e:
-                    logger.error("user_status: Connecting to %s failed with "
-                                 "%s", host, str(e))
-                    newresult = {'dn': dn}
-                    newresult['server'] = _("%(host)s failed: %(error)s") % dict(host=host, error=str(e))
-                    entries.append(newresult)
-                    count += 1
-                    continue
-            try:
-                entry = other_ldap.get_entry(dn, attr_list)
-                newresult = {'dn': dn}
-                for attr in ['krblastsuccessfulauth', 'krblastfailedauth']:
-                    newresult[attr] = entry.get(attr, [u'N/A'])
-                newresult['krbloginfailedcount'] = entry.get('krbloginfailedcount', u'0')
-                if not options.get('raw', False):
-                    for attr in ['krblastsuccessfulauth', 'krblastfailedauth']:
-                        try:
-                            if newresult[attr][0] == u'N/A':
-                                continue
-                            newtime = time.strptime(newresult[attr][0], '%Y%m%d%H%M%SZ')
-                            newresult[attr][0] = unicode(time.strftime('%Y-%m-%dT%H:%M:%SZ', newtime))
-                        except Exception as e:
-                            logger.debug("time conversion failed with %s",
-                                         str(e))
-                newresult['server'] = host
-                if options.get('raw', False):
-                    time_format = '%Y%m%d%H%M%SZ'
-                else:
-                    time_format = '%Y-%m-%dT%H:%M:%SZ'
-                newresult['now'] = unicode(strftime(time_format, gmtime()))
-                convert_nsaccountlock(entry)
-                if 'nsaccountlock' in entry:
-                    disabled = entry['nsaccountlock']
-                self.api.Object.user.get_preserved_attribute(entry, options)
+        for host in hosts:
+            status = statuses[host]
+            newresult = {'dn': dn}
+            if 'latency' in status:
+                newresult['latency'] = status['latency']
+            if 'connect_error' in status:
+                e = status['connect_error']
+                logger.error("user_status: Connecting to %s failed with "
+                             "%s", host, str(e))
+                newresult['server'] = _("%(host)s failed: %(error)s") % dict(
+                    host=host, error=str(e))
                 entries.append(newresult)
                 count += 1
-            except errors.NotFound:
-                raise self.api.Object.user.handle_not_found(*keys)
-            except Exception as e:
+                continue
+            if 'latency' not in status:
+                logger.error("user_status: Retrieving status for %s from %s "
+                             "timed out", dn, host)
+                newresult['server'] = _("%(host)s timed out") % dict(host=host)
+                entries.append(newresult)
+                count += 1
+                continue
+            if 'error' in status:
+                e = status['error']
+                if isinstance(e, errors.NotFound):
+                    raise self.api.Object.user.handle_not_found(*keys)
                 logger.error("user_status: Retrieving status for %s failed "
                              "with %s", dn, str(e))
-                newresult = {'dn': dn}
                 newresult['server'] = _("%(host)s failed") % dict(host=host)
                 entries.append(newresult)
                 count += 1
-
-            if host != api.env.host:
-                other_ldap.close()
+                continue
+
+            entry = status['entry']
+            for attr in ['krblastsuccessfulauth', 'krblastfailedauth']:
+                newresult[attr] = entry.get(attr, [u'N/A'])
+            newresult['krbloginfailedcount'] = entry.get(
+                'krbloginfailedcount', u'0')
+            if not options.get('raw', False):
+                for attr in ['krblastsuccessfulauth', 'krblastfailedauth']:
+                    try:
+                        if newresult[attr][0] == u'N/A':
+                            continue
+                        newtime = time.strptime(newresult[attr][0],
+                                                '%Y%m%d%H%M%SZ')
+                        newresult[attr][0] = unicode(
+                            time.strftime('%Y-%m-%dT%H:%M:%SZ', newtime))
+                    except Exception as e:
+                        logger.debug("time conversion failed with %s",
+                                     str(e))
+            newresult['server'] = host
+            if options.get('raw', False):
+                time_format = '%Y%m%d%H%M%SZ'
+            else:
+                time_format = '%Y-%m-%dT%H:%M:%SZ'
+            newresult['now'] = unicode(strftime(time_format, gmtime()))
+            convert_nsaccountlock(entry)
+            if 'nsaccountlock' in entry:
+                disabled = entry['nsaccountlock']
+            self.api.Object.user.get_preserved_attribute(entry, options)
+            entries.append(newresult)
+            count += 1
 
         return dict(result=entries,
                     count=count,
@@ -903,7 +903,7 @@ class vault_find(LDAPSearch):
 
     def exc_callback(self, args, options, exc, call_func, *call_args,
                      **call_kwargs):
-        if call_func.__name__ == 'find_entries':
+        if call_func.__name__ in ('find_entries', 'find_entries_window'):
             if isinstance(exc, errors.NotFound):
                 # ignore missing containers since they will be created
                 # automatically on vault creation.
@@ -24,9 +24,13 @@ Also see the `ipalib.rpc` module.
 """
 
 import logging
+from subprocess import CalledProcessError
 from xml.sax.saxutils import escape
 import os
+import threading
+import time
 import traceback
+import zlib
 
 import gssapi
 import requests
@@ -43,21 +47,24 @@ from six.moves.xmlrpc_client import Fault
 from ipalib import plugable, errors
 from ipalib.capabilities import VERSION_WITHOUT_CAPABILITIES
 from ipalib.frontend import Local
-from ipalib.install.kinit import kinit_armor, kinit_password
+from ipalib.install.kinit import (
+    kinit_armor, kinit_password_in_process, KRB5KDC_ERR_NAME_EXP,
+    KRB5KDC_ERR_CLIENT_REVOKED, KRB5KDC_ERR_KEY_EXP, KRB5_LIBOS_CANTREADPWD)
 from ipalib.backend import Executioner
 from ipalib.errors import (PublicError, InternalError, JSONError,
     CCacheError, RefererError, InvalidSessionPassword, NotFound, ACIError,
     ExecutionError, PasswordExpired, KrbPrincipalExpired, UserLocked)
-from ipalib.request import context, destroy_context
+from ipalib.request import (
+    context, destroy_context, AuditRecord, RequestTimer, timed_phase)
 from ipalib.rpc import (xml_dumps, xml_loads,
-    json_encode_binary, json_decode_binary)
+                        json_iterencode_binary, json_decode_binary)
 from ipapython.dn import DN
 from ipaserver.plugins.ldap2 import ldap2
 from ipalib.backend import Backend
 from ipalib.krb_utils import (
     get_credentials_if_valid)
 from ipapython import kerberos
-from ipapython import ipautil
+from ipapython.session_storage import KRB5Error
 from ipaplatform.paths import paths
 from ipapython.version import VERSION
 from ipalib.text import _
@@ -187,6 +194,44 @@ class HTTP_Status(plugable.Plugin):
         output = _unauthorized_template % dict(message=escape(message))
         return [output.encode('utf-8')]
 
+
+# Content codings of request bodies understood by read_input(), advertised
+# in the Accept-Encoding header of RPC responses (RFC 7694)
+INPUT_CONTENT_CODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'x-gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+# Upper limit of a decompressed request body
+MAX_DECODED_INPUT_SIZE = 128 * 1024 * 1024
+
+
+def decode_input(data, content_coding):
+    """
+    Decompress a request body sent with Content-Encoding *content_coding*.
+    """
+    content_coding = content_coding.strip().lower()
+    if content_coding in ('', 'identity'):
+        return data
+    try:
+        wbits = INPUT_CONTENT_CODINGS[content_coding]
+    except KeyError:
+        raise errors.ValidationError(
+            name='Content-Encoding',
+            error=_('unsupported content coding "%s"') % content_coding)
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        data = decompressor.decompress(data, MAX_DECODED_INPUT_SIZE)
+    except zlib.error as e:
+        raise errors.ValidationError(name='Content-Encoding', error=str(e))
+    if decompressor.unconsumed_tail:
+        raise errors.ValidationError(
+            name='Content-Encoding',
+            error=_('decompressed request body is too large'))
+    return data
+
+
 def read_input(environ):
     """
     Read the request body from environ['wsgi.input'].
@@ -195,7 +240,9 @@ def read_input(environ):
         length = int(environ.get('CONTENT_LENGTH'))
     except (ValueError, TypeError):
         return
-    return environ['wsgi.input'].read(length).decode('utf-8')
+    data = environ['wsgi.input'].read(length)
+    data = decode_input(data, environ.get('HTTP_CONTENT_ENCODING', ''))
+    return data.decode('utf-8')
 
 
 def params_2_args_options(params):
@@ -351,19 +398,30 @@ class WSGIExecutioner(Executioner):
                 lang = lang_reg.split('-')[0]
                 setattr(context, "languages", [lang])
 
-            if (
-                environ.get('CONTENT_TYPE', '').startswith(self.content_type)
-                and environ['REQUEST_METHOD'] == 'POST'
-            ):
-                data = read_input(environ)
-                (name, args, options, _id) = self.unmarshal(data)
-            else:
-                (name, args, options, _id) = self.simple_unmarshal(environ)
+            with timed_phase('unmarshal'):
+                if (
+                    environ.get('CONTENT_TYPE', '').startswith(
+                        self.content_type)
+                    and environ['REQUEST_METHOD'] == 'POST'
+                ):
+                    data = read_input(environ)
+                    (name, args, options, _id) = self.unmarshal(data)
+                else:
+                    (name, args, options, _id) = self.simple_unmarshal(
+                        environ)
+            timer = getattr(context, 'timer', None)
+            if timer is not None:
+                timer.name = name
 
             if name in self._system_commands:
                 result = self._system_commands[name](self, *args, **options)
             else:
                 command = self._get_command(name)
+                # the command records its converted params, the log message
+                # is only formatted if it is emitted
+                audit_record = self._audit_record(name, args, options)
+                audit_record.command = command
+                setattr(context, 'audit_record', audit_record)
                 result = command(*args, **options)
         except PublicError as e:
             if self.api.env.debug:
@@ -378,38 +436,28 @@ class WSGIExecutioner(Executioner):
         finally:
             if hasattr(context, "languages"):
                 delattr(context, "languages")
+            audit_record = getattr(context, 'audit_record', None)
+            if audit_record is not None:
+                delattr(context, 'audit_record')
 
-        principal = getattr(context, 'principal', 'UNKNOWN')
-        if command is not None:
-            try:
-                params = command.args_options_2_params(*args, **options)
-            except Exception as e:
-                logger.info(
-                   'exception %s caught when converting options: %s',
-                   e.__class__.__name__, str(e)
-                )
-                # get at least some context of what is going on
-                params = options
-                error = e
-            if error:
-                result_string = type(error).__name__
-            else:
-                result_string = 'SUCCESS'
-            logger.info('[%s] %s: %s(%s): %s',
-                        type(self).__name__,
-                        principal,
-                        name,
-                        ', '.join(command._repr_iter(**params)),
-                        result_string)
+        if audit_record is None:
+            audit_record = self._audit_record(name)
+        if error:
+            audit_record.result = type(error).__name__
         else:
-            logger.info('[%s] %s: %s: %s',
-                        type(self).__name__,
-                        principal,
-                        name,
-                        type(error).__name__)
+            audit_record.result = 'SUCCESS'
+        logger.info('%s', audit_record, extra=dict(audit=audit_record))
 
         version = options.get('version', VERSION_WITHOUT_CAPABILITIES)
-        return self.marshal(result, error, _id, version)
+        with timed_phase('marshal'):
+            return self.marshal(result, error, _id, version)
+
+    def _audit_record(self, name, args=(), options=None):
+        return AuditRecord(
+            '[%s] %s' % (type(self).__name__,
+                         getattr(context, 'principal', 'UNKNOWN')),
+            name, args, options,
+            max_value_length=self.api.env.audit_max_value_length)
 
     def simple_unmarshal(self, environ):
         name = environ['PATH_INFO'].strip('/')
@@ -422,11 +470,15 @@ class WSGIExecutioner(Executioner):
         """
 
         logger.debug('WSGI WSGIExecutioner.__call__:')
+        timer = RequestTimer()
+        setattr(context, 'timer', timer)
         try:
             status = HTTP_STATUS_SUCCESS
             response = self.wsgi_execute(environ)
+            # the plugin instance is shared by all threads, always build
+            # a new list of headers
             if self.headers:
-                headers = self.headers
+                headers = list(self.headers)
             else:
                 headers = [('Content-Type',
                             self.content_type + '; charset=utf-8')]
@@ -440,8 +492,44 @@ class WSGIExecutioner(Executioner):
         if logout_cookie is not None:
             headers.append(('IPASESSION', logout_cookie))
 
+        # compressed request bodies are accepted
+        headers.append(
+            ('Accept-Encoding', ', '.join(sorted(INPUT_CONTENT_CODINGS))))
+        if (self.api.env.server_timing or
+                environ.get('HTTP_X_IPA_SERVER_TIMING')):
+            headers.append(('Server-Timing', timer.server_timing()))
+
         start_response(status, headers)
-        return [response]
+        if isinstance(response, bytes):
+            response = [response]
+        # marshal() may return an iterable of chunks
+        principal = getattr(context, 'principal', 'UNKNOWN')
+        return self._timed_response(response, timer, principal)
+
+    def _timed_response(self, response, timer, principal):
+        """
+        Yield the response body, then log the timing of the request.
+
+        Producing a streamed response is accounted to the ``marshal``
+        phase, writing it to the client is not.
+        """
+        duration = 0.0
+        iterator = iter(response)
+        try:
+            while True:
+                start = time.time()
+                chunk = next(iterator, None)
+                duration += time.time() - start
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            timer.add('marshal', duration, count=0)
+            logger.info('[%s] %s: %s: timing: %s',
+                        type(self).__name__,
+                        principal,
+                        timer.name,
+                        timer.format())
 
     def unmarshal(self, data):
         raise NotImplementedError('%s.unmarshal()' % type(self).__name__)
@@ -489,10 +577,12 @@ class jsonserver(WSGIExecutioner, HTTP_Status):
             principal=unicode(principal),
             version=unicode(VERSION),
         )
-        dump = json_encode_binary(
+        # The response is streamed to keep the memory footprint of large
+        # results low, only one entry at a time is converted and encoded.
+        chunks = json_iterencode_binary(
             response, version, pretty_print=self.api.env.debug
         )
-        return dump.encode('utf-8')
+        return (chunk.encode('utf-8') for chunk in chunks)
 
     def unmarshal(self, data):
         try:
@@ -588,6 +678,20 @@ class NegotiateAuth(AuthBase):
         return response
 
 
+_loopback = threading.local()
+
+
+def _get_loopback_session():
+    """
+    Return the keep-alive session of this thread to the local web server.
+    """
+    session = getattr(_loopback, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _loopback.session = session
+    return session
+
+
 class KerberosSession(HTTP_Status):
     '''
     Functionally shared by all RPC handlers using both sessions and
@@ -639,18 +743,24 @@ class KerberosSession(HTTP_Status):
 
         # Connect back to ourselves to get mod_auth_gssapi to
         # generate a cookie for us.
+        session = _get_loopback_session()
         try:
             target = self.api.env.host
-            r = requests.get('http://{0}/ipa/session/cookie'.format(target),
-                             auth=NegotiateAuth(target, ccache_name),
-                             verify=paths.IPA_CA_CRT)
+            r = session.get('http://{0}/ipa/session/cookie'.format(target),
+                            auth=NegotiateAuth(target, ccache_name),
+                            verify=paths.IPA_CA_CRT)
             session_cookie = r.cookies.get("ipa_session")
             if not session_cookie:
                 raise ValueError('No session cookie found')
         except Exception as e:
+            # do not reuse a connection in an unknown state
+            session.close()
             return self.unauthorized(environ, start_response,
                                      str(e),
                                      'Authentication failed')
+        finally:
+            # never send the cookie of one user along with the next login
+            session.cookies.clear()
 
         headers.append(('IPASESSION', session_cookie))
 
@@ -669,10 +779,7 @@ class KerberosWSGIExecutioner(WSGIExecutioner, KerberosSession):
         logger.debug('KerberosWSGIExecutioner.__call__:')
         user_ccache=environ.get('KRB5CCNAME')
 
-        object.__setattr__(
-            self, 'headers',
-            [('Content-Type', '%s; charset=utf-8' % self.content_type)]
-        )
+        headers = [('Content-Type', '%s; charset=utf-8' % self.content_type)]
 
         if user_ccache is None:
 
@@ -692,7 +799,7 @@ class KerberosWSGIExecutioner(WSGIExecutioner, KerberosSession):
         except PublicError as e:
             status = HTTP_STATUS_SUCCESS
             response = status.encode('utf-8')
-            start_response(status, self.headers)
+            start_response(status, headers)
             return self.marshal(None, e)
         finally:
             destroy_context()
@@ -872,6 +979,14 @@ class login_password(Backend, KerberosSession):
     content_type = 'text/plain'
     key = '/session/login_password'
 
+    # obtain a new armor ccache when the current one expires within
+    armor_refresh_margin = 300
+
+    def __init__(self, api):
+        super(login_password, self).__init__(api)
+        self._armor_lock = threading.Lock()
+        self._armor_expiration = 0
+
     def _on_finalize(self):
         super(login_password, self)._on_finalize()
         self.api.Backend.wsgi_dispatch.mount(self, self.key)
@@ -924,8 +1039,10 @@ class login_password(Backend, KerberosSession):
             return self.bad_request(environ, start_response, "no password specified")
 
         # Get the ccache we'll use and attempt to get credentials in it with user,password
-        ipa_ccache_name = os.path.join(paths.IPA_CCACHES,
-                                       'kinit_{}'.format(os.getpid()))
+        ipa_ccache_name = os.path.join(
+            paths.IPA_CCACHES,
+            'kinit_{}_{}'.format(os.getpid(),
+                                 threading.current_thread().ident))
         try:
             # try to remove in case an old file was there
             os.unlink(ipa_ccache_name)
@@ -958,50 +1075,73 @@ class login_password(Backend, KerberosSession):
             pass
         return result
 
-    def kinit(self, principal, password, ccache_name):
-        # get anonymous ccache as an armor for FAST to enable OTP auth
+    def get_armor(self):
+        """
+        Return the name of the armor ccache for FAST, or None.
+
+        The anonymous ticket in the armor ccache is shared by all logins
+        handled by this process and only renewed when it is about to expire.
+        """
         armor_path = os.path.join(paths.IPA_CCACHES,
                                   "armor_{}".format(os.getpid()))
 
-        logger.debug('Obtaining armor in ccache %s', armor_path)
+        with self._armor_lock:
+            if (time.time() < self._armor_expiration and
+                    os.path.exists(armor_path)):
+                return armor_path
 
-        try:
-            kinit_armor(
-                armor_path,
-                pkinit_anchors=[paths.KDC_CERT, paths.KDC_CA_BUNDLE_PEM],
-            )
-        except RuntimeError as e:
-            logger.error("Failed to obtain armor cache")
-            # We try to continue w/o armor, 2FA will be impacted
-            armor_path = None
+            logger.debug('Obtaining armor in ccache %s', armor_path)
+
+            # logins in other threads may be reading the current armor,
+            # replace it atomically
+            new_armor_path = '{}.new'.format(armor_path)
+            try:
+                kinit_armor(
+                    new_armor_path,
+                    pkinit_anchors=[paths.KDC_CERT, paths.KDC_CA_BUNDLE_PEM],
+                )
+                os.rename(new_armor_path, armor_path)
+            except (RuntimeError, CalledProcessError, OSError):
+                logger.error("Failed to obtain armor cache")
+                return None
+
+            try:
+                creds = gssapi.Credentials(usage='initiate',
+                                           store={'ccache': armor_path})
+                lifetime = creds.lifetime
+            except gssapi.exceptions.GSSError as e:
+                logger.debug('Failed to read armor lifetime: %s', e)
+                lifetime = 0
+            self._armor_expiration = (
+                time.time() + lifetime - self.armor_refresh_margin)
+
+        return armor_path
+
+    def kinit(self, principal, password, ccache_name):
+        # get anonymous ccache as an armor for FAST to enable OTP auth
+        # We try to continue w/o armor, 2FA will be impacted
+        armor_path = self.get_armor()
 
         try:
-            kinit_password(
+            kinit_password_in_process(
                 unicode(principal),
                 password,
                 ccache_name,
                 armor_ccache_name=armor_path,
                 enterprise=True,
                 lifetime=self.api.env.kinit_lifetime)
-
-            if armor_path:
-                logger.debug('Cleanup the armor ccache')
-                ipautil.run([paths.KDESTROY, '-A', '-c', armor_path],
-                            env={'KRB5CCNAME': armor_path}, raiseonerr=False)
-        except RuntimeError as e:
-            if ('kinit: Cannot read password while '
-                    'getting initial credentials') in str(e):
-                raise PasswordExpired(principal=principal, message=unicode(e))
-            elif ('kinit: Client\'s entry in database'
-                  ' has expired while getting initial credentials') in str(e):
+        except KRB5Error as e:
+            code, message = e.args[0], unicode(e.args[1])
+            if code in (KRB5KDC_ERR_KEY_EXP, KRB5_LIBOS_CANTREADPWD):
+                raise PasswordExpired(principal=principal, message=message)
+            elif code == KRB5KDC_ERR_NAME_EXP:
                 raise KrbPrincipalExpired(principal=principal,
-                                          message=unicode(e))
-            elif ('kinit: Clients credentials have been revoked '
-                  'while getting initial credentials') in str(e):
+                                          message=message)
+            elif code == KRB5KDC_ERR_CLIENT_REVOKED:
                 raise UserLocked(principal=principal,
-                                 message=unicode(e))
+                                 message=message)
             raise InvalidSessionPassword(principal=principal,
-                                         message=unicode(e))
+                                         message=message)
 
 
 class change_password(Backend, HTTP_Status):
@@ -114,6 +114,9 @@ class BaseServerRole(LDAPBasedProperty):
     property
     """
 
+    # attributes of entries retrieved to get the role status
+    attrs_list = ("*",)
+
     def create_role_status_dict(self, server, status):
         """
         the output of `status()` method should be a list of dictionaries having
@@ -152,26 +155,35 @@ class BaseServerRole(LDAPBasedProperty):
         """
         pass
 
-    def _fill_in_absent_masters(self, ldap2, api_instance, result):
+    @staticmethod
+    def get_masters_search(api_instance):
+        """
+        :returns: keyword arguments of the search for all masters, see
+                  `find_entries`
+        """
+        return dict(
+            base_dn=DN(api_instance.env.container_masters,
+                       api_instance.env.basedn),
+            filter='(objectclass=ipaConfigObject)',
+            scope=SCOPE_ONELEVEL,
+            attrs_list=['cn'])
+
+    def _fill_in_absent_masters(self, ldap2, api_instance, result,
+                                all_masters=None):
         """
         get all masters on which the role is absent
 
         :param ldap2: LDAP connection
         :param api_instance: API instance
         :param result: output of `get_result_from_entries` method
+        :param all_masters: entries found by the search returned by
+                            `get_masters_search`, searched if None
 
         :returns: list of masters on which the role is absent
         """
-        search_base = DN(api_instance.env.container_masters,
-                         api_instance.env.basedn)
-        search_filter = '(objectclass=ipaConfigObject)'
-        attrs_list = ['cn']
-
-        all_masters = ldap2.get_entries(
-            search_base,
-            filter=search_filter,
-            scope=SCOPE_ONELEVEL,
-            attrs_list=attrs_list)
+        if all_masters is None:
+            all_masters = ldap2.get_entries(
+                **self.get_masters_search(api_instance))
 
         all_master_cns = set(m['cn'][0] for m in all_masters)
         enabled_configured_masters = set(r[u'server_server'] for r in result)
@@ -181,7 +193,40 @@ class BaseServerRole(LDAPBasedProperty):
         return [self.create_role_status_dict(m, ABSENT) for m in
                 absent_masters]
 
-    def status(self, api_instance, server=None, attrs_list=("*",)):
+    def get_status_search(self, ldap, api_instance, server=None,
+                          attrs_list=None):
+        """
+        :returns: keyword arguments of the search for entries of the role,
+                  see `find_entries`
+        """
+        if attrs_list is None:
+            attrs_list = self.attrs_list
+        search_base, search_filter = self.create_search_params(
+            ldap, api_instance, server=server)
+        return dict(
+            base_dn=search_base,
+            filter=search_filter,
+            attrs_list=attrs_list)
+
+    def get_status_from_entries(self, ldap2, api_instance, entries,
+                                server=None, all_masters=None):
+        """
+        return status of the role from entries found by the search returned
+        by `get_status_search`, see `status()`
+        """
+        if not entries and server is not None:
+            return [self.create_role_status_dict(server, ABSENT)]
+
+        result = self.get_result_from_entries(entries)
+
+        if server is None:
+            result.extend(
+                self._fill_in_absent_masters(
+                    ldap2, api_instance, result, all_masters))
+
+        return sorted(result, key=lambda x: x[u'server_server'])
+
+    def status(self, api_instance, server=None, attrs_list=None):
         """
         probe and return status of the role either on single server or on the
         whole topology
@@ -195,27 +240,17 @@ class BaseServerRole(LDAPBasedProperty):
                   * 'absent' otherwise
         """
         ldap2 = api_instance.Backend.ldap2
-        search_base, search_filter = self.create_search_params(
-            ldap2, api_instance, server=server)
 
         try:
             entries = ldap2.get_entries(
-                search_base,
-                filter=search_filter,
-                attrs_list=attrs_list)
+                **self.get_status_search(
+                    ldap2, api_instance, server=server,
+                    attrs_list=attrs_list))
         except errors.EmptyResult:
             entries = []
 
-        if not entries and server is not None:
-            return [self.create_role_status_dict(server, ABSENT)]
-
-        result = self.get_result_from_entries(entries)
-
-        if server is None:
-            result.extend(
-                self._fill_in_absent_masters(ldap2, api_instance, result))
-
-        return sorted(result, key=lambda x: x[u'server_server'])
+        return self.get_status_from_entries(
+            ldap2, api_instance, entries, server=server)
 
 
 class ServerAttribute(LDAPBasedProperty):
@@ -452,6 +487,7 @@ class ServiceBasedRole(BaseServerRole):
     class for all role instances whose status is defined by presence of one or
     more entries in LDAP and/or their attributes
     """
+    attrs_list = ('ipaConfigString', 'cn')
 
     def __init__(self, attr_name, name, component_services):
         super(ServiceBasedRole, self).__init__(attr_name, name)
@@ -538,10 +574,6 @@ class ServiceBasedRole(BaseServerRole):
 
         return search_base, search_filter
 
-    def status(self, api_instance, server=None):
-        return super(ServiceBasedRole, self).status(
-            api_instance, server=server, attrs_list=('ipaConfigString', 'cn'))
-
 
 class ADtrustBasedRole(BaseServerRole):
     """
@@ -6,8 +6,6 @@
 set of functions and classes useful for management of domain level 1 topology
 """
 
-from copy import deepcopy
-
 from ipalib import _
 from ipapython.graph import Graph
 
@@ -51,20 +49,23 @@ def create_topology_graph(masters, segments):
     return graph
 
 
-def get_topology_connection_errors(graph):
+def get_topology_connection_errors(graph, exclude=()):
     """
-    Traverse graph from each master and find out which masters are not
-    reachable.
+    Find out which masters are not reachable from each master.
+
+    The masters reachable from each master are found with one pass over the
+    strongly connected components of the graph.
 
     :param graph: topology graph where vertices are masters
+    :param exclude: masters to leave out as if they were removed
     :returns: list of errors, error is: (master, visited, not_visited)
     """
+    master_cns = graph.vertices - set(exclude)
+    reachable = graph.get_reachable(exclude)
     connect_errors = []
-    master_cns = list(graph.vertices)
-    master_cns.sort()
-    for m in master_cns:
-        visited = graph.bfs(m)
-        not_visited = graph.vertices - visited
+    for m in sorted(master_cns):
+        visited = reachable[m]
+        not_visited = master_cns - visited
         if not_visited:
             connect_errors.append((m, list(visited), list(not_visited)))
     return connect_errors
@@ -148,25 +149,37 @@ class TopologyConnectivity(object):
 
         return errors_by_suffix
 
-    def errors_after_master_removal(self, master_cn):
-        graphs_before = deepcopy(self.graphs)
-
-        for s in self.graphs:
-            try:
-                self.graphs[s].remove_vertex(master_cn)
-            except ValueError:
-                pass
-
-        errors_after_removal = self.errors
+    def errors_after_masters_removal(self, master_cns):
+        """
+        Return the errors by suffix if all masters in `master_cns` were
+        removed at once. The graphs are not changed.
+        """
+        errors_by_suffix = {}
+        for suffix in self.graphs:
+            errors_by_suffix[suffix] = get_topology_connection_errors(
+                self.graphs[suffix], exclude=master_cns
+            )
 
-        self.graphs = graphs_before
+        return errors_by_suffix
 
-        return errors_after_removal
+    def errors_after_master_removal(self, master_cn):
+        return self.errors_after_masters_removal([master_cn])
+
+    def errors_after_each_master_removal(self, master_cns):
+        """
+        Return dict mapping each master in `master_cns` to the errors by
+        suffix if only that master was removed.
+        """
+        return {
+            master_cn: self.errors_after_master_removal(master_cn)
+            for master_cn in master_cns
+        }
 
     def check_current_state(self):
         err_msg = ""
-        for suffix in self.errors:
-            errors = self.errors[suffix]
+        errors_by_suffix = self.errors
+        for suffix in errors_by_suffix:
+            errors = errors_by_suffix[suffix]
             if errors:
                 err_msg = "\n".join([
                     err_msg,
@@ -0,0 +1,47 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipalib.install.kinit` module.
+"""
+
+import ctypes
+
+import pytest
+
+from ipalib.install import kinit
+
+pytestmark = pytest.mark.tier0
+
+
+def make_prompts(count, size=64):
+    buffers = [ctypes.create_string_buffer(size) for _i in range(count)]
+    prompts = (kinit._krb5_prompt * count)()
+    for prompt, buf in zip(prompts, buffers):
+        reply = kinit._krb5_reply_data(
+            0, size, ctypes.cast(buf, ctypes.c_void_p))
+        prompt.reply = ctypes.pointer(reply)
+    return prompts, buffers
+
+
+def test_password_prompter():
+    prompter = kinit._password_prompter(b'Secret123')
+    prompts, buffers = make_prompts(2)
+
+    # a banner without prompts does not use up the password
+    assert prompter(None, None, None, b'Password expired', 0, prompts) == 0
+
+    assert prompter(None, None, None, None, 1, prompts) == 0
+    assert buffers[0].value == b'Secret123'
+    assert prompts[0].reply.contents.length == len(b'Secret123')
+
+    # e.g. the prompt for a new password of an expired one
+    assert prompter(None, None, None, None, 2, prompts) == (
+        kinit.KRB5_LIBOS_CANTREADPWD)
+
+
+def test_password_prompter_too_long():
+    prompter = kinit._password_prompter(b'x' * 65)
+    prompts, _buffers = make_prompts(1)
+    assert prompter(None, None, None, None, 1, prompts) == (
+        kinit.KRB5_LIBOS_CANTREADPWD)
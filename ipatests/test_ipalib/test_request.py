@@ -0,0 +1,121 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipalib.request` module.
+"""
+
+import re
+
+import pytest
+
+from ipalib.request import (
+    context, destroy_context, AuditRecord, RequestTimer, timed_phase)
+
+pytestmark = pytest.mark.tier0
+
+
+def test_timer_phases():
+    timer = RequestTimer()
+    timer.add('ldap', 0.002)
+    timer.add('ldap', 0.003)
+    with timer.phase('normalize'):
+        pass
+    timer.add('marshal', 0.001, count=0)
+
+    assert list(timer.phases) == ['ldap', 'normalize', 'marshal']
+    assert timer.phases['ldap'][0] == 2
+    assert timer.phases['ldap'][1] == pytest.approx(0.005)
+    assert timer.phases['normalize'][0] == 1
+    assert timer.phases['marshal'][0] == 0
+
+    assert re.match(
+        r'^total=[\d.]+ms ldap=5\.0ms/2 normalize=[\d.]+ms/1 '
+        r'marshal=1\.0ms/0$',
+        timer.format())
+    assert re.match(
+        r'^ldap;dur=5\.0;desc="2", normalize;dur=[\d.]+;desc="1", '
+        r'marshal;dur=1\.0;desc="0", total;dur=[\d.]+$',
+        timer.server_timing())
+
+
+def test_timer_phase_exception():
+    timer = RequestTimer()
+    with pytest.raises(ValueError):
+        with timer.phase('execute'):
+            raise ValueError()
+    assert timer.phases['execute'][0] == 1
+
+
+def test_timed_phase():
+    try:
+        # no-op outside of a timed request
+        with timed_phase('execute'):
+            pass
+
+        timer = RequestTimer()
+        context.timer = timer
+        with timed_phase('execute'):
+            with timed_phase('ldap'):
+                pass
+        assert list(timer.phases) == ['ldap', 'execute']
+    finally:
+        destroy_context()
+
+
+class FakeCommand(object):
+    def __init__(self):
+        self.converted = 0
+
+    def args_options_2_params(self, *args, **options):
+        self.converted += 1
+        if not args:
+            raise TypeError()
+        params = dict(options)
+        params['uid'] = args[0]
+        return params
+
+    def _repr_items(self, **params):
+        for name in sorted(params):
+            yield name, params[name]
+
+
+def test_audit_record():
+    command = FakeCommand()
+    record = AuditRecord('[jsonserver] admin@EXAMPLE.COM', 'user_mod',
+                         (u'tuser',), dict(sn=u'x' * 12, version=u'2.230'),
+                         max_value_length=10)
+    record.set_params(
+        command,
+        dict(uid=u'tuser', sn=u'x' * 12, givenname=u'y' * 10, all=False),
+        ('uid', 'sn', 'givenname'))
+    record.result = 'SUCCESS'
+
+    # only the values are capped
+    assert str(record) == (
+        "[jsonserver] admin@EXAMPLE.COM: user_mod("
+        "givenname=yyyyyyyyyy, sn=xxxxxxxxxx..., uid=tuser): SUCCESS")
+    # the params recorded by the command are used as they are
+    assert command.converted == 0
+
+
+def test_audit_record_fallback():
+    command = FakeCommand()
+    record = AuditRecord('admin@EXAMPLE.COM: batch', 'user_show',
+                         (u'tuser',))
+    record.command = command
+    record.result = 'NotFound'
+    assert str(record) == (
+        "admin@EXAMPLE.COM: batch: user_show(uid=tuser): NotFound")
+    assert command.converted == 1
+
+    record = AuditRecord('admin@EXAMPLE.COM: batch', 'user_show',
+                         options=dict(all=True))
+    record.command = command
+    record.result = 'ConversionError'
+    assert str(record) == (
+        "admin@EXAMPLE.COM: batch: user_show(all=True): ConversionError")
+
+    record = AuditRecord('admin@EXAMPLE.COM', 'nonexistent')
+    record.result = 'CommandError'
+    assert str(record) == 'admin@EXAMPLE.COM: nonexistent: CommandError'
@@ -22,6 +22,9 @@ Test the `ipalib.rpc` module.
 """
 from __future__ import print_function
 
+import gzip
+import io
+
 import nose
 import pytest
 import six
@@ -200,6 +203,144 @@ def test_xml_loads():
         assert type(e.faultString) is unicode
 
 
+def test_transport_request_compression():
+    """
+    Test request compression of `ipalib.rpc.MultiProtocolTransport`.
+    """
+    class FakeConnection(object):
+        def __init__(self):
+            self.headers = {}
+            self.body = None
+
+        def putheader(self, name, value):
+            self.headers[name] = value
+
+        def endheaders(self, body):
+            self.body = body
+
+    class FakeResponse(object):
+        def __init__(self, headers):
+            self.headers = headers
+
+        def getheader(self, name, default=None):
+            return self.headers.get(name, default)
+
+        def read(self, size=None):
+            return b''
+
+    transport = rpc.MultiProtocolTransport(protocol='json')
+    small = b'{}'
+    large = b'{"data": "%s"}' % (b'a' * transport.encode_threshold)
+
+    # not compressed until the server accepts compressed requests
+    conn = FakeConnection()
+    transport.send_content(conn, large)
+    assert 'Content-Encoding' not in conn.headers
+    assert conn.body == large
+
+    transport.parse_response(FakeResponse({}))
+    conn = FakeConnection()
+    transport.send_content(conn, large)
+    assert 'Content-Encoding' not in conn.headers
+
+    transport.parse_response(
+        FakeResponse({'Accept-Encoding': 'deflate, gzip, x-gzip'}))
+    conn = FakeConnection()
+    transport.send_content(conn, small)
+    assert 'Content-Encoding' not in conn.headers
+    assert conn.body == small
+
+    conn = FakeConnection()
+    transport.send_content(conn, large)
+    assert conn.headers['Content-Encoding'] == 'gzip'
+    assert conn.headers['Content-Length'] == str(len(conn.body))
+    assert gzip.GzipFile(fileobj=io.BytesIO(conn.body)).read() == large
+
+
+def test_transport_keepalive():
+    """
+    Test connection reuse of `ipalib.rpc.SSLTransport`.
+    """
+    class FakeConnection(object):
+        def __init__(self, host):
+            self.host = host
+            self.sock = None
+
+        def connect(self):
+            self.sock = object()
+
+        def close(self):
+            self.sock = None
+
+    class FakeEnv(object):
+        tls_version_min = 'tls1.0'
+        tls_version_max = 'tls1.2'
+
+    class FakeAPI(object):
+        env = FakeEnv()
+
+    def create_https_connection(host, port, cafile, **kwargs):
+        return FakeConnection(host)
+
+    orig_create_https_connection = rpc.create_https_connection
+    orig_api = rpc.api
+    rpc.create_https_connection = create_https_connection
+    rpc.api = FakeAPI()
+    try:
+        transport = rpc.SSLTransport(protocol='json')
+        conn = transport.make_connection('ipa.example.com')
+        assert transport.make_connection('ipa.example.com') is conn
+        assert transport.tls_handshakes == 1
+
+        # the server has closed the connection after the last response
+        conn.close()
+        conn = transport.make_connection('ipa.example.com')
+        assert conn.sock is not None
+        assert transport.tls_handshakes == 2
+
+        # the server is likely to close an idle connection
+        transport._last_used -= transport.idle_timeout + 1
+        assert transport.make_connection('ipa.example.com') is not conn
+        assert transport.tls_handshakes == 3
+
+        assert transport.make_connection('ipa2.example.com').host == (
+            'ipa2.example.com')
+        assert transport.tls_handshakes == 4
+    finally:
+        rpc.create_https_connection = orig_create_https_connection
+        rpc.api = orig_api
+
+
+def test_json_iterencode_binary():
+    """
+    Test the `ipalib.rpc.json_iterencode_binary` function.
+    """
+    entries = [
+        dict(uid=[u'user%d' % i], data=[binary_bytes], count=i)
+        for i in range(100)
+    ]
+    val = dict(
+        result=dict(result=entries, count=len(entries), truncated=False),
+        error=None,
+        id=0,
+        principal=u'admin@EXAMPLE.COM',
+        version=(utf8_bytes, unicode_str),
+    )
+    expected = rpc.json_encode_binary(val, API_VERSION)
+
+    chunks = list(rpc.json_iterencode_binary(val, API_VERSION))
+    assert u''.join(chunks) == expected
+
+    chunks = list(rpc.json_iterencode_binary(val, API_VERSION, chunk_size=1))
+    assert len(chunks) > len(entries)
+    assert u''.join(chunks) == expected
+    assert rpc.json_decode_binary(u''.join(chunks)) == \
+        rpc.json_decode_binary(expected)
+
+    assert list(rpc.json_iterencode_binary({}, API_VERSION)) == [u'{}']
+    assert list(rpc.json_iterencode_binary([], API_VERSION)) == [u'[]']
+
+
 class test_xmlclient(PluginTester):
     """
     Test the `ipalib.rpc.xmlclient` plugin.
@@ -1,10 +1,12 @@
 import contextlib
+import pickle
 import unittest
 import pytest
 
 from cryptography import x509
 import six
 
+from ipapython import dn as dn_module
 from ipapython.dn import DN, RDN, AVA
 
 if six.PY3:
@@ -1187,6 +1189,48 @@ class TestDN(unittest.TestCase):
         self.assertFalse(dn3_a in s)
         self.assertFalse(dn3_b in s)
 
+    def test_parse_cache(self):
+        dn_str = 'uid=tuser,cn=users,cn=accounts,dc=example,dc=com'
+        dn1 = DN(dn_str)
+        dn2 = DN(dn_str)
+        self.assertEqual(dn1, dn2)
+        self.assertIsNot(dn1, dn2)
+        # the parsed RDNs are shared
+        self.assertIs(dn1.rdns[0], dn2.rdns[0])
+
+        # different strings of the same DN
+        dn3 = DN('UID=TUser, cn=users,cn=accounts,dc=example,dc=com')
+        self.assertEqual(dn1, dn3)
+        self.assertEqual(hash(dn1), hash(dn3))
+
+        # the DN is not modified by creating another DN from it
+        dn4 = DN(('cn', 'x'), dn1)
+        self.assertEqual(str(dn4), 'cn=x,' + dn_str)
+        self.assertEqual(str(DN(dn_str)), dn_str)
+
+        with self.assertRaises(ValueError):
+            DN('invalid')
+
+    def test_parse_cache_size(self):
+        cache = dn_module._ParseCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        # 'b' was the least recently used
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_pickle(self):
+        dn = DN(self.dn3)
+        hash(dn)
+        dn_copy = pickle.loads(pickle.dumps(dn))
+        # the cached hash is not pickled
+        self.assertEqual(dn_copy.__dict__, {'rdns': dn.rdns})
+        self.assertEqual(dn_copy, dn)
+        self.assertEqual(hash(dn_copy), hash(dn))
+
     def test_x500_text(self):
         # null DN x500 ordering and LDAP ordering are the same
         nulldn = DN()
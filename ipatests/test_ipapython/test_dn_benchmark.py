@@ -0,0 +1,103 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Measure construction, comparison, endswith and hashing of
+`ipapython.dn.DN`.
+
+Run with ``--run-benchmarks``. Every measurement is the best of several
+rounds over a few thousand user and group DNs.
+"""
+
+from __future__ import print_function
+
+import timeit
+
+import pytest
+
+from ipapython import dn as dn_module
+from ipapython.dn import DN
+
+pytestmark = [pytest.mark.tier0, pytest.mark.benchmark]
+
+BASE_DN = DN(('dc', 'example'), ('dc', 'com'))
+USERS_DN = DN(('cn', 'users'), ('cn', 'accounts'), BASE_DN)
+GROUPS_DN = DN(('cn', 'groups'), ('cn', 'accounts'), BASE_DN)
+
+DN_STRINGS = (
+    ['uid=user%d,%s' % (i, USERS_DN) for i in range(2000)] +
+    ['cn=group%d,%s' % (i, GROUPS_DN) for i in range(1000)]
+)
+
+
+def measure(func, repeat=5):
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def report(name, *timings):
+    print('%s: %s' % (name, ', '.join('%s %.1f ms' % t for t in timings)))
+
+
+def test_construction():
+    def parse_uncached():
+        for value in DN_STRINGS:
+            dn_module._parse_cache.clear()
+            DN(value)
+
+    def parse():
+        for value in DN_STRINGS:
+            DN(value)
+
+    parse()
+    uncached = measure(parse_uncached)
+    cached = measure(parse)
+    report('DN(str)', ('parsed', uncached), ('cached', cached))
+    assert cached < uncached
+
+    def from_rdn():
+        for i in range(len(DN_STRINGS)):
+            DN(('uid', 'user%d' % i), USERS_DN)
+
+    report('DN(rdn, dn)', ('created', measure(from_rdn)))
+
+
+def test_comparison():
+    dns = [DN(value) for value in DN_STRINGS]
+    others = [DN(value) for value in DN_STRINGS]
+
+    def compare():
+        for a, b in zip(dns, others):
+            assert a == b
+
+    def compare_fresh():
+        for a, value in zip(dns, DN_STRINGS):
+            assert a == DN(value)
+
+    report('==', ('new DNs', measure(compare_fresh)),
+           ('same DNs', measure(compare)))
+
+
+def test_endswith():
+    dns = [DN(value) for value in DN_STRINGS]
+
+    def endswith():
+        for dn in dns:
+            dn.endswith(USERS_DN)
+            dn.endswith(BASE_DN)
+
+    report('endswith', ('same DNs', measure(endswith)))
+
+
+def test_hashing():
+    def hash_fresh():
+        set(DN(value) for value in DN_STRINGS)
+
+    dns = [DN(value) for value in DN_STRINGS]
+
+    def hash_cached():
+        set(dns)
+
+    fresh = measure(hash_fresh)
+    cached = measure(hash_cached)
+    report('set()', ('new DNs', fresh), ('same DNs', cached))
+    assert cached < fresh
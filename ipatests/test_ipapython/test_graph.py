@@ -0,0 +1,97 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipapython.graph` module.
+"""
+
+import random
+
+import pytest
+
+from ipapython.graph import Graph
+
+pytestmark = pytest.mark.tier0
+
+
+def make_graph(edges, vertices=()):
+    graph = Graph()
+    for vertex in set(vertices) | set(v for edge in edges for v in edge):
+        graph.add_vertex(vertex)
+    for tail, head in edges:
+        graph.add_edge(tail, head)
+    return graph
+
+
+def test_tails_heads():
+    graph = make_graph([('a', 'b'), ('c', 'b'), ('b', 'a')])
+    assert graph.get_tails('b') == ['a', 'c']
+    assert graph.get_heads('b') == ['a']
+    assert graph.get_tails('c') == []
+    assert graph.get_tails('missing') == []
+
+    graph.remove_edge('c', 'b')
+    assert graph.get_tails('b') == ['a']
+    assert graph.get_heads('c') == []
+
+
+def test_remove_vertex():
+    graph = make_graph([('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'c')])
+    graph.remove_vertex('b')
+    assert graph.vertices == {'a', 'c'}
+    assert graph.edges == [('c', 'c')]
+    assert graph.get_heads('a') == []
+    assert graph.get_tails('a') == []
+    assert graph.get_tails('c') == ['c']
+    with pytest.raises(ValueError):
+        graph.remove_vertex('b')
+
+
+def test_strongly_connected_components():
+    graph = make_graph(
+        [('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'd'), ('d', 'c')],
+        vertices=['e'])
+    components = graph.strongly_connected_components()
+    assert sorted(sorted(c) for c in components) == [
+        ['a', 'b'], ['c', 'd'], ['e']]
+    # components reachable from a component are listed before it
+    assert (components.index({'c', 'd'}) <
+            components.index({'a', 'b'}))
+
+    components = graph.strongly_connected_components(exclude=['b'])
+    assert sorted(sorted(c) for c in components) == [
+        ['a'], ['c', 'd'], ['e']]
+
+
+def test_get_reachable():
+    graph = make_graph([('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'd')])
+    reachable = graph.get_reachable()
+    assert reachable['a'] == {'a', 'b', 'c', 'd'}
+    assert reachable['c'] == {'c', 'd'}
+    assert reachable['d'] == {'d'}
+
+    reachable = graph.get_reachable(exclude=['c'])
+    assert 'c' not in reachable
+    assert reachable['a'] == {'a', 'b'}
+    assert reachable['d'] == {'d'}
+    # the graph is not changed
+    assert graph.bfs('a') == {'a', 'b', 'c', 'd'}
+
+
+def test_get_reachable_bfs():
+    rnd = random.Random(0)
+    vertices = list(range(30))
+    for _i in range(20):
+        edges = [(rnd.choice(vertices), rnd.choice(vertices))
+                 for _j in range(rnd.randint(0, 60))]
+        graph = make_graph(edges, vertices)
+        reachable = graph.get_reachable()
+        for vertex in vertices:
+            assert reachable[vertex] == graph.bfs(vertex)
+
+        exclude = rnd.sample(vertices, 3)
+        reachable = graph.get_reachable(exclude)
+        for vertex in exclude:
+            graph.remove_vertex(vertex)
+        for vertex in graph.vertices:
+            assert reachable[vertex] == graph.bfs(vertex)
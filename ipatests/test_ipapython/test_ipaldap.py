@@ -0,0 +1,39 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the LDAP controls of the `ipapython.ipaldap` module.
+"""
+
+import binascii
+
+import pytest
+
+from ipapython.ipaldap import (
+    SortRequestControl, VLVRequestControl, VLVResponseControl)
+
+pytestmark = pytest.mark.tier0
+
+
+def test_sort_request_control():
+    ctrl = SortRequestControl(['uid'])
+    assert ctrl.controlType == SortRequestControl.controlType
+    assert ctrl.criticality
+    assert binascii.hexlify(ctrl.encodeControlValue()) == (
+        b'300730050403756964')
+
+
+def test_vlv_request_control():
+    ctrl = VLVRequestControl(0, 20)
+    assert ctrl.controlType == VLVRequestControl.controlType
+    # beforeCount 0, afterCount 19, byOffset offset 1, contentCount 0
+    assert binascii.hexlify(ctrl.encodeControlValue()) == (
+        b'300e020100020113a006020101020100')
+
+
+def test_vlv_response_control():
+    ctrl = VLVResponseControl()
+    ctrl.decodeControlValue(binascii.unhexlify('300a0201010202012c0a0100'))
+    assert ctrl.target_position == 1
+    assert ctrl.content_count == 300
+    assert ctrl.result == 0
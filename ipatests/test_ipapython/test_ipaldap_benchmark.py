@@ -0,0 +1,70 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Measure decoding of attribute values by `ipapython.ipaldap.LDAPClient`.
+
+Run with ``--run-benchmarks``.
+"""
+
+from __future__ import print_function
+
+import timeit
+
+import ldap.schema
+import pytest
+
+from ipapython.ipaldap import LDAPClient
+
+pytestmark = [pytest.mark.tier0, pytest.mark.benchmark]
+
+ATTRIBUTE_TYPES = [
+    b"( 2.5.4.3 NAME 'cn' "
+    b"SYNTAX 1.3.6.1.4.1.1466.115.121.1.15 )",
+    b"( 2.5.4.31 NAME 'member' "
+    b"SYNTAX 1.3.6.1.4.1.1466.115.121.1.12 )",
+    b"( 2.5.18.1 NAME 'createTimestamp' "
+    b"SYNTAX 1.3.6.1.4.1.1466.115.121.1.24 SINGLE-VALUE )",
+    b"( 0.9.2342.19200300.100.1.60 NAME 'jpegPhoto' "
+    b"SYNTAX 1.3.6.1.4.1.1466.115.121.1.28 )",
+    b"( 2.16.840.1.113719.1.301.4.1.1 NAME 'krbPrincipalName' "
+    b"SYNTAX 1.3.6.1.4.1.1466.115.121.1.26 )",
+]
+
+VALUES = [
+    ('cn', b'Test User'),
+    ('member', b'uid=tuser,cn=users,cn=accounts,dc=example,dc=com'),
+    ('createTimestamp', b'20180101000000Z'),
+    ('jpegPhoto', b'\xff\xd8\xff\xe0'),
+    ('krbprincipalname', b'tuser@EXAMPLE.COM'),
+    ('unknownAttribute', b'value'),
+] * 1000
+
+
+@pytest.fixture
+def client():
+    client = LDAPClient('ldap://localhost', no_schema=True)
+    schema = ldap.schema.SubSchema({'attributeTypes': ATTRIBUTE_TYPES})
+    # bypass the schema cache, which would contact the server
+    object.__setattr__(client, '_no_schema', False)
+    object.__setattr__(client, '_schema', schema)
+    object.__setattr__(client, '_has_schema', True)
+    return client
+
+
+def test_decode(client):
+    def decode_uncached():
+        for attr, val in VALUES:
+            # looks up the attribute type in the schema for every value
+            client._decoders.clear()
+            client.decode(val, attr)
+
+    def decode():
+        for attr, val in VALUES:
+            client.decode(val, attr)
+
+    uncached = min(timeit.repeat(decode_uncached, number=1, repeat=5))
+    cached = min(timeit.repeat(decode, number=1, repeat=5))
+    print("decode() of %d values: %.1f ms, with decoder lookup per value "
+          "%.1f ms" % (len(VALUES), cached * 1000, uncached * 1000))
+    assert cached < uncached
@@ -25,15 +25,18 @@
 
 # The DM password needs to be set in ~/.ipa/.dmpw
 
+import datetime
 import os
 import sys
 
+import ldap
 import pytest
 import nose
 from nose.tools import assert_raises  # pylint: disable=E0611
 import six
 
 from ipaplatform.paths import paths
+from ipaserver.plugins import ldap2 as ldap2_module
 from ipaserver.plugins.ldap2 import ldap2, AUTOBIND_DISABLED
 from ipalib import api, create_api, errors
 from ipapython.dn import DN
@@ -134,6 +137,171 @@ class test_ldap(object):
         cert = entry_attrs.get('usercertificate')[0]
         assert cert.serial_number is not None
 
+    def test_find_entry_pages(self):
+        """
+        Test generating search results page by page using ldap2
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        kw = dict(filter='(objectClass=*)', attrs_list=['objectclass'],
+                  base_dn=api.env.basedn, size_limit=-1, paged_search=True)
+        entries, truncated = self.conn.find_entries(**kw)
+        pages = list(self.conn.find_entry_pages(**kw))
+        assert [e.dn for page, _truncated in pages for e in page] == [
+            e.dn for e in entries]
+        assert not truncated
+        assert not any(page_truncated for _page, page_truncated in pages)
+
+        dns = [e.dn for e in self.conn.iter_entries(
+            api.env.basedn, attrs_list=['objectclass'], size_limit=-1,
+            paged_search=True)]
+        assert dns == [e.dn for e in entries]
+
+    def test_iter_entries_truncated(self):
+        """
+        Test truncated results of iter_entries using ldap2
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        dns = []
+        with pytest.raises(errors.SizeLimitExceeded):
+            for entry in self.conn.iter_entries(
+                    api.env.basedn, attrs_list=['objectclass'],
+                    size_limit=1):
+                dns.append(entry.dn)
+        assert len(dns) == 1
+
+    def test_decoders(self):
+        """
+        Test that attribute decoders are looked up once per schema
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        entry = self.conn.get_entry(self.dn, ['krbPrincipalName', 'cn'])
+        principals = entry['krbprincipalname']
+        assert self.conn.decode(entry.raw['krbprincipalname'],
+                                'krbprincipalname') == principals
+        decoder = self.conn._decoders['krbprincipalname']
+        assert self.conn._get_decoder('KrbPrincipalName') is decoder
+
+        assert self.conn.decode([b'20180101000000Z'], 'createTimestamp') == [
+            datetime.datetime(2018, 1, 1)]
+        with pytest.raises(ValueError):
+            self.conn.decode(b'invalid', 'createTimestamp')
+
+        self.conn._flush_schema()
+        assert self.conn._decoders == {}
+
+    def test_find_entries_multi(self):
+        """
+        Test performing several searches at once using ldap2
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        searches = [
+            dict(base_dn=api.env.basedn, scope=self.conn.SCOPE_BASE,
+                 attrs_list=['associateddomain']),
+            dict(base_dn=api.env.basedn, filter='(cn=nonexistent-entry)'),
+            dict(base_dn=api.env.basedn, attrs_list=['objectclass'],
+                 size_limit=1),
+        ]
+        result = self.conn.find_entries_multi(searches)
+        assert len(result) == 3
+
+        entries, truncated = result[0]
+        assert [e.dn for e in entries] == [api.env.basedn]
+        assert not truncated
+        assert result[1] == ([], False)
+        entries, truncated = result[2]
+        assert len(entries) == 1
+        assert truncated
+
+        with pytest.raises(errors.NotFound):
+            self.conn.find_entries_multi([
+                dict(base_dn=DN(('cn', 'nonexistent'), api.env.basedn)),
+                dict(base_dn=api.env.basedn, scope=self.conn.SCOPE_BASE),
+            ])
+
+    def test_find_entries_window(self):
+        """
+        Test sorted and paged search using ldap2
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        base_dn = DN(api.env.container_user, api.env.basedn)
+        entries, truncated = self.conn.find_entries(
+            '(objectclass=posixaccount)', ['uid'], base_dn,
+            self.conn.SCOPE_ONELEVEL, sort_attrs=['uid'])
+        uids = [e.single_value['uid'] for e in entries]
+        assert uids == sorted(uids)
+
+        entries, truncated, total = self.conn.find_entries_window(
+            '(objectclass=posixaccount)', ['uid'], base_dn,
+            self.conn.SCOPE_ONELEVEL, sort_attrs=['uid'], offset=0, count=1)
+        assert [e.single_value['uid'] for e in entries] == uids[:1]
+        assert not truncated
+        assert total == len(uids)
+
+        with pytest.raises(ValueError):
+            self.conn.find_entries_window(base_dn=base_dn)
+
+    def test_add_entries_to_group(self, monkeypatch):
+        """
+        Test adding and removing group members at once using ldap2
+        """
+        pwfile = api.env.dot_ipa + os.sep + ".dmpw"
+        if os.path.isfile(pwfile):
+            with open(pwfile, "r") as fp:
+                dm_password = fp.read().rstrip()
+        else:
+            raise nose.SkipTest("No directory manager password in %s" % pwfile)
+        # use several chunks with a few members
+        monkeypatch.setattr(ldap2_module, 'MEMBER_CHUNK_SIZE', 3)
+        self.conn = ldap2(api)
+        self.conn.connect(bind_dn=DN(('cn', 'directory manager')),
+                          bind_pw=dm_password)
+
+        # uniqueMember is not handled by the memberOf plugin
+        container_dn = DN(('cn', 'test-bulk-members'), api.env.basedn)
+        group_dn = DN(('cn', 'group'), container_dn)
+        member_dns = [DN(('cn', 'member%05d' % i), container_dn)
+                      for i in range(10)]
+        missing_dn = DN(('cn', 'missing'), container_dn)
+        self.conn.add_entry(self.conn.make_entry(
+            container_dn, objectclass=['top', 'nsContainer'],
+            cn=['test-bulk-members']))
+        try:
+            self.conn.add_entry(self.conn.make_entry(
+                group_dn, objectclass=['top', 'groupOfUniqueNames'],
+                cn=['group'], uniquemember=[member_dns[0]]))
+            for dn in member_dns:
+                self.conn.add_entry(self.conn.make_entry(
+                    dn, objectclass=['top', 'nsContainer'], cn=[dn[0].value]))
+
+            failed = self.conn.add_entries_to_group(
+                member_dns + [missing_dn, group_dn], group_dn, 'uniqueMember')
+            assert [(dn, type(e)) for dn, e in failed] == [
+                (member_dns[0], errors.AlreadyGroupMember),
+                (missing_dn, errors.NotFound),
+                (group_dn, errors.SameGroupError),
+            ]
+            entry = self.conn.get_entry(group_dn, ['uniqueMember'])
+            assert len(entry['uniqueMember']) == len(member_dns)
+
+            failed = self.conn.remove_entries_from_group(
+                member_dns[1:] + [missing_dn], group_dn, 'uniqueMember')
+            assert [(dn, type(e)) for dn, e in failed] == [
+                (missing_dn, errors.NotGroupMember)]
+            entry = self.conn.get_entry(group_dn, ['uniqueMember'])
+            assert [DN(value) for value in entry['uniqueMember']] == [
+                member_dns[0]]
+        finally:
+            for entry in self.conn.get_entries(
+                    container_dn, self.conn.SCOPE_ONELEVEL, attrs_list=[''],
+                    size_limit=-1, paged_search=True):
+                self.conn.delete_entry(entry.dn)
+            self.conn.delete_entry(container_dn)
+
 
 @pytest.mark.tier0
 @pytest.mark.needs_ipaapi
@@ -265,6 +433,34 @@ class test_LDAPEntry(object):
         assert e.single_value.get('COMMONNAME', 'default') == self.cn1[0]
         assert e.single_value.get('bad key', 'default') == 'default'
 
+    def test_modlist(self):
+        e = self.entry
+        e.reset_modlist()
+        assert e.generate_modlist() == []
+
+        raw = e.raw['cn']
+        raw.append(b'test3')
+        assert e.raw['cn'] is raw
+        e['cn'].append(u'test4')
+        assert e.generate_modlist() == [
+            (ldap.MOD_ADD, 'cn', [b'test3', b'test4'])]
+
+        e.reset_modlist()
+        e.raw['cn'].remove(b'test1')
+        assert e.generate_modlist() == [(ldap.MOD_DELETE, 'cn', [b'test1'])]
+
+    def test_load_raw(self):
+        values = [b'test1']
+        e = self.conn.make_entry(self.dn1)
+        e._load_raw({'cn': values})
+        assert e['cn'] == [u'test1']
+        assert e.generate_modlist() == []
+
+        e['cn'].append(u'test2')
+        assert e.generate_modlist() == [(ldap.MOD_ADD, 'cn', [b'test2'])]
+        # the values received from the server are copied on modification
+        assert values == [b'test1']
+
     def test_sync(self):
         e = self.entry
 
@@ -0,0 +1,85 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Measure adding and removing group members in bulk using
+`ipaserver.plugins.ldap2.ldap2`.
+
+Run with ``--run-benchmarks``. The test needs the Directory Manager
+password in ``~/.ipa/.dmpw``.
+"""
+
+from __future__ import print_function
+
+import os
+import time
+
+import nose
+import pytest
+
+from ipalib import api
+from ipapython.dn import DN
+from ipaserver.plugins.ldap2 import ldap2
+
+pytestmark = [
+    pytest.mark.tier0,
+    pytest.mark.needs_ipaapi,
+    pytest.mark.benchmark,
+]
+
+MEMBER_COUNT = 10000
+
+
+@pytest.fixture
+def conn(request):
+    pwfile = api.env.dot_ipa + os.sep + ".dmpw"
+    if os.path.isfile(pwfile):
+        with open(pwfile, "r") as fp:
+            dm_password = fp.read().rstrip()
+    else:
+        raise nose.SkipTest("No directory manager password in %s" % pwfile)
+    conn = ldap2(api)
+    conn.connect(bind_dn=DN(('cn', 'directory manager')),
+                 bind_pw=dm_password)
+    request.addfinalizer(conn.disconnect)
+    return conn
+
+
+def test_add_entries_to_group(conn):
+    # uniqueMember is not handled by the memberOf plugin
+    container_dn = DN(('cn', 'test-bulk-members'), api.env.basedn)
+    group_dn = DN(('cn', 'group'), container_dn)
+    member_dns = [DN(('cn', 'member%05d' % i), container_dn)
+                  for i in range(MEMBER_COUNT)]
+    conn.add_entry(conn.make_entry(
+        container_dn, objectclass=['top', 'nsContainer'],
+        cn=['test-bulk-members']))
+    try:
+        conn.add_entry(conn.make_entry(
+            group_dn, objectclass=['top', 'groupOfUniqueNames'],
+            cn=['group']))
+        for dn in member_dns:
+            conn.add_entry(conn.make_entry(
+                dn, objectclass=['top', 'nsContainer'], cn=[dn[0].value]))
+
+        start = time.time()
+        failed = conn.add_entries_to_group(
+            member_dns, group_dn, 'uniqueMember')
+        elapsed = time.time() - start
+        assert failed == []
+        print("Added %d members in %.2f seconds" % (
+            len(member_dns), elapsed))
+
+        start = time.time()
+        failed = conn.remove_entries_from_group(
+            member_dns, group_dn, 'uniqueMember')
+        elapsed = time.time() - start
+        assert failed == []
+        print("Removed %d members in %.2f seconds" % (
+            len(member_dns), elapsed))
+    finally:
+        for entry in conn.get_entries(
+                container_dn, conn.SCOPE_ONELEVEL, attrs_list=[''],
+                size_limit=-1, paged_search=True):
+            conn.delete_entry(entry.dn)
+        conn.delete_entry(container_dn)
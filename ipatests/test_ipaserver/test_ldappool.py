@@ -0,0 +1,97 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipaserver.plugins.ldap2.LDAPConnectionPool` class.
+"""
+
+import pytest
+
+from ipaserver.plugins.ldap2 import LDAPConnectionPool
+
+pytestmark = pytest.mark.tier0
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.unbound = False
+
+    def unbind_s(self):
+        self.unbound = True
+
+
+KEY = ('FILE:/run/ipa/ccaches/admin', u'admin@EXAMPLE.COM')
+OTHER_KEY = ('FILE:/run/ipa/ccaches/user', u'user@EXAMPLE.COM')
+
+
+def test_checkout_empty():
+    pool = LDAPConnectionPool(2, 60)
+    assert pool.checkout(KEY) is None
+    assert pool.stats() == dict(hits=0, misses=1, idle=0, busy=0)
+
+
+def test_reuse_same_key():
+    pool = LDAPConnectionPool(2, 60)
+    conn = FakeConnection()
+    pool.add(KEY, conn, KEY[1])
+    assert pool.checkin(conn)
+
+    assert pool.checkout(OTHER_KEY) is None
+    assert pool.checkout(KEY) == (conn, KEY[1])
+    assert pool.stats() == dict(hits=1, misses=1, idle=0, busy=1)
+    assert not conn.unbound
+
+
+def test_unregistered_connection_is_not_pooled():
+    pool = LDAPConnectionPool(2, 60)
+    assert not pool.checkin(FakeConnection())
+
+
+def test_discard():
+    pool = LDAPConnectionPool(2, 60)
+    conn = FakeConnection()
+    pool.add(KEY, conn, KEY[1])
+    pool.discard(conn)
+    assert not pool.checkin(conn)
+
+
+def test_disabled():
+    pool = LDAPConnectionPool(0, 60)
+    conn = FakeConnection()
+    pool.add(KEY, conn, KEY[1])
+    assert not pool.checkin(conn)
+
+
+def test_size_limit():
+    pool = LDAPConnectionPool(1, 60)
+    first, second = FakeConnection(), FakeConnection()
+    pool.add(KEY, first, KEY[1])
+    pool.add(OTHER_KEY, second, OTHER_KEY[1])
+    pool.checkin(first)
+    pool.checkin(second)
+
+    assert first.unbound
+    assert not second.unbound
+    assert pool.checkout(KEY) is None
+    assert pool.checkout(OTHER_KEY) == (second, OTHER_KEY[1])
+
+
+def test_idle_timeout():
+    pool = LDAPConnectionPool(2, -1)
+    conn = FakeConnection()
+    pool.add(KEY, conn, KEY[1])
+    pool.checkin(conn)
+
+    assert pool.checkout(KEY) is None
+    assert conn.unbound
+
+
+def test_flush():
+    pool = LDAPConnectionPool(2, 60)
+    conn = FakeConnection()
+    pool.add(KEY, conn, KEY[1])
+    pool.checkin(conn)
+    pool.flush()
+
+    assert conn.unbound
+    assert pool.checkout(KEY) is None
@@ -0,0 +1,181 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipaserver.plugins.membergraph` module.
+"""
+
+import contextlib
+
+import pytest
+
+from ipapython.dn import DN
+from ipaserver.plugins.membergraph import MemberGraph, membergraph
+
+pytestmark = pytest.mark.tier0
+
+BASE_DN = DN(('dc', 'example'), ('dc', 'com'))
+USER1 = DN(('uid', 'tuser1'), BASE_DN)
+USER2 = DN(('uid', 'tuser2'), BASE_DN)
+GROUP1 = DN(('cn', 'group1'), BASE_DN)
+GROUP2 = DN(('cn', 'group2'), BASE_DN)
+RULE = DN(('cn', 'rule'), BASE_DN)
+PERMISSIONS = DN(('cn', 'permissions'), ('cn', 'pbac'))
+READ_MEMBERSHIP = DN(('cn', 'System: Read Group Membership'), PERMISSIONS,
+                     BASE_DN)
+READ_HBAC = DN(('cn', 'System: Read HBAC Rules'), PERMISSIONS, BASE_DN)
+
+
+def make_graph(size=100):
+    # group1 > group2 > user1, group1 > user2, rule > group1
+    graph = MemberGraph(size)
+    assert graph.update(GROUP1, dict(member=[GROUP2, USER2]))
+    assert graph.update(GROUP2, dict(member=[USER1]))
+    assert graph.update(RULE, dict(memberuser=[GROUP1]))
+    return graph
+
+
+def test_members():
+    graph = make_graph()
+    assert sorted(graph.get_members(GROUP1)) == sorted([GROUP2, USER2])
+    assert graph.get_members(GROUP1, indirect=True) == [USER1]
+    # memberUser values are not members
+    assert graph.get_members(RULE) == []
+    assert sorted(graph.get_members(RULE, indirect=True)) == sorted(
+        [GROUP2, USER1, USER2])
+    assert graph.get_members(USER1) == []
+
+
+def test_memberof():
+    graph = make_graph()
+    assert graph.get_memberof(USER1) == [GROUP2]
+    assert sorted(graph.get_memberof(USER1, indirect=True)) == sorted(
+        [GROUP1, RULE])
+    assert graph.get_memberof(GROUP1) == [RULE]
+    assert graph.get_memberof(DN(('cn', 'missing'), BASE_DN)) == []
+
+
+def test_update():
+    graph = make_graph()
+    assert graph.count == 4
+    assert graph.update(GROUP1, dict(member=[USER2]))
+    assert graph.get_memberof(GROUP2) == []
+    assert graph.get_memberof(USER1, indirect=True) == []
+    assert graph.count == 3
+
+    assert graph.update(GROUP2, {})
+    assert GROUP2 not in graph
+    assert graph.get_memberof(USER1) == []
+
+
+def test_check_memberof():
+    graph = make_graph()
+    # group2 has been deleted
+    assert graph.check_memberof(USER1, [DN(('cn', 'other'), BASE_DN)])
+    assert graph.get_members(GROUP2) == []
+    assert graph.get_memberof(USER1) == []
+    # no memberOf at all is ambiguous
+    assert not graph.check_memberof(USER2, [])
+    assert graph.check_memberof(USER2, [GROUP1, RULE])
+    assert graph.get_memberof(USER2) == [GROUP1]
+
+
+def test_size():
+    graph = make_graph(size=4)
+    assert not graph.update(GROUP2, dict(member=[USER1, USER2]))
+
+
+def test_cycle():
+    graph = MemberGraph(10)
+    graph.update(GROUP1, dict(member=[GROUP2]))
+    graph.update(GROUP2, dict(member=[GROUP1, USER1]))
+    assert sorted(graph.get_members(GROUP1, indirect=True)) == sorted(
+        [GROUP1, USER1])
+    assert graph.get_memberof(USER1, indirect=True) == [GROUP1]
+
+
+def test_apply():
+    graph = make_graph()
+    graph.usn = 10
+    changes = [
+        # group2 lost its last member
+        (GROUP2, dict(member=[]), [GROUP1]),
+        (USER1, None, []),
+        # user2 was removed from group1, which was renamed
+        (USER2, None, [DN(('cn', 'renamed'), BASE_DN)]),
+    ]
+    assert graph.apply(changes, 12)
+    assert graph.usn == 12
+    assert GROUP2 not in graph
+    assert graph.get_memberof(USER1) == []
+    assert graph.get_memberof(USER2) == []
+    assert graph.get_members(GROUP1) == [GROUP2]
+
+    # memberOf of a member in the graph can't be read
+    graph = make_graph()
+    graph.usn = 10
+    assert not graph.apply([(USER1, None, [])], 12)
+    assert graph.usn == 10
+
+
+class FakeEnv(object):
+    member_graph_size = 100
+    basedn = BASE_DN
+    container_permission = PERMISSIONS
+
+
+class FakeAPI(object):
+    env = FakeEnv()
+
+
+class FakeEntry(dict):
+    def __init__(self, dn, **attrs):
+        super(FakeEntry, self).__init__(attrs)
+        self.dn = dn
+
+
+class FakeLDAP(object):
+    SCOPE_ONELEVEL = 1
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.conn = self
+
+    def get_entries(self, base_dn, scope, filter, attrs_list, **kwargs):
+        return self.entries
+
+    def get_entry(self, dn, attrs_list):
+        return self.entries[0]
+
+    def whoami_s(self):
+        return 'dn: %s' % USER1
+
+    @contextlib.contextmanager
+    def error_handler(self):
+        yield
+
+
+def test_restricted():
+    backend = membergraph(FakeAPI())
+    conn = FakeLDAP([
+        FakeEntry(READ_MEMBERSHIP, ipapermbindruletype=[u'all']),
+        FakeEntry(READ_HBAC, ipapermbindruletype=[u'anonymous']),
+    ])
+    assert backend._get_restricted(conn) == frozenset()
+
+    conn.entries[0]['ipapermbindruletype'] = [u'permission']
+    conn.entries[1]['ipapermexcludedattr'] = [u'memberUser']
+    assert backend._get_restricted(conn) == frozenset(
+        str(dn).lower() for dn in (READ_MEMBERSHIP, READ_HBAC))
+
+
+def test_has_access():
+    backend = membergraph(FakeAPI())
+    graph = make_graph()
+    ldap = FakeLDAP([FakeEntry(USER1, memberof=[READ_MEMBERSHIP])])
+    assert backend._has_access(ldap, graph)
+
+    graph.restricted = frozenset([str(READ_MEMBERSHIP).lower()])
+    assert backend._has_access(ldap, graph)
+    graph.restricted = frozenset([str(READ_HBAC).lower()])
+    assert not backend._has_access(ldap, graph)
@@ -0,0 +1,146 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipaserver.plugins.resultcache` module.
+"""
+
+import pytest
+
+from ipalib.request import destroy_context
+from ipaserver.plugins.resultcache import ResultCache, resultcache
+
+pytestmark = pytest.mark.tier0
+
+KEY = ('config_show', (), (('all', False),), u'admin@EXAMPLE.COM', ())
+OTHER_KEY = ('ca_find', (), (), u'admin@EXAMPLE.COM', ())
+
+
+def test_miss():
+    cache = ResultCache(2, 60)
+    assert cache.get(KEY, 1) is None
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 0
+    assert stats['hit_rate'] == 0.0
+
+
+def test_hit_returns_copy():
+    cache = ResultCache(2, 60)
+    result = dict(result=dict(cn=[u'ipaConfig']))
+    cache.set(KEY, 1, result)
+    result['result']['cn'].append(u'modified')
+
+    cached = cache.get(KEY, 1)
+    assert cached == dict(result=dict(cn=[u'ipaConfig']))
+    cached['error'] = None
+    assert cache.get(KEY, 1) == dict(result=dict(cn=[u'ipaConfig']))
+
+    stats = cache.stats()
+    assert stats['hits'] == 2
+    assert stats['hit_rate'] == 1.0
+
+
+def test_usn_change_invalidates():
+    cache = ResultCache(2, 60)
+    cache.set(KEY, 1, dict(result=True))
+    assert cache.get(KEY, 2) is None
+    assert cache.get(KEY, 1) is None
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_ttl():
+    cache = ResultCache(2, -1)
+    cache.set(KEY, 1, dict(result=True))
+    assert cache.get(KEY, 1) is None
+
+
+def test_size_limit():
+    cache = ResultCache(1, 60)
+    cache.set(KEY, 1, dict(result=True))
+    cache.set(OTHER_KEY, 1, dict(result=False))
+    assert cache.get(KEY, 1) is None
+    assert cache.get(OTHER_KEY, 1) == dict(result=False)
+    assert cache.stats()['entries'] == 1
+
+
+def test_disabled():
+    assert not ResultCache(0, 60).enabled
+    assert not ResultCache(2, 0).enabled
+    assert ResultCache(2, 60).enabled
+
+
+class FakeEnv(object):
+    result_cache_size = 10
+    result_cache_ttl = 60
+
+
+class FakeLDAP(object):
+    def __init__(self):
+        self.lastusn = 1
+        self.value = u'old'
+
+    def isconnected(self):
+        return True
+
+    def get_lastusn(self):
+        return self.lastusn
+
+
+class FakeBackend(object):
+    def __init__(self):
+        self.ldap2 = FakeLDAP()
+
+
+class FakeAPI(object):
+    def __init__(self):
+        self.env = FakeEnv()
+        self.Backend = FakeBackend()
+
+
+class FakeShow(object):
+    name = 'fake_show'
+    cache_results = True
+
+    def __init__(self, api):
+        self.api = api
+
+    def execute(self):
+        return dict(result=self.api.Backend.ldap2.value)
+
+
+class FakeMod(object):
+    name = 'fake_mod'
+    cache_results = False
+
+    def __init__(self, api):
+        self.api = api
+        self.results = []
+
+    def execute(self):
+        ldap = self.api.Backend.ldap2
+        show = FakeShow(self.api)
+        self.results.append(self.api.Backend.resultcache.execute(show))
+        ldap.value = u'new'
+        ldap.lastusn += 1
+        self.results.append(self.api.Backend.resultcache.execute(show))
+        return dict(result=True)
+
+
+@pytest.fixture
+def api(request):
+    api = FakeAPI()
+    api.Backend.resultcache = resultcache(api)
+    request.addfinalizer(destroy_context)
+    return api
+
+
+def test_nested_command_after_write(api):
+    cache = api.Backend.resultcache
+    assert cache.execute(FakeShow(api)) == dict(result=u'old')
+    destroy_context()
+
+    mod = FakeMod(api)
+    cache.execute(mod)
+    assert mod.results == [dict(result=u'old'), dict(result=u'new')]
+    assert cache.execute(FakeShow(api)) == dict(result=u'new')
@@ -21,7 +21,11 @@
 Test the `ipaserver.rpc` module.
 """
 
+import gzip
+import io
 import json
+import zlib
+
 import pytest
 
 import six
@@ -135,6 +139,37 @@ def test_params_2_args_options():
     assert f([args, options]) == (args, options)
 
 
+def test_read_input():
+    """
+    Test the `ipaserver.rpcserver.read_input` function.
+    """
+    f = rpcserver.read_input
+    body = json.dumps(dict(method=u'user_find', params=[[], {}]))
+    data = body.encode('utf-8')
+
+    def environ(data, content_encoding=None):
+        env = {
+            'CONTENT_LENGTH': str(len(data)),
+            'wsgi.input': io.BytesIO(data),
+        }
+        if content_encoding is not None:
+            env['HTTP_CONTENT_ENCODING'] = content_encoding
+        return env
+
+    assert f({}) is None
+    assert f(environ(data)) == body
+    assert f(environ(data, 'identity')) == body
+
+    gzip_data = io.BytesIO()
+    with gzip.GzipFile(fileobj=gzip_data, mode='wb') as gzip_file:
+        gzip_file.write(data)
+    assert f(environ(gzip_data.getvalue(), 'gzip')) == body
+    assert f(environ(zlib.compress(data), 'deflate')) == body
+
+    raises(errors.ValidationError, f, environ(data, 'gzip'))
+    raises(errors.ValidationError, f, environ(data, 'br'))
+
+
 class test_session(object):
     klass = rpcserver.wsgi_dispatch
 
@@ -0,0 +1,122 @@
+#
+# Copyright (C) 2018  FreeIPA Contributors see COPYING for license
+#
+"""
+Test querying the masters concurrently in `ipaserver.plugins.user`.
+"""
+
+import threading
+
+import pytest
+import six
+
+from ipalib import errors
+from ipapython.dn import DN
+from ipaserver.plugins import user as user_plugin
+
+if six.PY3:
+    unicode = str
+
+pytestmark = pytest.mark.tier0
+
+BASE_DN = DN(('dc', 'example'), ('dc', 'com'))
+USER_DN = DN(('uid', 'tuser1'), ('cn', 'users'), ('cn', 'accounts'),
+             BASE_DN)
+LOCAL = u'master1.example.com'
+REMOTE = u'master2.example.com'
+DOWN = u'master3.example.com'
+HUNG = u'master4.example.com'
+
+
+class FakeEnv(object):
+    host = LOCAL
+    basedn = BASE_DN
+    user_status_timeout = 1
+
+
+class FakeUser(object):
+    def get_either_dn(self, *keys, **options):
+        return USER_DN
+
+    def get_preserved_attribute(self, entry, options):
+        pass
+
+    def handle_not_found(self, *keys):
+        return errors.NotFound(reason=u'not found')
+
+
+class FakeObject(object):
+    user = FakeUser()
+
+
+class FakeAPI(object):
+    env = FakeEnv()
+    Object = FakeObject()
+
+
+class FakeLDAP(object):
+    SCOPE_ONELEVEL = 1
+
+    def __init__(self, hosts):
+        self.hosts = hosts
+
+    def find_entries(self, filter, attrs_list, base_dn, scope):
+        return [{'cn': [host]} for host in self.hosts], False
+
+    def get_entry(self, dn, attrs_list):
+        return {'krbloginfailedcount': [u'1']}
+
+
+class FakeObj(object):
+    def __init__(self, hosts):
+        self.backend = FakeLDAP(hosts)
+
+
+class FakeUserStatus(object):
+    """
+    user_status with the remote masters replaced by canned replies.
+    """
+    _query_masters = six.get_unbound_function(
+        user_plugin.user_status._query_masters)
+    execute = six.get_unbound_function(user_plugin.user_status.execute)
+
+    def __init__(self, hosts):
+        self.api = FakeAPI()
+        self.obj = FakeObj(hosts)
+        self.release = threading.Event()
+
+    def _query_master(self, host, dn, attr_list, timeout, ccache, status):
+        if host == DOWN:
+            status['connect_error'] = errors.NetworkError(
+                uri='ldap://%s' % host, error=u"Can't contact LDAP server")
+        elif host == HUNG:
+            self.release.wait(10)
+            status['error'] = errors.DatabaseTimeout()
+        else:
+            status['entry'] = {'krbloginfailedcount': [u'2']}
+        status['latency'] = 0
+
+
+@pytest.fixture
+def command(monkeypatch):
+    monkeypatch.setattr(user_plugin, 'api', FakeAPI())
+    command = FakeUserStatus([LOCAL, REMOTE, DOWN, HUNG])
+    yield command
+    command.release.set()
+
+
+def test_unreachable_masters(command):
+    result = command.execute(u'tuser1')
+    entries = dict((unicode(entry['server']).split()[0], entry)
+                   for entry in result['result'])
+
+    assert result['count'] == 4
+    assert entries[LOCAL]['server'] == LOCAL
+    assert entries[LOCAL]['krbloginfailedcount'] == [u'1']
+    assert entries[REMOTE]['server'] == REMOTE
+    assert entries[REMOTE]['krbloginfailedcount'] == [u'2']
+    assert unicode(entries[DOWN]['server']).startswith(
+        u'%s failed: ' % DOWN)
+    assert 'krbloginfailedcount' not in entries[DOWN]
+    assert unicode(entries[HUNG]['server']) == u'%s timed out' % HUNG
+    assert 'latency' not in entries[HUNG]
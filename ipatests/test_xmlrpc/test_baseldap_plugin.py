@@ -221,3 +221,72 @@ def test_entry_to_dict():
     assert_deepequal(
         baseldap.entry_to_dict(entry, all=True, raw=True),
         the_dict)
+
+
+@pytest.mark.tier0
+def test_convert_attribute_members(monkeypatch):
+    basedn = DN('dc=example,dc=com')
+    fake_api = type('FakeAPI', (object,), {})()
+    fake_api.env = type('FakeEnv', (object,), {'basedn': basedn})()
+    monkeypatch.setattr(baseldap, 'api', fake_api)
+
+    class FakePrimaryKey(object):
+        def __init__(self, name):
+            self.name = name
+
+    # pylint: disable=invalid-name
+    class user(baseldap.LDAPObject):
+        container_dn = DN('cn=users,cn=accounts')
+        primary_key = FakePrimaryKey('uid')
+
+    class group(baseldap.LDAPObject):
+        container_dn = DN('cn=groups,cn=accounts')
+        primary_key = FakePrimaryKey('cn')
+
+    class service(baseldap.LDAPObject):
+        container_dn = DN('cn=services,cn=accounts')
+        primary_key = FakePrimaryKey('krbprincipalname')
+
+        def get_primary_key_from_dn(self, dn):
+            return u'service:%s' % dn[0].value
+
+    class role(baseldap.LDAPObject):
+        attribute_members = {'member': ['user', 'group', 'service']}
+    # pylint: enable=invalid-name
+
+    fake_api.Object = {
+        cls.name: cls(fake_api) for cls in (user, group, service)}
+
+    members = [
+        DN(('uid', 'tuser'), user.container_dn, basedn),
+        DN(('uid', 'a,b'), user.container_dn, basedn),
+        DN(('cn', 'tgroup'), group.container_dn, basedn),
+        DN(('krbprincipalname', 'HTTP/x@EXAMPLE.COM'), service.container_dn,
+           basedn),
+        DN(('cn', 'other'), basedn),
+    ]
+    entry = ipaldap.LDAPEntry(
+        ipaldap.LDAPClient('ldap://test', force_schema_updates=False),
+        DN('cn=trole'))
+    entry.raw['member'] = [str(dn).encode('utf-8') for dn in members]
+
+    role(fake_api).convert_attribute_members(entry)
+
+    assert 'member' not in entry
+    assert entry['member_user'] == [u'tuser', u'a,b']
+    assert entry['member_group'] == [u'tgroup']
+    assert entry['member_service'] == [u'service:HTTP/x@EXAMPLE.COM']
+
+
+@pytest.mark.tier0
+def test_search_pageoffset_without_pagesize():
+    """Test that pageoffset is rejected without pagesize, also when sorted"""
+    class test_find(baseldap.LDAPSearch):
+        """Fake IPA search command"""
+        obj = None
+
+    instance = test_find('the api instance')
+    for options in (dict(pageoffset=50),
+                    dict(pageoffset=50, sortattr=u'cn')):
+        with pytest.raises(errors.ValidationError):
+            instance.get_sort_attrs(**options)
@@ -452,6 +452,20 @@ class test_cert_find(XMLRPC_test):
         """
         api.Command['cert_find'](issuedon_from=u'xyz')
 
+    def test_0032_find_all_details(self):
+        """
+        Search with all, the details are retrieved in the order found
+        """
+        found = api.Command['cert_find']()['result']
+        res = api.Command['cert_find'](all=True)['result']
+        assert ([obj['serial_number'] for obj in res] ==
+                [obj['serial_number'] for obj in found])
+        for obj in res[:20]:
+            shown = api.Command['cert_show'](
+                obj['serial_number'], cacn=obj['cacn'], all=True)['result']
+            assert obj['certificate'] == shown['certificate']
+            assert obj['serial_number_hex'] == shown['serial_number_hex']
+
 
 @pytest.mark.tier1
 class test_cert_revocation(BaseCert):
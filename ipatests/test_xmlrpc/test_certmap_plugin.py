@@ -398,6 +398,7 @@ class TestPermission(XMLRPC_test):
             u'result': (),
             u'summary': u'0 Certificate Identity Mapping Rules matched',
             u'truncated': False,
+            u'total': None,
         }
         expected_ok = {
             u'count': 1,
@@ -406,6 +407,7 @@ class TestPermission(XMLRPC_test):
             }],
             u'summary': u'1 Certificate Identity Mapping Rule matched',
             u'truncated': False,
+            u'total': None,
         }
         expected_ok[u'result'][0][u'dn'] = DN(
             (u'cn', expected_ok[u'result'][0][u'cn'][0]),
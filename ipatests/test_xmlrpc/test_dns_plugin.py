@@ -892,6 +892,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 2,
                 'truncated': False,
+                'total': None,
                 'result': [{
                     'dn': revzone1_dn,
                     'idnsname': [revzone1_dnsname],
@@ -933,6 +934,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [{
                     'dn': zone1_dn,
                     'idnsname': [zone1_absolute_dnsname],
@@ -1010,6 +1012,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 3,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': zone1_dn,
@@ -2355,6 +2358,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {   'dn': idnzone1_dn,
                         'idnsname': [idnzone1_dnsname],
@@ -2384,6 +2388,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {   'dn': idnzone1_dn,
                         'idnsname': [idnzone1_punycoded],
@@ -2475,6 +2480,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [{
                     'dn': idnzone1_dn,
                     'idnsname': [idnzone1_dnsname],
@@ -2523,6 +2529,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 2,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': idnzone1_dn,
@@ -2546,6 +2553,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 2,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': idnzone1_dn,
@@ -2567,6 +2575,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': idnzone1_dn,
@@ -2585,6 +2594,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': idnres1_dn,
@@ -2603,6 +2613,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': idnres1_dn,
@@ -2621,6 +2632,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': idnres1_dn,
@@ -2638,6 +2650,7 @@ class test_dns(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': idnres1_dn,
@@ -3318,6 +3331,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 0,
                 'truncated': False,
+                'total': None,
                 'result': [],
             },
         ),
@@ -3330,6 +3344,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 0,
                 'truncated': False,
+                'total': None,
                 'result': [],
             },
         ),
@@ -3342,6 +3357,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 0,
                 'truncated': False,
+                'total': None,
                 'result': [],
             },
         ),
@@ -4044,6 +4060,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 3,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': fwzone1_dn,
@@ -4077,6 +4094,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 3,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': fwzone1_dn,
@@ -4102,6 +4120,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [{
                     'dn': fwzone1_dn,
                     'idnsname': [fwzone1_dnsname],
@@ -4119,6 +4138,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 3,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': fwzone1_dn,
@@ -4152,6 +4172,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': fwzone1_dn,
@@ -4171,6 +4192,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': fwzone1_dn,
@@ -4190,6 +4212,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': fwzone2_dn,
@@ -4210,6 +4233,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [
                     {
                         'dn': fwzone3_dn,
@@ -4230,6 +4254,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 0,
                 'truncated': False,
+                'total': None,
                 'result': [],
             },
         ),
@@ -4242,6 +4267,7 @@ class test_forward_zones(Declarative):
                 'summary': None,
                 'count': 0,
                 'truncated': False,
+                'total': None,
                 'result': [],
             },
         ),
@@ -4775,6 +4801,7 @@ class test_forward_master_zones_mutual_exlusion(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [{
                     'dn': zone_findtest_forward_dn,
                     'idnsname': [zone_findtest_forward_dnsname],
@@ -4793,6 +4820,7 @@ class test_forward_master_zones_mutual_exlusion(Declarative):
                 'summary': None,
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'result': [{
                     'dn': zone_findtest_master_dn,
                     'idnsname': [zone_findtest_master_dnsname],
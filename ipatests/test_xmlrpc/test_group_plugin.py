@@ -187,6 +187,7 @@ class TestFindGroup(XMLRPC_test):
             summary=u'6 groups matched',
             count=6,
             truncated=False,
+            total=None,
             result=[
                 {
                     'dn': get_group_dn('admins'),
@@ -238,6 +239,7 @@ class TestFindGroup(XMLRPC_test):
             summary=u'6 groups matched',
             count=6,
             truncated=False,
+            total=None,
             result=[
                 {
                     'dn': get_group_dn('admins'),
@@ -287,6 +289,7 @@ class TestFindGroup(XMLRPC_test):
             summary=u'4 groups matched',
             count=4,
             truncated=False,
+            total=None,
             result=[
                 {
                     'dn': get_group_dn('admins'),
@@ -407,6 +410,7 @@ class TestNonposixGroup(XMLRPC_test):
             summary=u'3 groups matched',
             count=3,
             truncated=False,
+            total=None,
             result=[
                 {
                     'dn': get_group_dn('ipausers'),
@@ -450,6 +454,7 @@ class TestNonposixGroup(XMLRPC_test):
             summary=u'1 group matched',
             count=1,
             truncated=False,
+            total=None,
             result=[
                 {
                     'dn': get_group_dn('ipausers'),
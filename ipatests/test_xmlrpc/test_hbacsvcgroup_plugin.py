@@ -168,6 +168,7 @@ class test_hbacsvcgroup(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 HBAC service group matched',
                 result=[
                     {
@@ -187,6 +188,7 @@ class test_hbacsvcgroup(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 HBAC service group matched',
                 result=[
                     {
@@ -153,6 +153,31 @@ class test_hbactest(XMLRPC_test):
         for i in [0,2]:
             assert self.rule_names[i] in ret['matched']
 
+    def test_c1_hbactest_check_rules_enabled_after_change(self):
+        """
+        Test 'ipa hbactest --enabled' notices a rule disabled since last test
+        """
+        api.Command['hbacrule_disable'](self.rule_names[0])
+        try:
+            ret = api.Command['hbactest'](
+                user=self.test_user,
+                targethost=self.test_host,
+                service=self.test_service,
+                enabled=True
+            )
+            assert self.rule_names[0] not in (ret['matched'] or [])
+            assert self.rule_names[2] in ret['matched']
+        finally:
+            api.Command['hbacrule_enable'](self.rule_names[0])
+
+        ret = api.Command['hbactest'](
+            user=self.test_user,
+            targethost=self.test_host,
+            service=self.test_service,
+            enabled=True
+        )
+        assert self.rule_names[0] in ret['matched']
+
     def test_d_hbactest_check_rules_disabled_detail(self):
         """
         Test 'ipa hbactest --disabled' (all disabled IPA rules, detailed output)
@@ -187,6 +212,84 @@ class test_hbactest(XMLRPC_test):
         for rule in self.rule_names:
             assert u'%s_1x1' % (rule) in ret['error']
 
+    def test_e1_hbactest_bulk_check_rules_detail(self):
+        """
+        Test 'ipa hbactest-bulk --rules' (explicit IPA rules, detailed output)
+        """
+        ret = api.Command['hbactest_bulk'](
+            user=[self.test_user, u'hbacrule_nonexistent_user'],
+            targethost=[self.test_host],
+            service=[self.test_service],
+            rules=self.rule_names
+        )
+        assert ret['count'] == 2
+        assert ret['error'] is None
+        assert ret['truncated'] is False
+        granted, denied = ret['result']
+        assert granted['user'] == self.test_user
+        assert granted['targethost'] == self.test_host
+        assert granted['service'] == self.test_service
+        assert granted['value'] == True
+        assert granted['matched'] == self.rule_names
+        assert denied['user'] == u'hbacrule_nonexistent_user'
+        assert denied['value'] == False
+        assert 'matched' not in denied
+
+    def test_e2_hbactest_bulk_check_all_users_nodetail(self):
+        """
+        Test 'ipa hbactest-bulk --nodetail' with all users
+        """
+        ret = api.Command['hbactest_bulk'](
+            targethost=[self.test_host],
+            service=[self.test_service],
+            rules=self.rule_names,
+            nodetail=True
+        )
+        result = {entry['user']: entry for entry in ret['result']}
+        assert ret['count'] == len(result)
+        assert result[self.test_user]['value'] == True
+        assert 'matched' not in result[self.test_user]
+        assert result[u'admin']['value'] == False
+
+    def test_e2a_hbactest_bulk_check_resultlimit(self):
+        """
+        Test 'ipa hbactest-bulk --resultlimit' with all users
+        """
+        ret = api.Command['hbactest_bulk'](
+            targethost=[self.test_host],
+            service=[self.test_service],
+            rules=self.rule_names,
+            nodetail=True,
+            resultlimit=1
+        )
+        assert ret['count'] == 1
+        assert ret['truncated'] is True
+        assert len(ret['result']) == 1
+
+        ret = api.Command['hbactest_bulk'](
+            targethost=[self.test_host],
+            service=[self.test_service],
+            rules=self.rule_names,
+            nodetail=True,
+            resultlimit=0
+        )
+        assert ret['truncated'] is False
+        assert ret['count'] >= 2
+
+    def test_e3_hbactest_bulk_check_non_existing_rule(self):
+        """
+        Test running 'ipa hbactest-bulk' with non-existing rule in --rules
+        """
+        ret = api.Command['hbactest_bulk'](
+            user=[self.test_user],
+            targethost=[self.test_host],
+            service=[self.test_service],
+            rules=[u'%s_1x1' % (rule) for rule in self.rule_names],
+        )
+        assert ret['count'] == 0
+        for rule in self.rule_names:
+            assert u'%s_1x1' % (rule) in ret['error']
+
     @raises(errors.ValidationError)
     def test_f_hbactest_check_sourcehost_option_is_deprecated(self):
         """
@@ -372,6 +372,7 @@ class TestHostWithService(XMLRPC_test):
             assert_deepequal(dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 services matched',
                 result=[],
             ), result)
@@ -419,6 +420,7 @@ class TestManagedHosts(XMLRPC_test):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 host matched',
             result=[host.filter_attrs(host.find_keys)],
         ), result)
@@ -429,6 +431,7 @@ class TestManagedHosts(XMLRPC_test):
         assert_deepequal(dict(
             count=0,
             truncated=False,
+            total=None,
             summary=u'0 hosts matched',
             result=[],
         ), result)
@@ -501,6 +504,7 @@ class TestValidation(XMLRPC_test):
         assert_deepequal(dict(
             count=0,
             truncated=False,
+            total=None,
             summary=u'0 hosts matched',
             result=[],
         ), result)
@@ -1686,6 +1686,7 @@ class test_idviews(Declarative):
                 summary=u'0 User ID overrides matched',
                 count=0,
                 truncated=False,
+                total=None,
             ),
         ),
 
@@ -1701,6 +1702,7 @@ class test_idviews(Declarative):
                 summary=u'0 Group ID overrides matched',
                 count=0,
                 truncated=False,
+                total=None,
             ),
         ),
 
@@ -20,6 +20,7 @@
 Test group nesting and indirect members
 """
 
+from ipalib import api
 from ipatests.test_xmlrpc.xmlrpc_test import XMLRPC_test
 from ipatests.test_xmlrpc.tracker.user_plugin import UserTracker
 from ipatests.test_xmlrpc.tracker.group_plugin import GroupTracker
@@ -189,6 +190,18 @@ class TestNestingUserGroups(XMLRPC_test):
         group3.retrieve()
         group4.retrieve()
 
+    def test_find_group_group(self, group1, group2, group3, group4):
+        """ Find all test groups, indirect members match group-show """
+        result = api.Command['group_find'](u'testgroup', no_members=False)
+        assert result['count'] == 4
+        for entry in result['result']:
+            cn = entry['cn'][0]
+            shown = api.Command['group_show'](cn)['result']
+            for attr in ('memberindirect_user', 'memberindirect_group',
+                         'memberof_group', 'memberofindirect_group'):
+                assert (sorted(entry.get(attr, [])) ==
+                        sorted(shown.get(attr, []))), (cn, attr)
+
 
 @pytest.mark.tier1
 class TestNestingHostGroups(XMLRPC_test):
@@ -413,6 +413,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 netgroups matched',
                 result=[
                     {
@@ -440,6 +441,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 netgroups matched',
                 result=[
                     {
@@ -465,6 +467,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 netgroups matched',
                 result=[],
             ),
@@ -508,6 +511,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 netgroup matched',
                 result=[
                     {
@@ -886,6 +890,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 netgroup matched',
                 result=[
                     {
@@ -911,6 +916,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 netgroup matched',
                 result=[
                     {
@@ -932,6 +938,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 netgroup matched',
                 result=[
                     {
@@ -957,6 +964,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 netgroup matched',
                 result=[
                     {
@@ -978,6 +986,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 netgroups matched',
                 result=[
                     {
@@ -1010,6 +1019,7 @@ class test_netgroup(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 netgroups matched',
                 result=[
                     {
@@ -135,6 +135,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -273,6 +274,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -297,6 +299,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -321,6 +324,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -345,6 +349,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -368,6 +373,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -380,6 +386,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -404,6 +411,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -428,6 +436,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -454,6 +463,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -514,6 +524,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -548,6 +559,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -581,6 +593,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -603,6 +616,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -626,6 +640,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -645,6 +660,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -665,6 +681,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=True,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -699,6 +716,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=True,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -732,6 +750,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -769,6 +788,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=True,
+                total=None,
                 summary=u'1 permission matched',
                 result=[lambda res:
                     DN(res['dn']).endswith(DN(api.env.container_permission,
@@ -971,6 +991,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -997,6 +1018,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1021,6 +1043,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -1034,6 +1057,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1063,6 +1087,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1136,6 +1161,7 @@ class test_old_permission(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
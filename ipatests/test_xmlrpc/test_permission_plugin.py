@@ -182,6 +182,7 @@ class test_permission_negative(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -545,6 +546,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -570,6 +572,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -595,6 +598,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -620,6 +624,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -644,6 +649,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -656,6 +662,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -681,6 +688,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -706,6 +714,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -737,6 +746,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -805,6 +815,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -841,6 +852,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -876,6 +888,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -898,6 +911,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -921,6 +935,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -940,6 +955,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -960,6 +976,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=True,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -997,6 +1014,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=True,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1033,6 +1051,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 permissions matched',
                 result=[
                     {
@@ -1072,6 +1091,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=True,
+                total=None,
                 summary=u'1 permission matched',
                 result=[lambda res:
                     DN(res['dn']).endswith(DN(api.env.container_permission,
@@ -1381,6 +1401,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1407,6 +1428,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1440,6 +1462,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1471,6 +1494,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     {
@@ -1547,6 +1571,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -1861,6 +1886,7 @@ class test_permission(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -2816,6 +2842,7 @@ class test_permission_targetfilter(Declarative):
             expected=dict(
                 summary=u'1 permission matched' if should_find else u'0 permissions matched',
                 truncated=False,
+                total=None,
                 count=1 if should_find else 0,
                 result=[dict(
                     dn=permission1_dn,
@@ -3141,6 +3168,7 @@ class test_permission_legacy(Declarative):
             expected=dict(
                 count=lambda count: count,
                 truncated=False,
+                total=None,
                 summary=lambda s: True,
                 result=check_legacy_results,
             ),
@@ -3270,6 +3298,7 @@ class test_permission_bindtype(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[
                     dict(
@@ -3293,6 +3322,7 @@ class test_permission_bindtype(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
@@ -3860,6 +3890,7 @@ class test_managed_permissions(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[dict(
                     dn=permission1_dn,
@@ -3885,6 +3916,7 @@ class test_managed_permissions(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 permission matched',
                 result=[dict(
                     dn=permission1_dn,
@@ -3910,6 +3942,7 @@ class test_managed_permissions(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 permissions matched',
                 result=[],
             ),
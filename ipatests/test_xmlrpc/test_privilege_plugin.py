@@ -83,6 +83,7 @@ class test_privilege(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 privileges matched',
                 result=[],
             ),
@@ -176,6 +177,7 @@ class test_privilege(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -195,6 +197,7 @@ class test_privilege(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -213,6 +216,7 @@ class test_privilege(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -232,6 +236,7 @@ class test_privilege(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -319,6 +324,7 @@ class test_privilege(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -338,6 +344,7 @@ class test_privilege(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 privilege matched',
                 result=[
                     {
@@ -95,6 +95,7 @@ class test_role(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 roles matched',
                 result=[],
             ),
@@ -294,6 +295,7 @@ class test_role(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 role matched',
                 result=[
                     {
@@ -314,6 +316,7 @@ class test_role(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 role matched',
                 result=[
                     {
@@ -332,6 +335,7 @@ class test_role(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 role matched',
                 result=[
                     {
@@ -352,6 +356,7 @@ class test_role(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 role matched',
                 result=[
                     {
@@ -388,6 +393,7 @@ class test_role(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 role matched',
                 result=[
                     {
@@ -408,6 +414,7 @@ class test_role(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 role matched',
                 result=[
                     {
@@ -426,6 +433,7 @@ class test_role(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 roles matched',
                 result=[
                     {
@@ -451,6 +459,7 @@ class test_role(Declarative):
             expected=dict(
                 count=2,
                 truncated=False,
+                total=None,
                 summary=u'2 roles matched',
                 result=[
                     {
@@ -665,6 +674,7 @@ class test_role(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 role matched',
                 result=[
                     {
@@ -694,6 +704,7 @@ class test_role(Declarative):
             expected=dict(
                 count=0,
                 truncated=False,
+                total=None,
                 summary=u'0 roles matched',
                 result=[],
             ),
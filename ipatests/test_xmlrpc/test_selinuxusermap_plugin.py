@@ -181,6 +181,7 @@ class test_selinuxusermap(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 result=[
                     dict(
                         cn=[rule1],
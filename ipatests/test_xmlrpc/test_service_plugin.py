@@ -286,6 +286,7 @@ class test_service(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 service matched',
                 result=[
                     dict(
@@ -306,6 +307,7 @@ class test_service(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 service matched',
                 result=[
                     dict(
@@ -325,6 +327,7 @@ class test_service(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 service matched',
                 result=[
                     dict(
@@ -102,6 +102,7 @@ class test_servicedelegation(Declarative):
             expected=dict(
                 count=1,
                 truncated=False,
+                total=None,
                 result=[
                     dict(
                         dn=get_servicedelegation_dn(rule1),
@@ -140,6 +141,7 @@ class test_servicedelegation(Declarative):
                 summary=u'3 service delegation rules matched',
                 count=3,
                 truncated=False,
+                total=None,
                 result=[
                     {
                         'dn': get_servicedelegation_dn(u'ipa-http-delegation'),
@@ -169,6 +171,7 @@ class test_servicedelegation(Declarative):
                 summary=u'3 service delegation rules matched',
                 count=3,
                 truncated=False,
+                total=None,
                 result=[
                     {
                         'dn': get_servicedelegation_dn(u'ipa-http-delegation'),
@@ -229,6 +232,7 @@ class test_servicedelegation(Declarative):
                 summary=u'4 service delegation targets matched',
                 count=4,
                 truncated=False,
+                total=None,
                 result=[
                     {
                         'dn': get_servicedelegation_dn(
@@ -202,6 +202,7 @@ class TestUser(XMLRPC_test):
                 krblastfailedauth=[u'N/A'],
                 krblastsuccessfulauth=[u'N/A'],
                 krbloginfailedcount=u'0',
+                latency=Fuzzy(type=int),
                 now=isodate_re.match,
                 server=api.env.host,
                 ), ],
@@ -193,6 +193,7 @@ class test_vault_plugin(Declarative):
             'expected': {
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'summary': u'1 vault matched',
                 'result': [
                     {
@@ -303,6 +304,7 @@ class test_vault_plugin(Declarative):
             'expected': {
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'summary': u'1 vault matched',
                 'result': [
                     {
@@ -419,6 +421,7 @@ class test_vault_plugin(Declarative):
             'expected': {
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'summary': u'1 vault matched',
                 'result': [
                     {
@@ -533,6 +536,7 @@ class test_vault_plugin(Declarative):
             'expected': {
                 'count': 1,
                 'truncated': False,
+                'total': None,
                 'summary': u'1 vault matched',
                 'result': [
                     {
@@ -278,6 +278,7 @@ class AutomemberTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 rules matched',
             result=[expected],
         ), result)
@@ -126,6 +126,7 @@ class CATracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 CA matched',
             result=[expected]
         ), result)
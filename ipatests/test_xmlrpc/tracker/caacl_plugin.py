@@ -150,6 +150,7 @@ class CAACLTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 CA ACL matched',
             result=[expected]
         ), result)
@@ -118,6 +118,7 @@ class CertmapruleTracker(Tracker, EnableTracker):
             dict(
                 count=1,
                 truncated=False,
+                total=None,
                 summary=u'1 Certificate Identity Mapping Rule matched',
                 result=[expected],
             ),
@@ -122,6 +122,7 @@ class CertprofileTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 profile matched',
             result=[expected]
         ), result)
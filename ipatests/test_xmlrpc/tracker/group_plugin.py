@@ -191,6 +191,7 @@ class GroupTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 group matched',
             result=[expected],
         ), result)
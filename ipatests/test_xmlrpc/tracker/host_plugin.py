@@ -168,6 +168,7 @@ class HostTracker(KerberosAliasMixin, Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 host matched',
             result=[expected],
         ), result)
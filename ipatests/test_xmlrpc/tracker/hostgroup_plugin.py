@@ -198,6 +198,7 @@ class HostGroupTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 hostgroup matched',
             result=[expected],
         ), result)
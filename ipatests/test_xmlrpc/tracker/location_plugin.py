@@ -116,6 +116,7 @@ class LocationTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 IPA location matched',
             result=[expected],
         ), result)
@@ -89,6 +89,7 @@ class ServerTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 IPA server matched',
             result=[expected],
         ), result)
@@ -98,6 +99,7 @@ class ServerTracker(Tracker):
         assert_deepequal(dict(
             count=0,
             truncated=False,
+            total=None,
             summary=u'0 IPA servers matched',
             result=[],
         ), result)
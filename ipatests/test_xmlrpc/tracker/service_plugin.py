@@ -159,6 +159,7 @@ class ServiceTracker(KerberosAliasMixin, Tracker):
         assert_deepequal({
             u'count': 1,
             u'truncated': False,
+            u'total': None,
             u'summary': u'1 service matched',
             u'result': [expected]
             }, result)
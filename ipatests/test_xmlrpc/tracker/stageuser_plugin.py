@@ -231,6 +231,7 @@ class StageUserTracker(KerberosAliasMixin, Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 user matched',
             result=[expected],
         ), result)
@@ -240,6 +241,7 @@ class StageUserTracker(KerberosAliasMixin, Tracker):
         assert_deepequal(dict(
             count=0,
             truncated=False,
+            total=None,
             summary=u'0 users matched',
             result=[],
         ), result)
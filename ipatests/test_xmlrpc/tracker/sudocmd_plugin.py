@@ -103,6 +103,7 @@ class SudoCmdTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 Sudo Command matched',
             result=[expected],
         ), result)
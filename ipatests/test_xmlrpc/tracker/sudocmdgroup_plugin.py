@@ -179,6 +179,7 @@ class SudoCmdGroupTracker(Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 Sudo Command Group matched',
             result=[expected],
         ), result)
@@ -326,6 +326,7 @@ class UserTracker(CertmapdataMixin, KerberosAliasMixin, Tracker):
         assert_deepequal(dict(
             count=1,
             truncated=False,
+            total=None,
             summary=u'1 user matched',
             result=[expected],
         ), result)
@@ -335,6 +336,7 @@ class UserTracker(CertmapdataMixin, KerberosAliasMixin, Tracker):
         assert_deepequal(dict(
             count=0,
             truncated=False,
+            total=None,
             summary=u'0 users matched',
             result=[],
         ), result)